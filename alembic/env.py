@@ -1,7 +1,12 @@
+import os
+import sys
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 from alembic import context
 
+# Lets revisions import the helpers next to this file (migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+import migration_utils
 
 from game.models import Base
 import game.models as models 
@@ -19,7 +24,11 @@ def run_migrations_offline():
 def run_migrations_online():
     connectable = engine_from_config(config.get_section(config.config_ini_section), prefix="sqlalchemy.", poolclass=pool.NullPool)
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        if migration_utils.is_dry_run():
+            migration_utils.run_dry(connection, target_metadata=target_metadata)
+            return
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          on_version_apply=migration_utils.StepTimer())
         with context.begin_transaction():
             context.run_migrations()
 
@@ -0,0 +1,255 @@
+# Helpers for data migrations on large tables (player_monsters has millions of rows).
+#
+#   from migration_utils import add_missing_columns, backfill, has_column, rebuild_table
+#
+#   add_missing_columns('player_monsters', sa.Column('hp', sa.Integer()))
+#   backfill('player_monsters', "hp = json_extract(current_stats, '$.hp')")
+#   with rebuild_table('player_monsters') as batch_op:
+#       batch_op.drop_column('current_stats')
+#
+# env.py puts this directory on sys.path so revisions can import it.
+#
+# backfill() walks the table in primary-key ranges and commits after every
+# chunk, so the game's connections get SQLite's write lock between chunks
+# instead of waiting for the whole migration. The last finished id is kept in
+# the migration_progress table; if the run is interrupted, the next upgrade
+# carries on from there. Revisions written with add_missing_columns /
+# has_column can be re-run after a partial upgrade.
+#
+# Dry run: `alembic upgrade head -x dry_run=1` runs the pending revisions in
+# one transaction, logs how long each step and chunk took, and rolls it all
+# back.
+
+import logging
+import time
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+from alembic import context, op
+
+PROGRESS_TABLE = 'migration_progress'
+DEFAULT_CHUNK_SIZE = 10000
+# Seconds to sleep between committed chunks, so waiting writers get the lock
+CHUNK_PAUSE = 0.05
+# Seconds between progress lines
+REPORT_INTERVAL = 1.0
+
+log = logging.getLogger('alembic.migration_utils')
+
+# table -> [(UPDATE statement, pk, last id done)] of finished backfills, for
+# rebuild_table to catch up on under the write lock
+_backfilled = {}
+
+
+def is_dry_run() -> bool:
+    """
+    True when the run was started with -x dry_run=1 (or true / yes).
+    """
+    value = context.get_x_argument(as_dictionary=True).get('dry_run', '')
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def has_column(table, column) -> bool:
+    return any(info['name'] == column for info in sa.inspect(op.get_bind()).get_columns(table))
+
+
+def add_missing_columns(table, *columns):
+    """
+    op.add_column for each column the table doesn't have yet.
+    """
+    existing = {info['name'] for info in sa.inspect(op.get_bind()).get_columns(table)}
+    for column in columns:
+        if column.name not in existing:
+            op.add_column(table, column)
+
+
+def _begin(connection):
+    connection.exec_driver_sql('BEGIN IMMEDIATE' if connection.dialect.name == 'sqlite' else 'BEGIN')
+
+
+def _ensure_progress_table(connection):
+    connection.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} ("
+        "key VARCHAR PRIMARY KEY, last_id INTEGER NOT NULL, updated_at TIMESTAMP)"
+    )
+
+
+def _saved_progress(connection, key):
+    return connection.execute(
+        sa.text(f"SELECT last_id FROM {PROGRESS_TABLE} WHERE key = :key"), {"key": key}
+    ).scalar()
+
+
+def _save_progress(connection, key, last_id):
+    connection.execute(sa.text(
+        f"INSERT INTO {PROGRESS_TABLE} (key, last_id, updated_at) VALUES (:key, :last_id, CURRENT_TIMESTAMP) "
+        "ON CONFLICT (key) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at"
+    ), {"key": key, "last_id": last_id})
+
+
+def _clear_progress(connection, key):
+    """
+    Forgets a finished backfill, dropping the progress table once it is empty.
+    """
+    _begin(connection)
+    connection.execute(sa.text(f"DELETE FROM {PROGRESS_TABLE} WHERE key = :key"), {"key": key})
+    if connection.execute(sa.text(f"SELECT COUNT(*) FROM {PROGRESS_TABLE}")).scalar() == 0:
+        connection.exec_driver_sql(f"DROP TABLE {PROGRESS_TABLE}")
+    connection.exec_driver_sql('COMMIT')
+
+
+def _run_chunks(connection, statement, key, label, start, high, chunk_size, commit, pause) -> int:
+    """
+    Runs the UPDATE for every id range (low, low + chunk_size] from start to
+    high. With commit, each chunk is its own transaction that also saves the
+    progress row.
+    """
+    started = last_report = time.perf_counter()
+    updated = 0
+    low = start
+    while low < high:
+        upper = min(low + chunk_size, high)
+        if commit:
+            _begin(connection)
+            try:
+                updated += connection.execute(statement, {"low": low, "high": upper}).rowcount
+                _save_progress(connection, key, upper)
+                connection.exec_driver_sql('COMMIT')
+            except Exception:
+                connection.exec_driver_sql('ROLLBACK')
+                raise
+        else:
+            updated += connection.execute(statement, {"low": low, "high": upper}).rowcount
+        low = upper
+
+        now = time.perf_counter()
+        if now - last_report >= REPORT_INTERVAL or low >= high:
+            done = (low - start) / (high - start)
+            elapsed = now - started
+            log.info("%s: %.0f%% (%s rows) in %.1fs, ~%.1fs left",
+                     label, done * 100, f"{updated:,}", elapsed, elapsed / done - elapsed)
+            last_report = now
+        if commit and pause and low < high:
+            time.sleep(pause)
+    return updated
+
+
+def _max_id(connection, table, pk):
+    return connection.execute(sa.text(f"SELECT MAX({pk}) FROM {table}")).scalar()
+
+
+def _run_to_end(connection, statement, table, pk, key, label, start, chunk_size, commit, pause) -> int:
+    """
+    _run_chunks from start to MAX(pk), then again over whatever was inserted
+    meanwhile, until MAX(pk) stops growing. Remembers where it stopped for
+    rebuild_table.
+    """
+    updated = 0
+    high = _max_id(connection, table, pk)
+    while high is not None and high > start:
+        updated += _run_chunks(connection, statement, key, label, start, high, chunk_size, commit, pause)
+        start = high
+        high = _max_id(connection, table, pk)
+        if high is not None and high > start:
+            log.info("%s: catching up on ids %s..%s inserted during the backfill", label, start + 1, high)
+    _backfilled.setdefault(table, []).append((statement, pk, start))
+    return updated
+
+
+def backfill(table, assignments, where=None, key=None, chunk_size=DEFAULT_CHUNK_SIZE, pause=CHUNK_PAUSE,
+             pk='id') -> int:
+    """
+    Runs UPDATE table SET assignments [WHERE where] in primary-key ranges of
+    chunk_size, committing every chunk, and returns the number of rows
+    updated. Rows the game inserts while it runs are picked up too: after
+    the last chunk it re-reads MAX(pk) and carries on until that stops
+    growing, and a later rebuild_table of the table updates any that
+    arrive after that under the write lock. key names the backfill in the progress table (defaults to the
+    table and assignments); a run that was interrupted resumes after the
+    last committed chunk. In a dry run nothing is committed.
+    """
+    label = key or table
+    key = key or f"{table}: {assignments}"
+    condition = f" AND ({where})" if where else ""
+    statement = sa.text(f"UPDATE {table} SET {assignments} WHERE {pk} > :low AND {pk} <= :high{condition}")
+
+    if is_dry_run():
+        connection = op.get_bind()
+        low = connection.execute(sa.text(f"SELECT MIN({pk}) FROM {table}")).scalar()
+        if low is None:
+            return 0
+        return _run_to_end(connection, statement, table, pk, key, label, low - 1, chunk_size, False, 0)
+
+    # Commits the revision's work so far; every chunk below commits on its own
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        low = connection.execute(sa.text(f"SELECT MIN({pk}) FROM {table}")).scalar()
+        if low is None:
+            return 0
+        _ensure_progress_table(connection)
+        start = _saved_progress(connection, key)
+        if start is not None:
+            log.info("%s: resuming after id %s", label, start)
+        else:
+            start = low - 1
+        updated = _run_to_end(connection, statement, table, pk, key, label, start, chunk_size, True, pause)
+        _clear_progress(connection, key)
+    return updated
+
+
+@contextmanager
+def rebuild_table(table, **kw):
+    """
+    op.batch_alter_table for changes SQLite can't make with ALTER TABLE
+    (dropping or retyping columns, constraints). The table is copied into a
+    new one with a single INSERT ... SELECT and Alembic builds the indexes
+    after the copy. The whole copy holds the write lock, so backfill first and
+    rebuild once. Rows inserted since the table's backfills finished are
+    backfilled right before the copy, once the lock is held. Logs how long it
+    took.
+    """
+    started = time.perf_counter()
+    connection = op.get_bind()
+    if connection.dialect.name == 'sqlite' and not connection.connection.dbapi_connection.in_transaction:
+        # Held until the revision commits, so no insert slips in before the copy
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+    for statement, pk, done in _backfilled.pop(table, []):
+        high = _max_id(connection, table, pk)
+        if high is not None and high > done:
+            updated = connection.execute(statement, {"low": done, "high": high}).rowcount
+            log.info("%s: backfilled %s rows inserted since the backfill", table, f"{updated:,}")
+    with op.batch_alter_table(table, **kw) as batch_op:
+        yield batch_op
+    log.info("%s: rebuilt in %.1fs", table, time.perf_counter() - started)
+
+
+class StepTimer:
+    """
+    on_version_apply callback that logs how long each revision took.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+
+    def __call__(self, ctx, step, heads, run_args):
+        now = time.perf_counter()
+        log.info("%s %s took %.2fs", "upgrade" if step.is_upgrade else "downgrade",
+                 step.up_revision_id, now - self.started)
+        self.started = now
+
+
+def run_dry(connection, **configure_kw):
+    """
+    Runs the pending migrations inside one transaction and rolls it back.
+    """
+    transaction = connection.begin()
+    if connection.dialect.name == 'sqlite':
+        # pysqlite only opens a transaction before DML; open it now so the DDL is rolled back too
+        connection.exec_driver_sql('BEGIN')
+    started = time.perf_counter()
+    context.configure(connection=connection, on_version_apply=StepTimer(), **configure_kw)
+    try:
+        context.run_migrations()
+    finally:
+        transaction.rollback()
+    log.info("Dry run finished in %.1fs; everything was rolled back", time.perf_counter() - started)
@@ -0,0 +1,36 @@
+"""add monster_caught_at to trade offers
+
+Revision ID: 3c8e5f1a7d24
+Revises: b7d41e9c3a52
+Create Date: 2026-10-18 21:27:43.519604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_utils import add_missing_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e5f1a7d24'
+down_revision: Union[str, None] = 'b7d41e9c3a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    add_missing_columns('trade_offers', sa.Column('monster_caught_at', sa.DateTime(), nullable=True))
+    # Open offers are few; copy the offered monsters' caught_at in one statement
+    op.execute(
+        "UPDATE trade_offers SET monster_caught_at = "
+        "(SELECT caught_at FROM player_monsters WHERE player_monsters.id = trade_offers.monster_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('trade_offers') as batch_op:
+        batch_op.drop_column('monster_caught_at')
@@ -0,0 +1,38 @@
+"""add indexes on hot foreign keys
+
+Revision ID: 5b3e9c1d7a20
+Revises: 4d7a88404485
+Create Date: 2026-10-18 10:12:41.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b3e9c1d7a20'
+down_revision: Union[str, None] = '4d7a88404485'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_player_monsters_player_id'), 'player_monsters', ['player_id'], unique=False)
+    op.create_index(op.f('ix_battles_winner_id'), 'battles', ['winner_id'], unique=False)
+    op.create_index(op.f('ix_trades_sender_id'), 'trades', ['sender_id'], unique=False)
+    op.create_index(op.f('ix_trades_receiver_id'), 'trades', ['receiver_id'], unique=False)
+    op.create_index(op.f('ix_friend_association_player_id'), 'friend_association', ['player_id'], unique=False)
+    op.create_index(op.f('ix_rival_association_player_id'), 'rival_association', ['player_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_rival_association_player_id'), table_name='rival_association')
+    op.drop_index(op.f('ix_friend_association_player_id'), table_name='friend_association')
+    op.drop_index(op.f('ix_trades_receiver_id'), table_name='trades')
+    op.drop_index(op.f('ix_trades_sender_id'), table_name='trades')
+    op.drop_index(op.f('ix_battles_winner_id'), table_name='battles')
+    op.drop_index(op.f('ix_player_monsters_player_id'), table_name='player_monsters')
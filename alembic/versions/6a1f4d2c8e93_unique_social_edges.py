@@ -0,0 +1,44 @@
+"""unique friend and rival edges
+
+Revision ID: 6a1f4d2c8e93
+Revises: 3c8e5f1a7d24
+Create Date: 2026-10-18 23:04:51.227310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_utils import rebuild_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1f4d2c8e93'
+down_revision: Union[str, None] = '3c8e5f1a7d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EDGES = (
+    ('friend_association', 'friend_id'),
+    ('rival_association', 'rival_id'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, other_column in EDGES:
+        # Keep the first copy of every edge added twice before the constraint existed
+        op.execute(
+            f"DELETE FROM {table} WHERE rowid NOT IN "
+            f"(SELECT MIN(rowid) FROM {table} GROUP BY player_id, {other_column})"
+        )
+        with rebuild_table(table) as batch_op:
+            batch_op.create_unique_constraint(f'uq_{table}_player_id_{other_column}', ['player_id', other_column])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, other_column in reversed(EDGES):
+        with rebuild_table(table) as batch_op:
+            batch_op.drop_constraint(f'uq_{table}_player_id_{other_column}', type_='unique')
@@ -0,0 +1,48 @@
+"""add player_stats counters
+
+Revision ID: 9f2c4e6a8b13
+Revises: 5b3e9c1d7a20
+Create Date: 2026-10-18 11:03:27.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f2c4e6a8b13'
+down_revision: Union[str, None] = '5b3e9c1d7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('player_stats',
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('catches', sa.Integer(), nullable=False),
+    sa.Column('legendary_catches', sa.Integer(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+    sa.PrimaryKeyConstraint('player_id')
+    )
+
+    # Seed the counters from existing history
+    op.execute("""
+        INSERT INTO player_stats (player_id, catches, legendary_catches, wins)
+        SELECT
+            p.id,
+            (SELECT COUNT(*) FROM player_monsters pm WHERE pm.player_id = p.id),
+            (SELECT COUNT(*) FROM player_monsters pm
+                JOIN monster_species ms ON ms.id = pm.species_id
+                WHERE pm.player_id = p.id AND LOWER(ms.rarity) = 'legendary'),
+            (SELECT COUNT(*) FROM battles b WHERE b.winner_id = p.id)
+        FROM players p
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('player_stats')
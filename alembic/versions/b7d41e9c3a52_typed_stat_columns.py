@@ -0,0 +1,70 @@
+"""typed stat columns
+
+Revision ID: b7d41e9c3a52
+Revises: f3a9c2d18b47
+Create Date: 2026-10-18 16:12:05.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
+
+from migration_utils import add_missing_columns, backfill, has_column, rebuild_table
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e9c3a52'
+down_revision: Union[str, None] = 'f3a9c2d18b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATS = ('hp', 'attack', 'defense', 'speed')
+
+
+def _from_json(json_column, prefix=''):
+    return ", ".join(f"{prefix}{stat} = json_extract({json_column}, '$.{stat}')" for stat in STATS)
+
+
+def _to_json(json_column, prefix=''):
+    pairs = ", ".join(f"'{stat}', {prefix}{stat}" for stat in STATS)
+    return f"{json_column} = CASE WHEN {prefix}hp IS NULL THEN NULL ELSE json_object({pairs}) END"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    add_missing_columns('monster_species', *(sa.Column(f'base_{stat}', sa.Integer(), nullable=True) for stat in STATS))
+    add_missing_columns(
+        'player_monsters',
+        *(sa.Column(stat, sa.Integer(), nullable=True) for stat in STATS),
+        sa.Column('current_hp', sa.Integer(), nullable=True),
+    )
+
+    # Each table is backfilled, then rebuilt without its JSON column; the
+    # has_column checks let a run that stopped halfway pick up again
+    if has_column('monster_species', 'base_stats'):
+        backfill('monster_species', _from_json('base_stats', 'base_'))
+        with rebuild_table('monster_species') as batch_op:
+            batch_op.drop_column('base_stats')
+    if has_column('player_monsters', 'current_stats'):
+        backfill('player_monsters', _from_json('current_stats'))
+        with rebuild_table('player_monsters') as batch_op:
+            batch_op.drop_column('current_stats')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    add_missing_columns('monster_species', sa.Column('base_stats', sqlite.JSON(), nullable=True))
+    add_missing_columns('player_monsters', sa.Column('current_stats', sqlite.JSON(), nullable=True))
+
+    if has_column('player_monsters', 'hp'):
+        backfill('player_monsters', _to_json('current_stats'))
+        with rebuild_table('player_monsters') as batch_op:
+            batch_op.drop_column('current_hp')
+            for stat in reversed(STATS):
+                batch_op.drop_column(stat)
+    if has_column('monster_species', 'base_hp'):
+        backfill('monster_species', _to_json('base_stats', 'base_'))
+        with rebuild_table('monster_species') as batch_op:
+            for stat in reversed(STATS):
+                batch_op.drop_column(f'base_{stat}')
@@ -0,0 +1,38 @@
+"""add collection_size and leaderboard indexes
+
+Revision ID: c41d7e2f9a06
+Revises: 9f2c4e6a8b13
+Create Date: 2026-10-18 12:20:09.318455
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e2f9a06'
+down_revision: Union[str, None] = '9f2c4e6a8b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('player_stats', sa.Column('collection_size', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE player_stats SET collection_size = (
+            SELECT COUNT(*) FROM player_monsters pm WHERE pm.player_id = player_stats.player_id
+        )
+    """)
+    op.create_index(op.f('ix_player_stats_wins'), 'player_stats', ['wins'], unique=False)
+    op.create_index(op.f('ix_player_stats_collection_size'), 'player_stats', ['collection_size'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_player_stats_collection_size'), table_name='player_stats')
+    op.drop_index(op.f('ix_player_stats_wins'), table_name='player_stats')
+    with op.batch_alter_table('player_stats') as batch_op:
+        batch_op.drop_column('collection_size')
@@ -0,0 +1,34 @@
+"""add collection browser indexes
+
+Revision ID: e8a5b0f3c217
+Revises: c41d7e2f9a06
+Create Date: 2026-10-18 13:41:52.006218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a5b0f3c217'
+down_revision: Union[str, None] = 'c41d7e2f9a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_player_monsters_player_level', 'player_monsters', ['player_id', 'level'], unique=False)
+    op.create_index('ix_player_monsters_player_caught_at', 'player_monsters', ['player_id', 'caught_at'], unique=False)
+    op.create_index('ix_player_monsters_player_species', 'player_monsters', ['player_id', 'species_id'], unique=False)
+    op.create_index('ix_player_monsters_player_nickname', 'player_monsters', ['player_id', 'nickname'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_player_monsters_player_nickname', table_name='player_monsters')
+    op.drop_index('ix_player_monsters_player_species', table_name='player_monsters')
+    op.drop_index('ix_player_monsters_player_caught_at', table_name='player_monsters')
+    op.drop_index('ix_player_monsters_player_level', table_name='player_monsters')
@@ -0,0 +1,47 @@
+"""add trade offers
+
+Revision ID: f3a9c2d18b47
+Revises: e8a5b0f3c217
+Create Date: 2026-10-18 15:02:37.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c2d18b47'
+down_revision: Union[str, None] = 'e8a5b0f3c217'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('trade_offers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('monster_id', sa.Integer(), nullable=False),
+    sa.Column('species_id', sa.Integer(), nullable=False),
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('wanted_species_id', sa.Integer(), nullable=True),
+    sa.Column('wanted_min_level', sa.Integer(), nullable=True),
+    sa.Column('wanted_max_level', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['monster_id'], ['player_monsters.id'], ),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+    sa.ForeignKeyConstraint(['species_id'], ['monster_species.id'], ),
+    sa.ForeignKeyConstraint(['wanted_species_id'], ['monster_species.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('monster_id'),
+    sqlite_autoincrement=True
+    )
+    op.create_index(op.f('ix_trade_offers_player_id'), 'trade_offers', ['player_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_trade_offers_player_id'), table_name='trade_offers')
+    op.drop_table('trade_offers')
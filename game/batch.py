@@ -0,0 +1,467 @@
+# Non-interactive batch mode for load testing and automation.
+#
+#   python main.py --script session.txt --out results.jsonl
+#   python main.py --script - < commands.jsonl
+#
+# A script has one command per line, either as plain words
+#
+#   login Alice
+#   explore catch
+#   battle_player Bob
+#
+# or as a JSON object: {"command": "battle_player", "args": ["Bob"]}.
+# Blank lines and lines starting with # are skipped. Commands call game_logic
+# directly (no screen clears, no prompts) and each one writes a JSON result
+# line with its status, a structured result, the game's printed output and
+# its query count.
+
+import contextlib
+import io
+import json
+import random
+import shlex
+import sys
+import threading
+import time
+
+from game.cli_helpers import get_random_species
+from game.instrumentation import instrument_engine, track_action
+from game.models import MonsterSpecies, Player, PlayerMonster
+from game.game_logic.battle import ai_battle, gym_battle, player_battle, wild_battle
+from game.game_logic.catching import attempt_catch
+from game.game_logic.collections import browse_collection, load_player_monsters, strongest_monsters
+from game.game_logic.leaderboards import SCOPED_BOARDS, SCOPES, scoped_leaderboard
+from game.game_logic.marketplace import cancel_offer, player_offers, post_offer
+from game.game_logic.outcome import Outcome
+from game.game_logic.player import create_player, login_player
+from game.game_logic.player_stats import get_player_stats
+from game.game_logic.social_graph import get_social_graph
+from game.game_logic.trade_social import (
+    add_friend,
+    add_rival,
+    get_battle_wins_leaderboard,
+    get_collection_leaderboard,
+    get_rank,
+    show_leaderboards,
+    trade_monster,
+)
+
+AI_TEAM_SIZE = 3
+
+_capture = threading.local()
+_install_lock = threading.Lock()
+
+
+class BatchError(Exception):
+    """
+    A command that cannot run (bad arguments, not logged in, unknown player...).
+    """
+
+
+class BatchState:
+    def __init__(self):
+        self.player = None
+
+    def require_player(self) -> Player:
+        if self.player is None:
+            raise BatchError("not logged in")
+        return self.player
+
+
+class _ThreadLocalStdout:
+    """
+    Stand-in for sys.stdout that sends each thread's writes to that thread's
+    capture buffer, or to the real stream when it is not capturing.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        return (getattr(_capture, "buffer", None) or self.stream).write(text)
+
+    def flush(self):
+        (getattr(_capture, "buffer", None) or self.stream).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+@contextlib.contextmanager
+def capture_output():
+    """
+    Captures what this thread prints. Unlike contextlib.redirect_stdout it is
+    safe to use from several worker threads at once.
+    """
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadLocalStdout):
+            sys.stdout = _ThreadLocalStdout(sys.stdout)
+    outer = getattr(_capture, "buffer", None)
+    buffer = _capture.buffer = io.StringIO()
+    try:
+        yield buffer
+    finally:
+        _capture.buffer = outer
+
+
+def _find_player(session, name) -> Player:
+    player = session.query(Player).filter_by(name=name).first()
+    if not player:
+        raise BatchError(f"no player named '{name}'")
+    return player
+
+
+def _player_summary(player) -> dict:
+    return {"id": player.id, "name": player.name, "level": player.level, "xp": player.xp, "money": player.money}
+
+
+# --- Commands ---
+# Each takes (session, state, *args) and returns an Outcome or a
+# JSON-serialisable result.
+
+def cmd_create_player(session, state, name):
+    player = create_player(session, name)
+    if not player:
+        raise BatchError(f"username '{name}' already taken")
+    state.player = player
+    return _player_summary(player)
+
+
+def cmd_login(session, state, name):
+    player = login_player(session, name)
+    if not player:
+        raise BatchError(f"no player named '{name}'")
+    state.player = player
+    return _player_summary(player)
+
+
+def cmd_logout(session, state):
+    state.player = None
+    return None
+
+
+def cmd_explore(session, state, action="leave"):
+    player = state.require_player()
+    if action not in ("catch", "leave"):
+        raise BatchError("usage: explore [catch|leave]")
+
+    species = get_random_species(session)
+    if action == "catch":
+        outcome = attempt_catch(session, player, species)
+    else:
+        outcome = Outcome("explore", species=species.name, rarity=species.rarity).say("You let the monster go.")
+    outcome.events.insert(0, f"A wild {species.name} appeared!")
+    return outcome
+
+
+def cmd_catch(session, state):
+    return cmd_explore(session, state, "catch")
+
+
+def cmd_collection(session, state, sort="level", limit="20"):
+    player = state.require_player()
+    try:
+        page = browse_collection(session, player.id, sort=sort, limit=int(limit))
+    except ValueError as e:
+        raise BatchError(str(e))
+    return page
+
+
+def cmd_strongest(session, state, stat="attack", limit="10"):
+    try:
+        return strongest_monsters(session, stat=stat, limit=int(limit))
+    except ValueError as e:
+        raise BatchError(str(e))
+
+
+def cmd_battle_wild(session, state):
+    player = state.require_player()
+    species = get_random_species(session)
+    outcome = wild_battle(session, player, species)
+    outcome.events.insert(0, f"A wild {species.name} appeared!")
+    return outcome
+
+
+def cmd_battle_ai(session, state):
+    player = state.require_player()
+    team = load_player_monsters(session, player.id)[:AI_TEAM_SIZE]
+    if not team:
+        raise BatchError("no monsters to battle with")
+    return ai_battle(session, player, team)
+
+
+def cmd_battle_player(session, state, opponent_name):
+    player = state.require_player()
+    opponent = _find_player(session, opponent_name)
+    return player_battle(session, player, opponent)
+
+
+def cmd_battle(session, state, opponent_name=None):
+    if opponent_name is None:
+        return cmd_battle_ai(session, state)
+    return cmd_battle_player(session, state, opponent_name)
+
+
+def cmd_trade(session, state, target_name, monster_id):
+    player = state.require_player()
+    target = _find_player(session, target_name)
+    monster = session.get(PlayerMonster, int(monster_id))
+    if not monster or monster.player_id != player.id:
+        raise BatchError(f"you don't own monster {monster_id}")
+    return trade_monster(session, player, target, monster)
+
+
+def cmd_offer(session, state, monster_id, species="any", min_level=None, max_level=None):
+    player = state.require_player()
+    wanted_species_id = None
+    if species != "any":
+        wanted = session.query(MonsterSpecies).filter_by(name=species).first()
+        if not wanted:
+            raise BatchError(f"no species named '{species}'")
+        wanted_species_id = wanted.id
+    return post_offer(
+        session, player, int(monster_id), wanted_species_id,
+        int(min_level) if min_level not in (None, "any") else None,
+        int(max_level) if max_level not in (None, "any") else None,
+    )
+
+
+def cmd_cancel_offer(session, state, offer_id):
+    return cancel_offer(session, state.require_player(), int(offer_id))
+
+
+def cmd_offers(session, state):
+    return player_offers(session, state.require_player())
+
+
+def cmd_gym(session, state):
+    return gym_battle(session, state.require_player())
+
+
+def cmd_profile(session, state):
+    player = state.require_player()
+    stats = get_player_stats(session, player.id)
+    return {
+        **_player_summary(player),
+        "catches": stats.catches,
+        "wins": stats.wins,
+        "collection_size": stats.collection_size,
+    }
+
+
+def cmd_achievements(session, state):
+    player = state.require_player()
+    return [pa.achievement.achievement_name for pa in player.achievements]
+
+
+def cmd_friends(session, state):
+    player = state.require_player()
+    return {"friends": [f.name for f in player.friends], "rivals": [r.name for r in player.rivals]}
+
+
+def _social_target(session, player, name, relation) -> Player:
+    other = _find_player(session, name)
+    if other.id == player.id:
+        raise BatchError(f"can't be your own {relation}")
+    return other
+
+
+def cmd_add_friend(session, state, name):
+    player = state.require_player()
+    friend = _social_target(session, player, name, "friend")
+    return {"friend": friend.name, "added": add_friend(session, player, name)}
+
+
+def cmd_add_rival(session, state, name):
+    player = state.require_player()
+    rival = _social_target(session, player, name, "rival")
+    return {"rival": rival.name, "added": add_rival(session, player, name)}
+
+
+def cmd_mutual_friends(session, state, name):
+    player = state.require_player()
+    other = _find_player(session, name)
+    mutual = get_social_graph(session).mutual_friends(player.id, other.id)
+    names = dict(session.query(Player.id, Player.name).filter(Player.id.in_(mutual)).all()) if mutual else {}
+    return {"count": len(mutual), "friends": [names.get(player_id) for player_id in mutual]}
+
+
+def cmd_recommend_friends(session, state, limit="10"):
+    player = state.require_player()
+    recommended = get_social_graph(session).recommend_friends(player.id, int(limit))
+    names = dict(
+        session.query(Player.id, Player.name).filter(Player.id.in_([player_id for player_id, _ in recommended])).all()
+    ) if recommended else {}
+    return [{"name": names.get(player_id), "mutual_friends": count} for player_id, count in recommended]
+
+
+def cmd_separation(session, state, name):
+    player = state.require_player()
+    other = _find_player(session, name)
+    return {"degrees": get_social_graph(session).degrees_of_separation(player.id, other.id)}
+
+
+def cmd_leaderboard(session, state, limit="10", scope="global"):
+    player = state.player
+    if scope in SCOPES:
+        player = state.require_player()
+        result = {"rank": {}}
+        for board in SCOPED_BOARDS:
+            result[board], result["rank"][board] = scoped_leaderboard(session, player.id, scope, board, int(limit))
+        return result
+    if scope != "global":
+        raise BatchError(f"unknown scope '{scope}' (global, {', '.join(SCOPES)})")
+
+    show_leaderboards(session, player, pause=False)
+    result = {
+        "wins": get_battle_wins_leaderboard(session, int(limit)),
+        "collection": get_collection_leaderboard(session, int(limit)),
+    }
+    if player:
+        result["rank"] = {board: get_rank(session, player.id, board) for board in ("wins", "collection")}
+    return result
+
+
+COMMANDS = {
+    "create_player": cmd_create_player,
+    "login": cmd_login,
+    "logout": cmd_logout,
+    "explore": cmd_explore,
+    "catch": cmd_catch,
+    "collection": cmd_collection,
+    "strongest": cmd_strongest,
+    "battle": cmd_battle,
+    "battle_wild": cmd_battle_wild,
+    "battle_ai": cmd_battle_ai,
+    "battle_player": cmd_battle_player,
+    "trade": cmd_trade,
+    "offer": cmd_offer,
+    "cancel_offer": cmd_cancel_offer,
+    "offers": cmd_offers,
+    "gym": cmd_gym,
+    "profile": cmd_profile,
+    "achievements": cmd_achievements,
+    "friends": cmd_friends,
+    "add_friend": cmd_add_friend,
+    "add_rival": cmd_add_rival,
+    "mutual_friends": cmd_mutual_friends,
+    "recommend_friends": cmd_recommend_friends,
+    "separation": cmd_separation,
+    "leaderboard": cmd_leaderboard,
+}
+
+
+def parse_command(line: str):
+    """
+    (command, args) for one script line, or None for blanks and comments.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        data = json.loads(line)
+        return data["command"], [str(arg) for arg in data.get("args", [])]
+    words = shlex.split(line)
+    return words[0], words[1:]
+
+
+def run_command(session, state, command, args) -> dict:
+    """
+    Runs one command, capturing what it prints. Never raises for game errors;
+    failures come back with ok = False and the session rolled back.
+    """
+    result = {"command": command, "args": args, "ok": True, "result": None, "error": None}
+    with track_action(f"batch.{command}", emit=False) as stats, capture_output() as output:
+        try:
+            handler = COMMANDS.get(command)
+            if handler is None:
+                raise BatchError(f"unknown command '{command}'")
+            try:
+                value = handler(session, state, *args)
+            except TypeError as e:
+                if e.__traceback__.tb_next is not None:
+                    raise
+                raise BatchError(f"wrong number of arguments for '{command}'")
+            if isinstance(value, Outcome):
+                events = value.events
+                value = value.to_dict()
+                del value["events"]
+                if not value["ok"]:
+                    raise BatchError(events[-1])
+            else:
+                events = []
+            result["result"] = value
+        except BatchError as e:
+            result.update(ok=False, error=str(e))
+        except Exception as e:
+            session.rollback()
+            result.update(ok=False, error=f"{type(e).__name__}: {e}")
+
+    result["player"] = state.player.name if state.player else None
+    result["output"] = output.getvalue().splitlines()
+    if result["ok"]:
+        result["output"].extend("\n".join(events).splitlines())
+    result["wall_ms"] = round(stats.wall_time * 1000, 3)
+    result["queries"] = stats.queries
+    return result
+
+
+def run_batch(session, lines, out, fail_fast=False) -> dict:
+    """
+    Runs every command in `lines`, writing one JSON result per line to `out`.
+    Returns a summary with command and failure counts.
+    """
+    instrument_engine(session.get_bind())
+    state = BatchState()
+    summary = {"commands": 0, "failed": 0}
+    started = time.perf_counter()
+
+    for number, line in enumerate(lines, 1):
+        try:
+            parsed = parse_command(line)
+        except (ValueError, KeyError) as e:
+            result = {"command": None, "args": [], "ok": False, "result": None,
+                      "error": f"unparseable line: {e}", "player": state.player.name if state.player else None,
+                      "output": [], "wall_ms": 0.0, "queries": 0}
+        else:
+            if parsed is None:
+                continue
+            if parsed[0] == "exit":
+                break
+            result = run_command(session, state, *parsed)
+
+        result["line"] = number
+        summary["commands"] += 1
+        if not result["ok"]:
+            summary["failed"] += 1
+        out.write(json.dumps(result, default=str) + "\n")
+        if fail_fast and not result["ok"]:
+            break
+
+    summary["wall_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return summary
+
+
+def run_scripts(session, paths, out_path=None, fail_fast=False, seed=None) -> int:
+    """
+    Runs each script ('-' is stdin) with a fresh, logged-out state.
+    Returns a process exit code: 1 if any command failed.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    out = open(out_path, "w") if out_path else sys.stdout
+    failed = 0
+    try:
+        for path in paths:
+            with (contextlib.nullcontext(sys.stdin) if path == "-" else open(path)) as lines:
+                summary = run_batch(session, lines, out, fail_fast)
+            failed += summary["failed"]
+            print(f"{path}: {summary['commands']} commands, {summary['failed']} failed, "
+                  f"{summary['wall_ms']:.1f} ms", file=sys.stderr)
+            if fail_fast and summary["failed"]:
+                break
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
@@ -0,0 +1,262 @@
+# Benchmark harness for the hot game actions.
+#
+#   python -m game.benchmark --sizes 1000,100000,1000000 --iterations 200 --out bench.json
+#   python -m game.benchmark --sizes 1000 --baseline bench.json    # exits 1 on regressions
+#
+# Each size is a monster count. A template database is bulk-seeded once per size
+# (kept in --workdir and reused on later runs), then copied so every run starts
+# from the same data. Output is suppressed while timing; latency percentiles
+# and per-call query/commit counts are reported and saved as JSON.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from game.bulk_seed import bulk_seed
+from game.database import make_engine
+from game.instrumentation import instrument_engine, track_action
+from game.models import MonsterSpecies, Player, PlayerMonster
+from game.game_logic.achievements import check_and_unlock_achievements, invalidate_achievement_index
+from game.game_logic.battle import battle_vs_ai, resolve_battle_player
+from game.game_logic.catching import catch_monster
+from game.game_logic.collections import get_player_collection
+from game.game_logic.encounters import invalidate_encounter_tables
+from game.game_logic.social_graph import invalidate_social_graph
+from game.game_logic.stat_table import invalidate_stat_table
+from game.game_logic.leveling import add_xp_to_monster
+from game.game_logic.trade_social import accept_trade, get_collection_leaderboard, propose_trade
+from game.game_logic.type_chart import invalidate_type_chart
+
+MONSTERS_PER_PLAYER = (2, 4)
+DEFAULT_SIZES = "1000,100000,1000000"
+
+
+class Fixture:
+    """
+    Random picks from the seeded database for benchmark setups.
+    """
+
+    def __init__(self, session, rng):
+        self.rng = rng
+        self.max_player_id = session.query(func.max(Player.id)).scalar()
+        self.max_monster_id = session.query(func.max(PlayerMonster.id)).scalar()
+        self.species_ids = [species_id for (species_id,) in session.query(MonsterSpecies.id)]
+
+    def player(self, session):
+        return session.get(Player, self.rng.randint(1, self.max_player_id))
+
+    def two_players(self, session):
+        first, second = self.rng.sample(range(1, self.max_player_id + 1), 2)
+        return session.get(Player, first), session.get(Player, second)
+
+    def monster_id(self):
+        return self.rng.randint(1, self.max_monster_id)
+
+
+def _setup_catch(session, fx):
+    return fx.player(session).id, fx.rng.choice(fx.species_ids)
+
+
+def _setup_battle_vs_ai(session, fx):
+    player = fx.player(session)
+    return player, player.monsters[:3]
+
+
+def _setup_xp(session, fx):
+    return fx.monster_id(), fx.rng.randint(10, 500)
+
+
+def _setup_achievements(session, fx):
+    return fx.player(session), fx.rng.choice(["catch", "battle_ai"])
+
+
+def _setup_trade(session, fx):
+    monster = session.get(PlayerMonster, fx.monster_id())
+    receiver = fx.player(session)
+    while receiver.id == monster.player_id:
+        receiver = fx.player(session)
+    return (propose_trade(session, monster.player_id, receiver.id, monster.id).id,)
+
+
+# name -> (setup(session, fixture) -> args, function(session, *args)). Only the function is timed.
+BENCHMARKS = {
+    "catch_monster": (_setup_catch, catch_monster),
+    "battle_vs_ai": (_setup_battle_vs_ai, battle_vs_ai),
+    "resolve_battle_player": (lambda session, fx: fx.two_players(session), resolve_battle_player),
+    "add_xp_to_monster": (_setup_xp, add_xp_to_monster),
+    "check_and_unlock_achievements": (_setup_achievements, check_and_unlock_achievements),
+    "get_collection_leaderboard": (lambda session, fx: (), get_collection_leaderboard),
+    "accept_trade": (_setup_trade, accept_trade),
+    "get_player_collection": (lambda session, fx: (fx.player(session).id,), get_player_collection),
+}
+
+
+def invalidate_caches():
+    """
+    Drops every process-wide cache so the next size starts cold against its own database.
+    """
+    invalidate_type_chart()
+    invalidate_encounter_tables()
+    invalidate_achievement_index()
+    invalidate_social_graph()
+    invalidate_stat_table()
+
+
+def prepare_database(workdir, size, seed) -> str:
+    """
+    Returns the path of a fresh copy of the seeded template database for this size.
+    """
+    template = os.path.join(workdir, f"bench_{size}.db")
+    if not os.path.exists(template):
+        low, high = MONSTERS_PER_PLAYER
+        players = max(2, size * 2 // (low + high))
+        engine = make_engine(f"sqlite:///{template}", "benchmark")
+        with contextlib.redirect_stdout(io.StringIO()):
+            bulk_seed(engine, players, low, high, battles=size, trades=size // 10,
+                      friendships=size, seed=seed, workers=os.cpu_count() or 1, reset=True)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        engine.dispose()
+
+    working = os.path.join(workdir, f"bench_{size}_run.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(working + suffix):
+            os.remove(working + suffix)
+    shutil.copyfile(template, working)
+    return working
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_benchmark(session, fixture, name, iterations) -> dict:
+    setup, run = BENCHMARKS[name]
+    timings = []
+    queries = 0
+    commits = 0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(iterations):
+            args = setup(session, fixture)
+            session.commit()
+            with track_action(name, emit=False) as stats:
+                started = time.perf_counter()
+                run(session, *args)
+                timings.append(time.perf_counter() - started)
+            queries += stats.queries
+            commits += stats.commits
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50) * 1000, 4),
+        "p95_ms": round(percentile(timings, 95) * 1000, 4),
+        "p99_ms": round(percentile(timings, 99) * 1000, 4),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 4),
+        "queries_per_call": round(queries / iterations, 2),
+        "commits_per_call": round(commits / iterations, 2),
+    }
+
+
+def run_size(workdir, size, names, iterations, seed) -> dict:
+    path = prepare_database(workdir, size, seed)
+    engine = make_engine(f"sqlite:///{path}", "benchmark")
+    instrument_engine(engine)
+    invalidate_caches()
+    random.seed(seed)
+
+    session = sessionmaker(bind=engine)()
+    fixture = Fixture(session, random.Random(seed))
+    results = {}
+    try:
+        for name in names:
+            results[name] = run_benchmark(session, fixture, name, iterations)
+            print(f"  {name:<32} p50 {results[name]['p50_ms']:>9.3f} ms   "
+                  f"p95 {results[name]['p95_ms']:>9.3f} ms   "
+                  f"p99 {results[name]['p99_ms']:>9.3f} ms   "
+                  f"{results[name]['queries_per_call']:>6} q/call")
+    finally:
+        session.close()
+        engine.dispose()
+    return results
+
+
+def compare(results, baseline, tolerance) -> list:
+    """
+    Regressions against a baseline: p95 latency or queries per call up by
+    more than `tolerance` (a fraction).
+    """
+    regressions = []
+    for size, benchmarks in results.items():
+        for name, current in benchmarks.items():
+            previous = baseline.get(size, {}).get(name)
+            if not previous:
+                continue
+            if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{name} @ {size}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+            if current["queries_per_call"] > previous["queries_per_call"] * (1 + tolerance):
+                regressions.append(
+                    f"{name} @ {size}: queries/call {previous['queries_per_call']} -> {current['queries_per_call']}"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot game actions against seeded databases")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated monster counts")
+    parser.add_argument("--benchmarks", default=",".join(BENCHMARKS), help="comma-separated benchmark names")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default="benchmarks", help="where seeded databases are kept")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this results JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 / queries-per-call increase vs baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = [name for name in args.benchmarks.split(",") if name]
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    os.makedirs(args.workdir, exist_ok=True)
+
+    results = {}
+    for size in sizes:
+        print(f"\n📏 {size:,} monsters")
+        results[str(size)] = run_size(args.workdir, size, names, args.iterations, args.seed)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "created_at": datetime.utcnow().isoformat(),
+                "iterations": args.iterations,
+                "seed": args.seed,
+                "results": results,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        if regressions:
+            print("\n❗ Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+# Bulk seeder for load-test databases.
+#
+#   python -m game.bulk_seed --players 100000 --battles 500000 --trades 50000 \
+#       --friendships 200000 --workers 4 --seed 42
+#
+# Rows go in through Core executemany inserts, one transaction per chunk.
+# Every chunk draws from its own RNG derived from --seed, so the same arguments
+# build the same database whatever --workers is set to. Workers only generate
+# rows; the parent process does all the writing, since SQLite has one writer.
+
+import argparse
+import random
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from game.database import Base, make_engine
+from game.models import (
+    STAT_NAMES, Achievement, Battle, MonsterSpecies, Player, PlayerMonster, PlayerStats, Stats, Trade, Type,
+    friend_association, rival_association,
+)
+from game.game_logic.stat_table import StatTable
+from game.seed import ACHIEVEMENTS, PREDEFINED_MONSTERS, TYPES, fake
+
+EPOCH = datetime(2025, 1, 1)
+HISTORY_SECONDS = 365 * 24 * 3600
+NAME_POOL_SIZE = 1000
+
+
+def chunk_rng(seed, kind, index) -> random.Random:
+    return random.Random(f"{seed}:{kind}:{index}")
+
+
+def name_pool(seed) -> list:
+    """
+    First names drawn once; players get name + id, so no Faker.unique bookkeeping.
+    """
+    fake.seed_instance(seed)
+    return [fake.first_name() for _ in range(NAME_POOL_SIZE)]
+
+
+def chunks(first_id, total, chunk_size):
+    for index, start in enumerate(range(0, total, chunk_size)):
+        yield index, first_id + start, min(chunk_size, total - start)
+
+
+def ordered_map(fn, jobs, workers, initializer=None, initargs=()):
+    """
+    Ordered map over jobs; with workers, keeps at most two chunks per
+    worker in flight so generated rows never pile up in memory.
+    `initializer(*initargs)` runs once per worker (or once in-process).
+    """
+    if workers <= 1:
+        if initializer:
+            initializer(*initargs)
+        yield from map(fn, jobs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(fn, job))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# --- Row generators (run in worker processes) ---
+
+def generate_player_chunk(job) -> tuple:
+    """
+    Players and their monsters for one chunk. Monster rows carry no id yet;
+    the writer assigns ids in order.
+    """
+    seed, index, first_id, count, min_monsters, max_monsters, species, stat_table, names = job
+    rng = chunk_rng(seed, "players", index)
+
+    players = []
+    monsters = []
+    for player_id in range(first_id, first_id + count):
+        level = rng.randint(1, 10)
+        players.append({
+            "id": player_id,
+            "name": f"{rng.choice(names)}{player_id}",
+            "level": level,
+            "xp": rng.randint(0, level * 20),
+            "money": rng.randint(50, 200),
+        })
+
+        for _ in range(rng.randint(min_monsters, max_monsters)):
+            species_id, name, legendary = rng.choice(species)
+            mon_level = max(1, level + rng.randint(-2, 2))
+            monsters.append({
+                "player_id": player_id,
+                "species_id": species_id,
+                "nickname": name,
+                "level": mon_level,
+                "xp": 0,
+                **dict(zip(STAT_NAMES, stat_table.row(species_id, mon_level))),
+                "caught_at": EPOCH + timedelta(seconds=rng.randrange(HISTORY_SECONDS)),
+                "legendary": legendary,
+            })
+    return players, monsters
+
+
+def generate_battle_chunk(job) -> list:
+    seed, index, first_id, count, first_player_id, last_player_id = job
+    rng = chunk_rng(seed, "battles", index)
+
+    battles = []
+    for battle_id in range(first_id, first_id + count):
+        player1_id = rng.randint(first_player_id, last_player_id)
+        player2_id = rng.randint(first_player_id, last_player_id - 1)
+        if player2_id >= player1_id:
+            player2_id += 1
+        battles.append({
+            "id": battle_id,
+            "player1_id": player1_id,
+            "player2_id": player2_id,
+            "winner_id": player1_id if rng.random() < 0.5 else player2_id,
+            "created_at": EPOCH + timedelta(seconds=rng.randrange(HISTORY_SECONDS)),
+        })
+    return battles
+
+
+def generate_edge_chunk(job) -> list:
+    """
+    count distinct edges whose source is in [first_source, last_source];
+    targets can be any other player. Chunks own disjoint source ranges, so
+    no pair is generated twice across the run.
+    """
+    seed, kind, index, count, first_source, last_source, first_player_id, last_player_id, other_column = job
+    rng = chunk_rng(seed, kind, index)
+    n_players = last_player_id - first_player_id + 1
+    count = min(count, (last_source - first_source + 1) * (n_players - 1))
+
+    edges = set()
+    while len(edges) < count:
+        player_id = rng.randint(first_source, last_source)
+        other_id = rng.randint(first_player_id, last_player_id - 1)
+        if other_id >= player_id:
+            other_id += 1
+        edges.add((player_id, other_id))
+    return [{"player_id": player_id, other_column: other_id} for player_id, other_id in sorted(edges)]
+
+
+# --- Writer ---
+
+class BulkSeeder:
+    def __init__(self, engine, seed, chunk_size, workers):
+        self.engine = engine
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+    def _map(self, fn, jobs):
+        return ordered_map(fn, jobs, self.workers)
+
+    def _insert(self, table, rows):
+        if rows:
+            with self.engine.begin() as conn:
+                conn.execute(insert(table), rows)
+
+    def _next_id(self, column) -> int:
+        with self.engine.connect() as conn:
+            return (conn.execute(select(func.max(column))).scalar() or 0) + 1
+
+    def seed_reference_data(self):
+        with self.engine.begin() as conn:
+            if conn.execute(select(func.count(MonsterSpecies.id))).scalar():
+                return
+            conn.execute(insert(Type.__table__), [{"name": name} for name in TYPES])
+            type_ids = dict(conn.execute(select(Type.name, Type.id)).all())
+            conn.execute(insert(MonsterSpecies.__table__), [
+                {
+                    "name": monster["name"],
+                    "type_id": type_ids[monster["type"]],
+                    **{f"base_{name}": value for name, value in monster["base_stats"].items()},
+                    "base_level": 1,
+                    "rarity": monster["rarity"],
+                    "abilities": monster["abilities"],
+                }
+                for monster in PREDEFINED_MONSTERS
+            ])
+            conn.execute(insert(Achievement.__table__), ACHIEVEMENTS)
+
+    def seed_players(self, n_players, min_monsters, max_monsters) -> tuple:
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(
+                MonsterSpecies.id, MonsterSpecies.base_hp, MonsterSpecies.base_attack,
+                MonsterSpecies.base_defense, MonsterSpecies.base_speed,
+                MonsterSpecies.name, MonsterSpecies.rarity
+            )).all()
+        species = [(row.id, row.name, (row.rarity or "").lower() == "legendary") for row in rows]
+        stat_table = StatTable.from_base_stats({
+            row.id: Stats(row.base_hp, row.base_attack, row.base_defense, row.base_speed) for row in rows
+        })
+        names = name_pool(self.seed)
+        first_player_id = self._next_id(Player.id)
+        next_monster_id = self._next_id(PlayerMonster.id)
+        first_monster_id = next_monster_id
+
+        # Per-player counters for player_stats, indexed by player_id - first_player_id
+        collection = array('l', [0]) * n_players
+        legendary = array('l', [0]) * n_players
+        owners = array('l')
+
+        jobs = (
+            (self.seed, index, first_id, count, min_monsters, max_monsters, species, stat_table, names)
+            for index, first_id, count in chunks(first_player_id, n_players, self.chunk_size)
+        )
+        for players, monsters in self._map(generate_player_chunk, jobs):
+            for monster in monsters:
+                monster["id"] = next_monster_id
+                next_monster_id += 1
+                slot = monster["player_id"] - first_player_id
+                collection[slot] += 1
+                legendary[slot] += monster.pop("legendary")
+                owners.append(monster["player_id"])
+
+            with self.engine.begin() as conn:
+                conn.execute(insert(Player.__table__), players)
+                if monsters:
+                    conn.execute(insert(PlayerMonster.__table__), monsters)
+
+        return first_player_id, first_monster_id, collection, legendary, owners
+
+    def seed_battles(self, n_battles, first_player_id, n_players) -> array:
+        wins = array('l', [0]) * n_players
+        if n_players < 2:
+            return wins
+        last_player_id = first_player_id + n_players - 1
+        jobs = (
+            (self.seed, index, first_id, count, first_player_id, last_player_id)
+            for index, first_id, count in chunks(self._next_id(Battle.id), n_battles, self.chunk_size)
+        )
+        for battles in self._map(generate_battle_chunk, jobs):
+            for battle in battles:
+                wins[battle["winner_id"] - first_player_id] += 1
+            self._insert(Battle.__table__, battles)
+        return wins
+
+    def seed_trades(self, n_trades, first_monster_id, owners, first_player_id, n_players):
+        if not owners or n_players < 2:
+            return
+        last_player_id = first_player_id + n_players - 1
+        for index, first_id, count in chunks(self._next_id(Trade.id), n_trades, self.chunk_size):
+            rng = chunk_rng(self.seed, "trades", index)
+            trades = []
+            for trade_id in range(first_id, first_id + count):
+                slot = rng.randrange(len(owners))
+                sender_id = owners[slot]
+                receiver_id = rng.randint(first_player_id, last_player_id - 1)
+                if receiver_id >= sender_id:
+                    receiver_id += 1
+                trades.append({
+                    "id": trade_id,
+                    "sender_id": sender_id,
+                    "receiver_id": receiver_id,
+                    "monster_sent": first_monster_id + slot,
+                    "created_at": EPOCH + timedelta(seconds=rng.randrange(HISTORY_SECONDS)),
+                })
+            self._insert(Trade.__table__, trades)
+
+    def seed_edges(self, table, other_column, kind, n_edges, first_player_id, n_players):
+        if n_players < 2:
+            return
+        last_player_id = first_player_id + n_players - 1
+        n_edges = min(n_edges, n_players * (n_players - 1))
+        if not n_edges:
+            return
+        # Each chunk gets a range of source players with about chunk_size edges between them
+        sources_per_chunk = max(1, self.chunk_size * n_players // n_edges)
+        jobs = (
+            (self.seed, kind, index,
+             n_edges * (start + count) // n_players - n_edges * start // n_players,
+             first_player_id + start, first_player_id + start + count - 1,
+             first_player_id, last_player_id, other_column)
+            for index, start, count in chunks(0, n_players, sources_per_chunk)
+        )
+        for edges in self._map(generate_edge_chunk, jobs):
+            self._insert(table, edges)
+
+    def seed_player_stats(self, first_player_id, collection, legendary, wins):
+        for _, first_id, count in chunks(first_player_id, len(collection), self.chunk_size):
+            rows = []
+            for player_id in range(first_id, first_id + count):
+                slot = player_id - first_player_id
+                rows.append({
+                    "player_id": player_id,
+                    "catches": collection[slot],
+                    "legendary_catches": legendary[slot],
+                    "wins": wins[slot],
+                    "collection_size": collection[slot],
+                })
+            self._insert(PlayerStats.__table__, rows)
+
+
+def _timed(label, fn, *args):
+    print(f"Seeding {label}...")
+    started = time.perf_counter()
+    result = fn(*args)
+    print(f"  done in {time.perf_counter() - started:.1f}s")
+    return result
+
+
+def bulk_seed(engine, players, min_monsters=2, max_monsters=4, battles=0, trades=0,
+              friendships=0, rivals=0, seed=0, chunk_size=10000, workers=1, reset=False):
+    """
+    Builds a large deterministic database. Returns the number of monsters created.
+    """
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    seeder = BulkSeeder(engine, seed, chunk_size, workers)
+    seeder.seed_reference_data()
+    first_player_id, first_monster_id, collection, legendary, owners = _timed(
+        f"{players:,} players", seeder.seed_players, players, min_monsters, max_monsters
+    )
+    wins = _timed(f"{battles:,} battles", seeder.seed_battles, battles, first_player_id, players)
+    _timed(f"{trades:,} trades", seeder.seed_trades, trades, first_monster_id, owners, first_player_id, players)
+    _timed(f"{friendships:,} friendships", seeder.seed_edges,
+           friend_association, "friend_id", "friends", friendships, first_player_id, players)
+    _timed(f"{rivals:,} rivalries", seeder.seed_edges,
+           rival_association, "rival_id", "rivals", rivals, first_player_id, players)
+    _timed("player stats", seeder.seed_player_stats, first_player_id, collection, legendary, wins)
+    return len(owners)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-seed a large load-test database")
+    parser.add_argument("--db-url", help="database URL (defaults to the game database)")
+    parser.add_argument("--profile", default="benchmark", help="database profile (see game.database.PROFILES)")
+    parser.add_argument("--players", type=int, default=10000)
+    parser.add_argument("--min-monsters", type=int, default=2, help="monsters per player, lower bound")
+    parser.add_argument("--max-monsters", type=int, default=4, help="monsters per player, upper bound")
+    parser.add_argument("--battles", type=int, default=0)
+    parser.add_argument("--trades", type=int, default=0)
+    parser.add_argument("--friendships", type=int, default=0)
+    parser.add_argument("--rivals", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows per transaction")
+    parser.add_argument("--workers", type=int, default=1, help="row-generating processes")
+    parser.add_argument("--reset", action="store_true", help="drop all tables first")
+    args = parser.parse_args(argv)
+
+    engine = make_engine(args.db_url, args.profile)
+    started = time.perf_counter()
+    monsters = bulk_seed(
+        engine, args.players, args.min_monsters, args.max_monsters, args.battles, args.trades,
+        args.friendships, args.rivals, args.seed, args.chunk_size, args.workers, args.reset
+    )
+    print(f"Created {args.players:,} players and {monsters:,} monsters in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 import sys , os
-from game.game_logic.catching import catch_monster
+from game.game_logic.catching import attempt_catch
+from game.game_logic.outcome import render
 from game.cli_helpers import get_random_species, create_player_flow, login_player_flow
-from game.models import PlayerMonster, MonsterSpecies, Player
+from game.models import PlayerMonster, Player
 from game.game_logic.battle import resolve_battle_wild_monster, resolve_battle_player
 from game.game_logic.trade_social import resolve_trade_monsters,add_friend,add_rival,show_leaderboards
 from game.game_logic.battle import resolve_gym_challenge
-from game.game_logic.achievements import check_and_unlock_achievements
+from game.game_logic.collections import browse_collection, SORT_KEYS
+from game.instrumentation import instrument_engine, track_action
+
+COLLECTION_PAGE_SIZE = 20
 
 
 def display_main_menu():
@@ -30,7 +34,29 @@ def display_main_menu():
 ===========================================
 """)
 
+MENU_ACTIONS = {
+    '1': 'create_player',
+    '2': 'login',
+    '3': 'explore',
+    '4': 'view_collection',
+    '5': 'battle_wild',
+    '6': 'battle_player',
+    '7': 'trade',
+    '8': 'gym',
+    '9': 'view_profile',
+    '10': 'view_achievements',
+    '11': 'view_social_circle',
+    '12': 'add_friend',
+    '13': 'add_rival',
+    '14': 'leaderboard',
+    '15': 'exit',
+}
+
 def handle_menu_choice(choice, session, current_player):
+    with track_action(MENU_ACTIONS.get(choice, 'invalid')):
+        _handle_menu_choice(choice, session, current_player)
+
+def _handle_menu_choice(choice, session, current_player):
     if choice == '1':
         player = create_player_flow(session)
         if player:
@@ -71,7 +97,7 @@ def handle_menu_choice(choice, session, current_player):
             name = input("Enter the name of the rival to add: ").strip()
             add_rival(session, current_player[0], name)
         elif choice == '14':
-            show_leaderboards(session)
+            show_leaderboards(session, current_player[0])
 
 
     elif choice == '15':
@@ -89,25 +115,30 @@ def explore (session, player):
 
     choice = input("Do you want to try catching it? (y/n): ").strip().lower()
     if choice == 'y':
-        success = catch_monster(session, player.id, species.id)
-        if success:
-            print(f"🎉 You caught {species.name}!")
-            check_and_unlock_achievements(session, player, event_type='catch', event_data=species)
-        else:
-            print(f"{species.name} broke free!")
+        render(attempt_catch(session, player, species))
     else:
         print("You let the monster go.")
 
 def view_collection (session, player):
-    player_monsters = session.query(PlayerMonster).filter_by(player_id=player.id).all()
-    if not player_monsters:
+    sort = input(f"Sort by ({'/'.join(SORT_KEYS)}) [level]: ").strip().lower() or "level"
+    if sort not in SORT_KEYS:
+        print("Unknown sort, showing by level.")
+        sort = "level"
+
+    page = browse_collection(session, player.id, sort=sort, limit=COLLECTION_PAGE_SIZE)
+    if not page["monsters"]:
         print("❗You don’t have any monsters yet. Go explore!")
         return
 
     print(f"{player.name}'s Collection:")
-    for pm in player_monsters:
-        species = session.query(MonsterSpecies).filter_by(id=pm.species_id).first()
-        print(f"- {pm.nickname} (Species: {species.name}, Level: {pm.level})")
+    while True:
+        for pm in page["monsters"]:
+            print(f"- {pm['nickname']} (Species: {pm['species_name']}, Level: {pm['level']})")
+        if page["next"] is None:
+            break
+        if input("Press Enter for more, or q to stop: ").strip().lower() == "q":
+            break
+        page = browse_collection(session, player.id, sort=sort, after=page["next"], limit=COLLECTION_PAGE_SIZE)
 
 def battle_wild_monster(session, player):
     print("⚔️ Battling a wild monster...")
@@ -172,6 +203,7 @@ def clear_screen():
 
 def run_game_cli(session):
     current_player = [None]
+    instrument_engine(session.get_bind())
 
     while True:
         clear_screen()
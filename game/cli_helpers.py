@@ -1,11 +1,11 @@
-import random
 from game.models import MonsterSpecies
 from game.models import Player
 from game.game_logic.player import create_player, login_player
+from game.game_logic.encounters import get_encounter_table
 
-def get_random_species(session):
-    species_list = session.query(MonsterSpecies).all()
-    return random.choice(species_list)
+def get_random_species(session, weighted=False):
+    species_id = get_encounter_table(session, weighted).draw()
+    return session.get(MonsterSpecies, species_id)
 
 def create_player_flow(session):
     username = input("Choose a username: ").strip()
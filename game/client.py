@@ -0,0 +1,104 @@
+# Thin client for game.server.
+#
+#   python -m game.client --port 8765
+#   python -m game.client --unix /tmp/monsters.sock < script.txt
+#
+# Reads commands in the batch script syntax ("login Alice", "explore catch",
+# "battle Bob"), sends them to the server and prints the game's output.
+# --json prints the raw response lines instead.
+
+import argparse
+import json
+import socket
+import sys
+
+from game.batch import COMMANDS, parse_command
+from game.server import DEFAULT_HOST, DEFAULT_PORT
+
+
+class GameClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host, port))
+        self.stream = self.sock.makefile("rwb")
+        self.next_id = 1
+
+    def request(self, command, *args) -> dict:
+        """
+        Sends one command and waits for its response.
+        """
+        request = {"id": self.next_id, "command": command, "args": list(args)}
+        self.next_id += 1
+        self.stream.write(json.dumps(request).encode() + b"\n")
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        try:
+            self.stream.write(b'{"command": "exit"}\n')
+            self.stream.flush()
+        except OSError:
+            pass
+        self.stream.close()
+        self.sock.close()
+
+
+def render(response):
+    for line in response.get("output") or []:
+        print(line)
+    if not response["ok"]:
+        print(f"❗ {response['error']}")
+    elif not response.get("output") and response.get("result") is not None:
+        print(json.dumps(response["result"], indent=2, default=str))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play against a running game server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    parser.add_argument("--json", action="store_true", help="print raw JSON responses")
+    args = parser.parse_args(argv)
+
+    client = GameClient(args.host, args.port, args.unix)
+    interactive = sys.stdin.isatty()
+    if interactive:
+        print(f"Commands: {', '.join(COMMANDS)}, exit")
+
+    try:
+        while True:
+            if interactive:
+                print("> ", end="", flush=True)
+            line = sys.stdin.readline()
+            if not line:
+                break
+            try:
+                parsed = parse_command(line)
+            except (ValueError, KeyError) as e:
+                print(f"❗ Could not parse command: {e}")
+                continue
+            if parsed is None:
+                continue
+            command, command_args = parsed
+            if command in ("exit", "quit"):
+                break
+
+            response = client.request(command, *command_args)
+            if args.json:
+                print(json.dumps(response, default=str))
+            else:
+                render(response)
+    except (KeyboardInterrupt, ConnectionError):
+        pass
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
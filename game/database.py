@@ -1,8 +1,145 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import os
+from configparser import ConfigParser
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session as OrmSession, declarative_base, object_session, sessionmaker
+
+DEFAULT_URL = 'sqlite:///monsters.db'
+DEFAULT_PROFILE = 'fast'
+
+# Optional config file with a [database] section: url, profile and any PRAGMA override
+CONFIG_FILE = os.environ.get('MONSTERS_DB_CONFIG', 'monsters.ini')
+
+# Connection-time PRAGMAs per profile. cache_size < 0 is in KiB.
+PROFILES = {
+    # Every commit is fsynced; survives power loss
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    # WAL + NORMAL: commits are durable across app crashes, readers never block the writer
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # Throwaway load-test databases only: no fsync at all
+    'benchmark': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -262144,
+        'mmap_size': 1073741824,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+    },
+}
 
 Base = declarative_base()
-engine = create_engine('sqlite:///monsters.db')
+
+
+def load_database_config(path=CONFIG_FILE) -> dict:
+    """
+    Reads the [database] section of the config file, then applies
+    MONSTERS_DB_URL / MONSTERS_DB_PROFILE from the environment on top.
+    """
+    config = {}
+    parser = ConfigParser()
+    if parser.read(path) and parser.has_section('database'):
+        config.update(parser['database'])
+
+    if os.environ.get('MONSTERS_DB_URL'):
+        config['url'] = os.environ['MONSTERS_DB_URL']
+    if os.environ.get('MONSTERS_DB_PROFILE'):
+        config['profile'] = os.environ['MONSTERS_DB_PROFILE']
+    return config
+
+
+def sqlite_pragmas(profile=DEFAULT_PROFILE, **overrides) -> dict:
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown database profile '{profile}'. Choose from: {', '.join(PROFILES)}")
+    pragmas = dict(PROFILES[profile])
+    pragmas.update({name: value for name, value in overrides.items() if name in pragmas})
+    return pragmas
+
+
+def make_engine(url=None, profile=None, **overrides):
+    """
+    Creates an engine for the given URL and profile (defaulting to the config
+    file / environment), applying the profile's PRAGMAs on every new connection.
+    """
+    config = load_database_config()
+    url = url or config.pop('url', DEFAULT_URL)
+    profile = profile or config.pop('profile', DEFAULT_PROFILE)
+    config.pop('url', None)
+    config.pop('profile', None)
+
+    engine = create_engine(url)
+    if engine.dialect.name == 'sqlite':
+        pragmas = sqlite_pragmas(profile, **{**config, **overrides})
+
+        @event.listens_for(engine, 'connect')
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+            cursor.close()
+
+    return engine
+
+
+def begin_immediate(session):
+    """
+    Starts the session's transaction with BEGIN IMMEDIATE so it holds SQLite's
+    write lock before it reads anything it is about to change. Call it before
+    the transaction writes; if the driver already has a transaction open (it
+    has written, so it holds the lock) this is a no-op. Returns the connection.
+    """
+    connection = session.connection()
+    if connection.dialect.name == 'sqlite' and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+    return connection
+
+
+# session.info key: cache invalidators owed once the session commits
+_STALE_CACHES = 'stale_caches'
+
+
+def invalidate_on_commit(models, invalidate):
+    """
+    Calls invalidate() once a session that inserted, updated or deleted rows
+    of any of the models commits. Invalidating at flush time instead would let
+    a reader rebuild the cache from changes that are then rolled back.
+    """
+    def mark_stale(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault(_STALE_CACHES, set()).add(invalidate)
+
+    for model in models:
+        for event_name in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, event_name, mark_stale)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_stale_caches(session):
+    for invalidate in session.info.pop(_STALE_CACHES, ()):
+        invalidate()
+
+
+@event.listens_for(OrmSession, "after_soft_rollback")
+def _forget_stale_caches(session, previous_transaction):
+    # A savepoint rollback keeps the outer transaction's changes (and marks)
+    if not session.in_transaction():
+        session.info.pop(_STALE_CACHES, None)
+
+
+engine = make_engine()
 Session = sessionmaker(bind=engine)
 
 def init_db():
@@ -1,46 +1,125 @@
-from game.models import PlayerMonster, PlayerAchievement, Achievement, Battle
+from bisect import bisect_right
+from game.database import invalidate_on_commit
+from game.models import PlayerAchievement, Achievement
+from game.game_logic.player_stats import get_player_stats
+from game.game_logic.outcome import Outcome, render
 from sqlalchemy.orm import Session
 
-def check_and_unlock_achievements(session: Session, player, event_type: str, event_data=None):
+# Which counters an event can move, in the order their achievements are announced
+EVENT_COUNTERS = {
+    'catch': ('catches', 'legendary_catches'),
+    'battle_win': ('wins',),
+    'battle_player': ('wins',),
+    'battle_ai': ('wins',),
+}
+
+_index = None
+
+
+def parse_unlock_condition(condition: str):
+    """
+    Maps an unlock condition to (counter, threshold), e.g. 'catch_10' -> ('catches', 10).
+    Returns None for conditions no counter can satisfy.
+    """
+    if condition == 'catch_legendary':
+        return ('legendary_catches', 1)
+
+    prefix, _, threshold = condition.rpartition('_')
+    counter = {'catch': 'catches', 'win': 'wins'}.get(prefix)
+    if counter is None or not threshold.isdigit():
+        return None
+    return (counter, int(threshold))
+
+
+class AchievementIndex:
+    """
+    Achievement catalogue compiled into per-counter threshold lists.
+    """
+
+    def __init__(self, achievements):
+        rules = {}
+        for achievement in achievements:
+            parsed = parse_unlock_condition(achievement.unlock_condition or '')
+            if parsed:
+                counter, threshold = parsed
+                rules.setdefault(counter, []).append((threshold, achievement.id, achievement.achievement_name))
+
+        self.rules = {counter: sorted(entries) for counter, entries in rules.items()}
+        self.thresholds = {counter: [entry[0] for entry in entries] for counter, entries in self.rules.items()}
+
+    @classmethod
+    def load(cls, session):
+        return cls(session.query(Achievement).all())
+
+    def reached(self, counter: str, value: int) -> list:
+        """
+        (achievement_id, name) pairs whose threshold on this counter is <= value.
+        """
+        if counter not in self.rules:
+            return []
+        end = bisect_right(self.thresholds[counter], value)
+        return [(achievement_id, name) for _, achievement_id, name in self.rules[counter][:end]]
+
+
+def get_achievement_index(session) -> AchievementIndex:
     """
-    Unlocks achievements for the player based on the type of event.
-    """
-    unlocked_conditions = {
-        pa.achievement.unlock_condition
-        for pa in player.achievements
-    }
-    
-    def unlock_if_needed(condition: str):
-        if condition not in unlocked_conditions:
-            achievement = session.query(Achievement).filter_by(unlock_condition=condition).first()
-            if achievement:
-                new_unlock = PlayerAchievement(player_id=player.id, achievement_id=achievement.id)
-                session.add(new_unlock)
-                print(f"🎉 Achievement Unlocked: {achievement.achievement_name}")
-    
-    if event_type == 'catch':
-        total_caught = session.query(PlayerMonster).filter_by(player_id=player.id).count()
-
-        if total_caught >= 1:
-            unlock_if_needed('catch_1')# achievement_name="First Catch", description="Catch your first monster", unlock_condition="catch_1")
-        if total_caught >= 10:
-            unlock_if_needed('catch_10')# achievement_name="Collector", description="Catch 10 monsters", unlock_condition="catch_10"),
-        if (
-            event_data and
-            hasattr(event_data, "rarity") and
-            event_data.rarity.lower() == 'legendary'
-        ):
-            unlock_if_needed('catch_legendary')# achievement_name="Legendary Hunter", description="Catch a legendary monster", unlock_condition="catch_legendary"),
-
-    elif event_type in ['battle_win', 'battle_player', 'battle_ai']:
-        
-        wins = session.query(Battle).filter_by(winner_id=player.id).count()
-
-        print(f"You have {wins} total battle wins.")
-
-        if wins >= 1:
-            unlock_if_needed('win_1')# achievement_name="Battle Novice", description="Win your first battle", unlock_condition="win_1"),
-        if wins >= 50:
-            unlock_if_needed('win_50')# achievement_name="Champion", description="Win 50 battles", unlock_condition="win_50"),
+    Returns the cached achievement index, building it on first use.
+    """
+    global _index
+    if _index is None:
+        _index = AchievementIndex.load(session)
+    return _index
+
+
+def invalidate_achievement_index():
+    global _index
+    _index = None
+
+
+invalidate_on_commit([Achievement], invalidate_achievement_index)
+
+
+def unlock_achievements(session: Session, player, event_type: str, event_data=None) -> Outcome:
+    """
+    Unlocks achievements for the player based on the type of event and
+    returns them as an Outcome (nothing is printed).
+    Reads the player's running counters, so the cost does not grow with
+    their collection or battle history.
+    """
+    outcome = Outcome('achievements')
+    counters = EVENT_COUNTERS.get(event_type, ())
+    stats = get_player_stats(session, player.id)
+    index = get_achievement_index(session)
+
+    if 'wins' in counters:
+        outcome.say(f"You have {stats.wins} total battle wins.")
+
+    candidates = []
+    for counter in counters:
+        candidates.extend(index.reached(counter, getattr(stats, counter)))
+
+    if candidates:
+        already_unlocked = {
+            achievement_id
+            for (achievement_id,) in session.query(PlayerAchievement.achievement_id).filter(
+                PlayerAchievement.player_id == player.id,
+                PlayerAchievement.achievement_id.in_([achievement_id for achievement_id, _ in candidates])
+            )
+        }
+        for achievement_id, name in candidates:
+            if achievement_id not in already_unlocked:
+                session.add(PlayerAchievement(player_id=player.id, achievement_id=achievement_id))
+                already_unlocked.add(achievement_id)
+                outcome.achievements.append(name)
+                outcome.say(f"🎉 Achievement Unlocked: {name}")
 
     session.commit()
+    return outcome
+
+
+def check_and_unlock_achievements(session: Session, player, event_type: str, event_data=None):
+    """
+    Unlocks achievements for the player based on the type of event and
+    announces them on the CLI.
+    """
+    render(unlock_achievements(session, player, event_type, event_data))
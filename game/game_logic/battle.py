@@ -1,11 +1,27 @@
 import random
 from datetime import datetime
-from sqlalchemy.orm import Session
-from game.models import Battle, TypeEffectiveness, PlayerMonster, MonsterSpecies
-from game.game_logic.leveling import add_xp_to_monster,add_xp_to_player
-from game.game_logic.achievements import check_and_unlock_achievements
+from sqlalchemy.orm import Session, object_session
+from game.models import Battle, PlayerMonster, MonsterSpecies
+from game.game_logic.leveling import add_xp_to_monster,add_xp_to_player,award_xp_many
+from game.game_logic.achievements import unlock_achievements
+from game.game_logic.outcome import Outcome, render
+from game.game_logic.type_chart import get_type_chart
+from game.game_logic.player_stats import record_win
+from game.game_logic.stat_table import stats_for_monster
 
 
+BATTLE_MOVES = [
+    {"name": "Tackle", "power": 15},
+    {"name": "Bite", "power": 20},
+    {"name": "Quick Attack", "power": 12},
+]
+
+# Level-based battles roll level + randint(0, BATTLE_POWER_SPREAD) for each side
+BATTLE_POWER_SPREAD = 5
+
+# XP the challenger earns for winning a player battle
+PLAYER_BATTLE_XP = 20
+
 
 def create_battle(session, player1_id, player2_id, monster_teams=None):
     """
@@ -28,11 +44,15 @@ def get_type_multiplier(session, attacker_type_id, defender_type_id):
     Calculate the type effectiveness multiplier for an attack.
 
     """
-    effectiveness = session.query(TypeEffectiveness).filter_by(
-        attacking_type_id=attacker_type_id,
-        defending_type_id=defender_type_id
-    ).first()
-    return effectiveness.multiplier if effectiveness else 1.0
+    return get_type_chart(session).multiplier(attacker_type_id, defender_type_id)
+
+
+def get_type_multipliers(session, pairs) -> list:
+    """
+    Type effectiveness multipliers for many (attacker_type_id, defender_type_id) pairs.
+
+    """
+    return get_type_chart(session).multipliers(pairs)
 
 
 def calculate_damage(attacker_stats, defender_stats, power, multiplier):
@@ -58,27 +78,122 @@ def calculate_battle_rewards(winner_id, battle_difficulty):
     return (xp, money)
 
 
-def execute_turn(session, attacker, defender, move):
+class Combatant:
     """
-    Execute a single turn in a monster battle.
+    Plain in-memory battle participant (HP, stats, type id).
 
+    Battles run entirely on these so the session is only touched once the
+    fight is over.
     """
-    multiplier = get_type_multiplier(session, attacker.species.type_id, defender.species.type_id)
-    damage = calculate_damage(attacker.current_stats, defender.current_stats, move["power"], multiplier)
-
-    defender.current_hp = max(defender.current_hp - damage, 0)
-    session.add(defender)
-    session.commit()
+    __slots__ = ("name", "hp", "stats", "type_id", "monster")
+
+    def __init__(self, name, hp, stats, type_id=None, monster=None):
+        self.name = name
+        self.hp = hp
+        self.stats = stats
+        self.type_id = type_id
+        self.monster = monster
+
+    @classmethod
+    def from_monster(cls, monster):
+        stats = monster.current_stats
+        if stats.hp is None:
+            # No stored stats: fight with the stat table's numbers for its level
+            stats = stats_for_monster(object_session(monster), monster)
+        return cls(
+            name=monster.nickname or monster.species.name,
+            hp=stats.hp,
+            stats=stats,
+            type_id=monster.species.type_id,
+            monster=monster,
+        )
+
+    @classmethod
+    def from_ai(cls, ai_mon):
+        return cls(name=ai_mon["name"], hp=ai_mon["hp"], stats=ai_mon["stats"])
+
+    @property
+    def fainted(self):
+        return self.hp <= 0
+
+
+def attack(attacker, defender, move, multiplier=1.0) -> dict:
+    """
+    Apply one attack between two combatants in memory and return the turn log.
 
+    """
+    damage = calculate_damage(attacker.stats, defender.stats, move["power"], multiplier)
+    defender.hp = max(defender.hp - damage, 0)
     return {
-        "attacker": attacker.nickname or attacker.species.name,
-        "defender": defender.nickname or defender.species.name,
+        "attacker": attacker.name,
+        "defender": defender.name,
         "move": move["name"],
         "damage": damage,
-        "defender_remaining_hp": defender.current_hp
+        "defender_remaining_hp": defender.hp
     }
 
 
+def _as_combatant(side):
+    if isinstance(side, Combatant):
+        return side
+    combatant = Combatant.from_monster(side)
+    if side.current_hp is not None:
+        combatant.hp = side.current_hp
+    return combatant
+
+
+def execute_turn(session, attacker, defender, move, commit=True):
+    """
+    Execute a single turn in a monster battle.
+
+    Takes PlayerMonsters as before: the defender's current_hp is updated and,
+    unless commit=False, committed. Combatants are also accepted and only
+    change in memory; battles use those and write once at the end.
+    """
+    attacking, defending = _as_combatant(attacker), _as_combatant(defender)
+    multiplier = get_type_multiplier(session, attacking.type_id, defending.type_id)
+    entry = attack(attacking, defending, move, multiplier)
+    if defending is not defender:
+        defender.current_hp = defending.hp
+        if commit:
+            session.commit()
+    return entry
+
+
+def run_duel(challenger, opponent, moves, rng=random) -> dict:
+    """
+    Fight two combatants to a faint, challenger attacking first each turn.
+
+    """
+    log = []
+    turn = 1
+    while not challenger.fainted and not opponent.fainted:
+        entry = attack(challenger, opponent, rng.choice(moves))
+        log.append(dict(entry, turn=turn))
+        if opponent.fainted:
+            break
+
+        entry = attack(opponent, challenger, rng.choice(moves))
+        log.append(dict(entry, turn=turn))
+        if challenger.fainted:
+            break
+        turn += 1
+
+    return {
+        "winner": challenger if opponent.fainted else opponent,
+        "turns": turn,
+        "log": log
+    }
+
+
+def roll_battle_power(level, rng=random) -> int:
+    """
+    Battle power for a level-based fight (wild, player and gym battles).
+
+    """
+    return level + rng.randint(0, BATTLE_POWER_SPREAD)
+
+
 def create_ai_opponent(level):
     """
     Generate AI-controlled monsters based on player's level.
@@ -94,151 +209,157 @@ def create_ai_opponent(level):
     ]
 
 
-def battle_vs_ai(session: Session, player, player_monsters):
+def ai_battle(session: Session, player, player_monsters, rng=random) -> Outcome:
     """
-    Simulate a battle between the player and AI monsters.
+    Battle between the player and AI monsters, returned as an Outcome with
+    the damage log, rewards and any achievements. Nothing is printed.
 
+    The fight runs on in-memory combatants; the battle, HP and rewards are
+    committed together once it is over.
     """
-    moves = [
-        {"name": "Tackle", "power": 15},
-        {"name": "Bite", "power": 20},
-        {"name": "Quick Attack", "power": 12},
-    ]
-
+    outcome = Outcome('battle_ai')
+    moves = BATTLE_MOVES
     ai_monsters = create_ai_opponent(player.level)
-    battle = Battle(player1_id=player.id, created_at=datetime.utcnow())
-    session.add(battle)
-    session.commit()
 
-    print(f"\n⚔️  {player.name} vs AI ⚔️\n")
+    outcome.say(f"\n⚔️  {player.name} vs AI ⚔️\n")
 
     player_wins = 0
     ai_wins = 0
+    player_side = []
 
     for i in range(min(len(player_monsters), len(ai_monsters))):
-        player_mon = player_monsters[i]
-        ai_mon = ai_monsters[i]
-
-        player_mon.current_hp = player_mon.current_stats["hp"]
-        session.add(player_mon)
-        session.commit()
-
-        ai_hp = ai_mon["hp"]
-        turn = 1
-
-        print(f"\n{player_mon.nickname or player_mon.species.name} vs {ai_mon['name']}")
-
-        while player_mon.current_hp > 0 and ai_hp > 0:
-            print(f"\n-- Turn {turn} --")
-
-            move = random.choice(moves)
-            damage = calculate_damage(player_mon.current_stats, ai_mon["stats"], move["power"], 1.0)
-            ai_hp = max(ai_hp - damage, 0)
-            print(f"{player_mon.nickname or player_mon.species.name} used {move['name']}! {ai_mon['name']} took {damage} damage.")
-
-            if ai_hp <= 0:
-                print(f"{ai_mon['name']} fainted!")
-                player_wins += 1
-                break
-
-            counter_move = random.choice(moves)
-            counter_damage = calculate_damage(ai_mon["stats"], player_mon.current_stats, counter_move["power"], 1.0)
-            player_mon.current_hp = max(player_mon.current_hp - counter_damage, 0)
-            session.add(player_mon)
-            session.commit()
-            print(f"{ai_mon['name']} used {counter_move['name']}! {player_mon.nickname or player_mon.species.name} took {counter_damage} damage.")
-
-            if player_mon.current_hp <= 0:
-                print(f"{player_mon.nickname or player_mon.species.name} fainted!")
-                ai_wins += 1
-                break
-            turn += 1
+        player_mon = Combatant.from_monster(player_monsters[i])
+        ai_mon = Combatant.from_ai(ai_monsters[i])
+        player_side.append(player_mon)
+
+        outcome.say(f"\n{player_mon.name} vs {ai_mon.name}")
+
+        duel = run_duel(player_mon, ai_mon, moves, rng)
+        turn = 0
+        for entry in duel["log"]:
+            if entry["turn"] != turn:
+                turn = entry["turn"]
+                outcome.say(f"\n-- Turn {turn} --")
+            outcome.say(f"{entry['attacker']} used {entry['move']}! {entry['defender']} took {entry['damage']} damage.")
+            outcome.damage_log.append(dict(entry, round=i + 1))
+
+        if duel["winner"] is player_mon:
+            outcome.say(f"{ai_mon.name} fainted!")
+            player_wins += 1
+        else:
+            outcome.say(f"{player_mon.name} fainted!")
+            ai_wins += 1
 
     player_won_battle = player_wins > ai_wins
+    outcome.won = player_won_battle
     result_text = "Victory!" if player_won_battle else "Defeat..."
-    print(f"\nBattle Result: {result_text}")
+    outcome.say(f"\nBattle Result: {result_text}")
 
-    winner_id = player.id if player_won_battle else None
-    battle.result = result_text
-    battle.winner_id = winner_id
+    battle = Battle(
+        player1_id=player.id,
+        winner_id=player.id if player_won_battle else None,
+        created_at=datetime.utcnow(),
+    )
     session.add(battle)
-    session.commit()
+    for combatant in player_side:
+        combatant.monster.current_hp = combatant.hp
 
     if player_won_battle:
         xp, gold = calculate_battle_rewards(player.id, battle_difficulty=1)
         split_xp = xp // len(player_monsters)
-        for player_mon in player_monsters:
-            add_xp_to_monster(session, player_mon.id, split_xp)
+        awards = award_xp_many(session, {player_mon.id: split_xp for player_mon in player_monsters}, commit=False)
         player.money += gold
-        session.add(player)
-        session.commit()
-        print(f"You earned {xp} XP and ${gold}!")
-        check_and_unlock_achievements(session, player, event_type='battle_ai')
+        record_win(session, player.id)
+        outcome.xp, outcome.money = xp, gold
+        outcome.data["monsters"] = list(awards.values())
+
+    session.commit()
 
-    return player_won_battle
+    if player_won_battle:
+        outcome.say(f"You earned {xp} XP and ${gold}!")
+        outcome.merge(unlock_achievements(session, player, event_type='battle_ai'))
 
+    return outcome
 
-def resolve_battle_wild_monster(session, player, species):
+
+def battle_vs_ai(session: Session, player, player_monsters, rng=random):
     """
-    Simulate a battle with a wild monster species.
+    Simulate a battle between the player and AI monsters on the CLI.
+    Returns True if the player won.
+    """
+    return render(ai_battle(session, player, player_monsters, rng)).won
+
+
+def wild_battle(session, player, species, rng=random) -> Outcome:
+    """
+    Battle with a wild monster species, returned as an Outcome.
 
     """
+    outcome = Outcome('battle_wild', species=species.name)
     player_monsters = session.query(PlayerMonster).filter_by(player_id=player.id).all()
     if not player_monsters:
-        print("❗ You don’t have any monsters yet. Go catch one first!")
-        return
+        return outcome.fail("❗ You don’t have any monsters yet. Go catch one first!")
 
-    player_monster = random.choice(player_monsters)
-    print(f"⚔️ {player_monster.nickname} (Lv {player_monster.level}) vs {species.name} (Lv {species.base_level})!")
+    player_monster = rng.choice(player_monsters)
+    outcome.say(f"⚔️ {player_monster.nickname} (Lv {player_monster.level}) vs {species.name} (Lv {species.base_level})!")
 
-    player_power = player_monster.level + random.randint(0, 5)
-    wild_power = species.base_level + random.randint(0, 5)
+    player_power = roll_battle_power(player_monster.level, rng)
+    wild_power = roll_battle_power(species.base_level, rng)
 
-    if player_power >= wild_power:
-        print(f"🏆 {player_monster.nickname} defeated the wild {species.name}!")
-        add_xp_to_player(session, player.id, 10)
+    outcome.won = player_power >= wild_power
+    if outcome.won:
+        outcome.say(f"🏆 {player_monster.nickname} defeated the wild {species.name}!")
+        outcome.xp = 10
+        outcome.data["leveled_up"] = add_xp_to_player(session, player.id, outcome.xp)["leveled_up"]
         session.commit()
-        check_and_unlock_achievements(session, player, event_type='battle_win', event_data=species)
+        outcome.merge(unlock_achievements(session, player, event_type='battle_win', event_data=species))
     else:
-        print(f"❗ The wild {species.name} defeated your {player_monster.nickname}!")
+        outcome.say(f"❗ The wild {species.name} defeated your {player_monster.nickname}!")
+    return outcome
 
 
-from datetime import datetime
-from game.models import Battle
+def resolve_battle_wild_monster(session, player, species):
+    """
+    Simulate a battle with a wild monster species.
 
-def resolve_battle_player(session, player, opponent):
     """
-    Simulates a battle with a Player
-    
+    return render(wild_battle(session, player, species))
+
+
+def player_battle(session, player, opponent, rng=random) -> Outcome:
+    """
+    Battle with another player, returned as an Outcome.
+
     """
+    outcome = Outcome('battle_player', opponent=opponent.name)
     player_monsters = session.query(PlayerMonster).filter_by(player_id=player.id).all()
     opponent_monsters = session.query(PlayerMonster).filter_by(player_id=opponent.id).all()
 
     if not player_monsters:
-        print("❗ You don’t have any monsters! Go explore first.")
-        return
+        return outcome.fail("❗ You don’t have any monsters! Go explore first.")
     if not opponent_monsters:
-        print("❗ Opponent doesn’t have any monsters!")
-        return
+        return outcome.fail("❗ Opponent doesn’t have any monsters!")
 
-    player_monster = random.choice(player_monsters)
-    opponent_monster = random.choice(opponent_monsters)
+    player_monster = rng.choice(player_monsters)
+    opponent_monster = rng.choice(opponent_monsters)
 
-    print(f"⚔️ {player.name}'s {player_monster.nickname} (Lv {player_monster.level}) vs {opponent.name}'s {opponent_monster.nickname} (Lv {opponent_monster.level})!")
+    outcome.say(f"⚔️ {player.name}'s {player_monster.nickname} (Lv {player_monster.level}) vs {opponent.name}'s {opponent_monster.nickname} (Lv {opponent_monster.level})!")
 
-    player_power = player_monster.level + random.randint(0, 5)
-    opponent_power = opponent_monster.level + random.randint(0, 5)
+    player_power = roll_battle_power(player_monster.level, rng)
+    opponent_power = roll_battle_power(opponent_monster.level, rng)
 
     winner = None
     if player_power >= opponent_power:
-        print(f"🏆 {player.name} wins!")
-        add_xp_to_player(session, player.id, 20)
+        outcome.say(f"🏆 {player.name} wins!")
+        outcome.xp = PLAYER_BATTLE_XP
+        outcome.data["leveled_up"] = add_xp_to_player(session, player.id, outcome.xp, commit=False)["leveled_up"]
         winner = player
     else:
-        print(f"❗ {opponent.name} wins!")
+        outcome.say(f"❗ {opponent.name} wins!")
         winner = opponent
+    outcome.won = winner == player
 
-    # Record the battle with winner
+    # Record the battle with winner, in the same transaction as the XP
     battle = Battle(
         player1_id=player.id,
         player2_id=opponent.id,
@@ -246,38 +367,62 @@ def resolve_battle_player(session, player, opponent):
         created_at=datetime.utcnow(),
     )
     session.add(battle)
+    record_win(session, winner.id)
     session.commit()
 
     # Achievement check AFTER battle is committed
     if winner == player:
-        check_and_unlock_achievements(session, player, event_type='battle_player')
+        outcome.merge(unlock_achievements(session, player, event_type='battle_player'))
+    return outcome
 
 
+def resolve_battle_player(session, player, opponent):
+    """
+    Simulates a battle with a Player
+    
+    """
+    return render(player_battle(session, player, opponent))
 
-def resolve_gym_challenge(session, player):
+
+def gym_battle(session, player, rng=random) -> Outcome:
     """
-    Simulate a gym leader challenge.
+    Gym leader challenge, returned as an Outcome.
 
     """
     gym_leader_monster_level = player.level + 5
-    print(f"🏟️ Gym Leader sends out a monster (Lv {gym_leader_monster_level})!")
+    outcome = Outcome('gym', gym_level=gym_leader_monster_level)
+    outcome.say(f"🏟️ Gym Leader sends out a monster (Lv {gym_leader_monster_level})!")
 
     player_monsters = session.query(PlayerMonster).filter_by(player_id=player.id).all()
     if not player_monsters:
-        print("❗ You don’t have any monsters!")
-        return
+        return outcome.fail("❗ You don’t have any monsters!")
 
-    player_monster = random.choice(player_monsters)
-    player_power = player_monster.level + random.randint(0, 5)
-    gym_power = gym_leader_monster_level + random.randint(0, 5)
+    player_monster = rng.choice(player_monsters)
+    player_power = roll_battle_power(player_monster.level, rng)
+    gym_power = roll_battle_power(gym_leader_monster_level, rng)
 
-    if player_power >= gym_power:
-        print(f"🏆 Congratulations! You defeated the Gym Leader!")
-        add_xp_to_player(session, player.id, 50)
+    outcome.won = player_power >= gym_power
+    if outcome.won:
+        outcome.say(f"🏆 Congratulations! You defeated the Gym Leader!")
+        outcome.xp = 50
+        outcome.data["leveled_up"] = add_xp_to_player(session, player.id, outcome.xp)["leveled_up"]
         session.commit()
-        check_and_unlock_achievements(session, player, event_type='gym')
+        outcome.merge(unlock_achievements(session, player, event_type='gym'))
     else:
-        print(f"❗ You lost to the Gym Leader. Train harder next time!")
+        outcome.say(f"❗ You lost to the Gym Leader. Train harder next time!")
+    return outcome
+
+
+def resolve_gym_challenge(session, player):
+    """
+    Simulate a gym leader challenge.
+
+    """
+    return render(gym_battle(session, player))
+
+
+def _current_hp(monster) -> int:
+    return monster.current_stats.hp if monster.current_hp is None else monster.current_hp
 
 
 def check_battle_end(player_monsters, ai_monsters):
@@ -285,7 +430,7 @@ def check_battle_end(player_monsters, ai_monsters):
     Check if all monsters on one side have fainted.
 
     """
-    player_alive = any(mon.current_hp > 0 for mon in player_monsters)
+    player_alive = any(_current_hp(mon) > 0 for mon in player_monsters)
     ai_alive = any(mon['hp'] > 0 for mon in ai_monsters)
     return not (player_alive and ai_alive)
 
@@ -296,7 +441,7 @@ def apply_status_effects(monster, effect_type):
 
     """
     if effect_type == "burn":
-        burn_damage = int(monster.current_stats['hp'] * 0.05)
-        monster.current_hp = max(monster.current_hp - burn_damage, 0)
+        burn_damage = int(monster.current_stats.hp * 0.05)
+        monster.current_hp = max(_current_hp(monster) - burn_damage, 0)
     elif effect_type == "paralyze":
         return random.random() < 0.5  # True = skip turn
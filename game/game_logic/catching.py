@@ -1,5 +1,8 @@
 from sqlalchemy.orm import Session
 from game.models import PlayerMonster, MonsterSpecies, Player
+from game.game_logic.player_stats import record_catch
+from game.game_logic.achievements import unlock_achievements
+from game.game_logic.outcome import Outcome
 import random
 
 def calculate_catch_rate(species_rarity, player_level) -> float:
@@ -15,7 +18,7 @@ def calculate_catch_rate(species_rarity, player_level) -> float:
     base_rate = base_rates.get(species_rarity, 0.5)
     return min(1.0, base_rate + (player_level * 0.01))  # Cap at 1.0/100% so it doesnt go higher
 
-def catch_monster(session: Session, player_id: int, species_id: int) -> bool:
+def catch_monster(session: Session, player_id: int, species_id: int, rng=random) -> bool:
     """
     Attempts to catch a monster for a player. Returns True if the monster is successfully caught, otherwise False.
     """
@@ -25,7 +28,7 @@ def catch_monster(session: Session, player_id: int, species_id: int) -> bool:
         return False
 
     catch_chance = calculate_catch_rate(species.rarity, player.level) 
-    if random.random() <= catch_chance:
+    if rng.random() <= catch_chance:
         new_monster = PlayerMonster(
             player_id=player_id, 
             species_id=species_id, 
@@ -35,6 +38,21 @@ def catch_monster(session: Session, player_id: int, species_id: int) -> bool:
         )
         
         session.add(new_monster)
+        record_catch(session, player_id, species)
         session.commit()
         return True
     return False
+
+def attempt_catch(session: Session, player: Player, species: MonsterSpecies, rng=random) -> Outcome:
+    """
+    Tries to catch a wild monster and checks catch achievements.
+    Returns an Outcome whose `won` says whether it was caught.
+    """
+    outcome = Outcome('catch', species=species.name, rarity=species.rarity)
+    outcome.won = catch_monster(session, player.id, species.id, rng)
+    if outcome.won:
+        outcome.say(f"🎉 You caught {species.name}!")
+        outcome.merge(unlock_achievements(session, player, event_type='catch', event_data=species))
+    else:
+        outcome.say(f"{species.name} broke free!")
+    return outcome
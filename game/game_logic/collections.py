@@ -1,23 +1,191 @@
-from game.models import PlayerMonster
+from sqlalchemy import and_, case, or_, select, tuple_
+from sqlalchemy.orm import contains_eager
+from game.models import STAT_NAMES, Player, PlayerMonster, MonsterSpecies
+from game.database import begin_immediate
+from game.game_logic.marketplace import withdraw_offers
+from game.game_logic.player_stats import record_release
 
-def get_player_collection(session, player_id: int) -> list:
+RARITY_ORDER = {"Common": 0, "Uncommon": 1, "Rare": 2, "Legendary": 3}
+
+# Sort name -> column/expression; ties are broken by monster id.
+# "species" is catalogue (species id) order so it can walk an index.
+SORT_KEYS = {
+    "level": PlayerMonster.level,
+    "caught_at": PlayerMonster.caught_at,
+    "species": PlayerMonster.species_id,
+    "rarity": case(RARITY_ORDER, value=MonsterSpecies.rarity, else_=len(RARITY_ORDER)),
+    "hp": PlayerMonster.hp,
+    "attack": PlayerMonster.attack,
+    "defense": PlayerMonster.defense,
+    "speed": PlayerMonster.speed,
+}
+
+def load_player_monsters(session, player_id: int) -> list:
     """
-    Retrieves all monsters belonging to a player and returns them as a list of dictionaries.
+    Loads a player's monsters with their species in a single joined query.
     """
-    collection = (
+    return (
         session.query(PlayerMonster)
-        .filter_by(player_id=player_id)
+        .outerjoin(PlayerMonster.species)
+        .options(contains_eager(PlayerMonster.species))
+        .filter(PlayerMonster.player_id == player_id)
+        .order_by(PlayerMonster.id)
         .all()
     )
-    return [
-        {
-            "id": monster.id,
-            "nickname": monster.nickname,
-            "species_name": monster.species.name,
-            "level": monster.level
-        }
-        for monster in collection
-    ]
+
+def collection_rows(session, player_id: int) -> list:
+    """
+    Read-only projection of a player's collection (id, nickname, species_name, level)
+    that skips building ORM objects.
+    """
+    return (
+        session.query(
+            PlayerMonster.id,
+            PlayerMonster.nickname,
+            MonsterSpecies.name.label("species_name"),
+            PlayerMonster.level
+        )
+        .outerjoin(MonsterSpecies, MonsterSpecies.id == PlayerMonster.species_id)
+        .filter(PlayerMonster.player_id == player_id)
+        .order_by(PlayerMonster.id)
+        .all()
+    )
+
+def _browse_query(session, player_id, sort, descending, type_id=None, rarity=None,
+                  min_level=None, max_level=None, nickname_prefix=None):
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort '{sort}'. Choose from: {', '.join(SORT_KEYS)}")
+    sort_key = SORT_KEYS[sort].label("sort_key")
+
+    query = (
+        session.query(
+            PlayerMonster.id,
+            PlayerMonster.nickname,
+            MonsterSpecies.name.label("species_name"),
+            MonsterSpecies.rarity,
+            PlayerMonster.level,
+            PlayerMonster.caught_at,
+            PlayerMonster.current_stats,
+            sort_key
+        )
+        .outerjoin(MonsterSpecies, MonsterSpecies.id == PlayerMonster.species_id)
+        .filter(PlayerMonster.player_id == player_id)
+    )
+
+    # Species-level filters become species_id IN (...) so they stay on the player_id indexes
+    species_filter = select(MonsterSpecies.id)
+    if type_id is not None:
+        species_filter = species_filter.where(MonsterSpecies.type_id == type_id)
+    if rarity is not None:
+        species_filter = species_filter.where(MonsterSpecies.rarity == rarity)
+    if type_id is not None or rarity is not None:
+        query = query.filter(PlayerMonster.species_id.in_(species_filter))
+
+    if min_level is not None:
+        query = query.filter(PlayerMonster.level >= min_level)
+    if max_level is not None:
+        query = query.filter(PlayerMonster.level <= max_level)
+    if nickname_prefix:
+        # Range instead of LIKE so the (player_id, nickname) index applies
+        query = query.filter(
+            PlayerMonster.nickname >= nickname_prefix,
+            PlayerMonster.nickname < nickname_prefix + "\uffff"
+        )
+
+    if descending:
+        query = query.order_by(SORT_KEYS[sort].desc(), PlayerMonster.id.desc())
+    else:
+        query = query.order_by(SORT_KEYS[sort], PlayerMonster.id)
+    return query
+
+def _browse_row(row) -> dict:
+    return {
+        "id": row.id,
+        "nickname": row.nickname,
+        "species_name": row.species_name,
+        "rarity": row.rarity,
+        "level": row.level,
+        "caught_at": row.caught_at,
+        "stats": row.current_stats.to_dict(),
+    }
+
+def _after_cursor(sort_key, after, descending):
+    """
+    Rows that come after the cursor. SQLite sorts NULL keys first ascending and
+    last descending, and a tuple comparison with a NULL is never true, so the
+    NULL block is handled on its own.
+    """
+    key, monster_id = after
+    if key is None:
+        if descending:
+            return and_(sort_key.is_(None), PlayerMonster.id < monster_id)
+        return or_(and_(sort_key.is_(None), PlayerMonster.id > monster_id), sort_key.isnot(None))
+    position = tuple_(sort_key, PlayerMonster.id)
+    if descending:
+        return or_(position < tuple_(key, monster_id), sort_key.is_(None))
+    return and_(sort_key.isnot(None), position > tuple_(key, monster_id))
+
+def browse_collection(session, player_id: int, sort: str = "level", descending: bool = False,
+                      after=None, limit: int = 20, **filters) -> dict:
+    """
+    Returns one page of a player's collection using keyset pagination.
+
+    Pass the returned "next" cursor as `after` to get the following page; it is
+    None on the last page. Filters: type_id, rarity, min_level, max_level,
+    nickname_prefix.
+    """
+    query = _browse_query(session, player_id, sort, descending, **filters)
+    if after is not None:
+        query = query.filter(_after_cursor(SORT_KEYS[sort], after, descending))
+
+    rows = query.limit(limit + 1).all()
+    page = rows[:limit]
+    return {
+        "monsters": [_browse_row(row) for row in page],
+        "next": (page[-1].sort_key, page[-1].id) if len(rows) > limit else None,
+    }
+
+def stream_player_collection(session, player_id: int, sort: str = "level", descending: bool = False,
+                             batch_size: int = 500, **filters):
+    """
+    Yields a player's whole (filtered, sorted) collection as dicts,
+    fetching batch_size rows at a time.
+    """
+    query = _browse_query(session, player_id, sort, descending, **filters)
+    for row in query.yield_per(batch_size):
+        yield _browse_row(row)
+
+def strongest_monsters(session, stat: str = "attack", limit: int = 10) -> list:
+    """
+    The highest-stat monsters across all players, as dicts with the owner's name.
+    """
+    if stat not in STAT_NAMES:
+        raise ValueError(f"Unknown stat '{stat}'")
+    column = getattr(PlayerMonster, stat)
+    rows = (
+        session.query(
+            PlayerMonster.id,
+            PlayerMonster.nickname,
+            MonsterSpecies.name.label("species_name"),
+            PlayerMonster.level,
+            Player.name.label("owner"),
+            column.label("value"),
+        )
+        .join(Player, Player.id == PlayerMonster.player_id)
+        .outerjoin(MonsterSpecies, MonsterSpecies.id == PlayerMonster.species_id)
+        .filter(column.isnot(None))
+        .order_by(column.desc(), PlayerMonster.id)
+        .limit(limit)
+        .all()
+    )
+    return [row._asdict() for row in rows]
+
+
+def get_player_collection(session, player_id: int) -> list:
+    """
+    Retrieves all monsters belonging to a player and returns them as a list of dictionaries.
+    """
+    return [row._asdict() for row in collection_rows(session, player_id)]
  
 def rename_monster(session, player_monster_id, new_name) -> dict:
     """
@@ -43,12 +211,17 @@ def rename_monster(session, player_monster_id, new_name) -> dict:
 
 def release_monster(session, player_monster_id) -> dict:
     """
-    Deletes a monster from the player's collection if found.
+    Deletes a monster from the player's collection if found, withdrawing
+    its marketplace offer.
     """
+    begin_immediate(session)
     monster = session.query(PlayerMonster).filter_by(id=player_monster_id).first()
     if not monster:
+        session.rollback()
         return {"success": False, "error": "Monster not found."}
     
+    withdraw_offers(session, [monster.id])
     session.delete(monster)
+    record_release(session, monster.player_id)
     session.commit()
     return {"success": True, "message": f"Released monster ID {player_monster_id}"}
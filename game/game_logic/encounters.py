@@ -0,0 +1,108 @@
+import random
+from game.database import invalidate_on_commit
+from game.models import MonsterSpecies
+
+# Relative encounter weights used when rarity weighting is switched on
+RARITY_WEIGHTS = {
+    "Common": 50,
+    "Uncommon": 30,
+    "Rare": 15,
+    "Legendary": 5,
+}
+DEFAULT_WEIGHT = 30
+
+_tables = {}
+
+
+class EncounterTable:
+    """
+    Walker/Vose alias table over species ids: O(1) draws, O(n) to build.
+
+    Equal weights skip the alias table: draws are rng.choice over the ids in
+    id order, the same single call the old per-encounter query made, so a
+    seeded rng gives the same encounters as before.
+    """
+    __slots__ = ("species_ids", "prob", "alias", "uniform")
+
+    def __init__(self, species_ids, weights):
+        n = len(species_ids)
+        self.species_ids = list(species_ids)
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        self.uniform = len(set(weights)) <= 1
+        if not n or self.uniform:
+            return
+
+        total = float(sum(weights))
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            self.prob[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] = scaled[high] + scaled[low] - 1.0
+            if scaled[high] < 1.0:
+                small.append(high)
+            else:
+                large.append(high)
+        # Whatever is left over is 1.0 up to rounding error
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    @classmethod
+    def load(cls, session, weighted=False):
+        rows = session.query(MonsterSpecies.id, MonsterSpecies.rarity).order_by(MonsterSpecies.id).all()
+        weights = [
+            RARITY_WEIGHTS.get(rarity, DEFAULT_WEIGHT) if weighted else 1
+            for _, rarity in rows
+        ]
+        return cls([species_id for species_id, _ in rows], weights)
+
+    def __len__(self):
+        return len(self.species_ids)
+
+    def draw(self, rng=random) -> int:
+        """
+        Returns one species id.
+        """
+        if not self.species_ids:
+            raise IndexError("No monster species to encounter.")
+        if self.uniform:
+            return rng.choice(self.species_ids)
+        # One uniform picks the column (integer part) and the coin (fraction)
+        n = len(self.species_ids)
+        position = rng.random() * n
+        i = min(int(position), n - 1)
+        if position - i < self.prob[i]:
+            return self.species_ids[i]
+        return self.species_ids[self.alias[i]]
+
+    def sample(self, n, rng=random) -> list:
+        """
+        Returns n species ids drawn with replacement.
+        """
+        return [self.draw(rng) for _ in range(n)]
+
+
+def get_encounter_table(session, weighted=False) -> EncounterTable:
+    """
+    Returns the cached encounter table, building it from monster_species on first use.
+    """
+    table = _tables.get(weighted)
+    if table is None:
+        table = _tables[weighted] = EncounterTable.load(session, weighted)
+    return table
+
+
+def invalidate_encounter_tables():
+    """
+    Drops the cached tables so the next encounter rebuilds them.
+    Call this after changing monster_species outside the ORM.
+    """
+    _tables.clear()
+
+
+invalidate_on_commit([MonsterSpecies], invalidate_encounter_tables)
@@ -0,0 +1,91 @@
+from sqlalchemy import func, select
+from game.models import Player, PlayerStats
+from game.game_logic.social_graph import get_social_graph
+
+# Leaderboard name -> indexed PlayerStats counter it ranks by
+BOARDS = {
+    "wins": PlayerStats.wins,
+    "collection": PlayerStats.collection_size,
+}
+
+# Scope -> SocialGraph method listing the player's ids in it
+SCOPES = {
+    "friends": "friend_ids",
+    "rivals": "rival_ids",
+}
+SCOPED_BOARDS = ("wins", "collection", "level")
+SCOPED_COLUMNS = {**BOARDS, "level": Player.level}
+IN_BATCH = 500
+
+
+# Boards are read straight from player_stats, whose counters every writer
+# (ORM, tournament, bulk seeder, other processes) keeps current, so there is
+# nothing to invalidate. Highest score first, ties by player id; players with
+# a score of 0 are not ranked, matching the old inner-join leaderboards.
+
+def leaderboard_page(session, board: str, limit: int = 10, offset: int = 0) -> list:
+    """
+    (name, score) rows for one page of a leaderboard, walking the counter's index.
+    """
+    column = BOARDS[board]
+    rows = session.execute(
+        select(Player.name, column)
+        .join(Player, Player.id == PlayerStats.player_id)
+        .where(column > 0)
+        .order_by(column.desc(), PlayerStats.player_id)
+        .limit(limit)
+        .offset(offset)
+    ).all()
+    return [(name, score) for name, score in rows]
+
+
+def get_rank(session, player_id: int, board: str = "wins"):
+    """
+    The player's 1-based rank on a leaderboard (ties share the better rank),
+    or None if they are not on it.
+    """
+    column = BOARDS[board]
+    score = session.execute(select(column).where(PlayerStats.player_id == player_id)).scalar()
+    if not score:
+        return None
+    return session.execute(select(func.count()).where(column > score)).scalar() + 1
+
+
+# --- Friend / rival boards ---
+
+def _scoped_scores(session, player_ids, board) -> dict:
+    column = SCOPED_COLUMNS[board]
+    key = PlayerStats.player_id if board in BOARDS else Player.id
+    scores = {}
+    for start in range(0, len(player_ids), IN_BATCH):
+        scores.update(session.execute(select(key, column).where(key.in_(player_ids[start:start + IN_BATCH]))).all())
+    return {player_id: scores.get(player_id) or 0 for player_id in player_ids}
+
+
+def scope_members(session, player_id: int, scope: str = "friends") -> set:
+    """
+    Ids of the player's friends or rivals (not the player), from the social graph.
+    """
+    return set(getattr(get_social_graph(session), SCOPES[scope])(player_id)) - {player_id}
+
+
+def scoped_leaderboard(session, player_id: int, scope: str = "friends", board: str = "wins",
+                       limit: int = 10) -> tuple:
+    """
+    Leaderboard of a player and their friends or rivals: ((name, score)
+    rows for the top limit, the player's 1-based rank among them).
+    Wins and collection size come from player_stats, level from players;
+    the group comes from the social graph.
+    """
+    member_ids = scope_members(session, player_id, scope)
+    scores = _scoped_scores(session, sorted(member_ids | {player_id}), board)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    rank = 1 + sum(1 for score in scores.values() if score > scores[player_id])
+
+    top = ranked[:limit]
+    names = dict(
+        session.query(Player.id, Player.name)
+        .filter(Player.id.in_([member_id for member_id, _ in top]))
+        .all()
+    )
+    return [(names.get(member_id), score) for member_id, score in top], rank
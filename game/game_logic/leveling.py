@@ -1,4 +1,9 @@
+from bisect import bisect_right
 from game.models import Player, PlayerMonster
+from game.game_logic.stat_table import stats_for_monster
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+AWARD_BATCH_SIZE = 500
 
 def level_up_monster(session, player_monster_id) -> dict:
     """
@@ -23,7 +28,7 @@ def level_up_monster(session, player_monster_id) -> dict:
         }
     }
 
-def calculate_stats(session, player_monster_id) -> dict:
+def calculate_stats(session, player_monster_id, commit=True) -> dict:
     """
     Recalculate and update monster stats based on level.
     
@@ -32,82 +37,145 @@ def calculate_stats(session, player_monster_id) -> dict:
     if not monster:
         return {"error": "Monster not found."}
 
-    level = monster.level
-    base_stats = monster.species.base_stats
-
-    updated_stats = {}
-    for stat_name, base_value in base_stats.items():
-        if stat_name == "hp":
-            value = ((base_value * 2 * level) // 100) + level + 10
-        else:
-            value = ((base_value * 2 * level) // 100) + 5
-        updated_stats[stat_name] = value
+    updated_stats = stats_for_monster(session, monster)
 
     monster.current_stats = updated_stats
     session.add(monster)
-    session.commit()
+    if commit:
+        session.commit()
+
+    return updated_stats.to_dict()
 
-    return updated_stats
+class XPTable:
+    """
+    Per-level and cumulative XP requirements for one level curve.
+    cumulative[level] is the XP needed to get from level 1 to that level, so the
+    level reached by a given XP total is a single bisect. Precomputed to
+    PRECOMPUTED_LEVELS and extended on demand past that.
+
+    """
+    def __init__(self, base, growth, levels):
+        self.base = base
+        self.growth = growth
+        self.per_level = [0]
+        self.cumulative = [0, 0]
+        self._extend(levels)
+
+    def _extend(self, level):
+        while len(self.per_level) <= level:
+            self.per_level.append(int(self.base * (self.growth ** (len(self.per_level) - 1))))
+        while len(self.cumulative) <= level + 1:
+            self.cumulative.append(self.cumulative[-1] + self.per_level[len(self.cumulative) - 1])
+
+    def xp_to_next(self, level) -> int:
+        if level >= len(self.per_level):
+            self._extend(level)
+        return self.per_level[level]
+
+    def apply(self, level, xp, xp_amount) -> tuple:
+        """
+        Returns (level, xp) after adding xp_amount to a (level, xp-into-level) pair.
+        """
+        xp += xp_amount
+        if xp < self.xp_to_next(level):
+            return level, xp
+
+        total = self.cumulative[level] + xp
+        while self.cumulative[-1] <= total:
+            self._extend(len(self.cumulative))
+        new_level = bisect_right(self.cumulative, total) - 1
+        return new_level, total - self.cumulative[new_level]
+
+
+PRECOMPUTED_LEVELS = 100
+MONSTER_XP = XPTable(base=50, growth=1.2, levels=PRECOMPUTED_LEVELS)
+PLAYER_XP = XPTable(base=100, growth=1.3, levels=PRECOMPUTED_LEVELS)
 
 def xp_to_next_monster_level(level: int) -> int:
     """
     XP required for a monster to reach the next level.
     
     """
-    return int(50 * (1.2 ** (level - 1)))
+    return MONSTER_XP.xp_to_next(level)
+
+def _apply_monster_xp(session, monster, xp_amount) -> dict:
+    old_level = monster.level
+    monster.level, monster.xp = MONSTER_XP.apply(monster.level, monster.xp, xp_amount)
+    leveled_up = monster.level > old_level
+    if leveled_up:
+        monster.current_stats = stats_for_monster(session, monster)
+
+    return {
+        "id": monster.id,
+        "nickname": monster.nickname,
+        "level": monster.level,
+        "xp": monster.xp,
+        "leveled_up": leveled_up,
+        "current_stats": monster.current_stats.to_dict(),
+    }
 
-def add_xp_to_monster(session, player_monster_id, xp_amount) -> dict:
+def add_xp_to_monster(session, player_monster_id, xp_amount, commit=True) -> dict:
     """
     Add XP to a monster, handling level-ups and stat recalculation.
+    Any number of level-ups resolves in one step with one stat recalculation.
+    Pass commit=False to leave the changes in the caller's transaction.
     
     """
     monster = session.query(PlayerMonster).filter_by(id=player_monster_id).first()
     if not monster:
         return {"error": "Monster not found."}
 
-    monster.xp += xp_amount
-    leveled_up = False
+    result = _apply_monster_xp(session, monster, xp_amount)
 
-    while monster.xp >= xp_to_next_monster_level(monster.level):
-        monster.xp -= xp_to_next_monster_level(monster.level)
-        monster.level += 1
-        calculate_stats(session, monster.id)
-        leveled_up = True
+    if commit:
+        session.commit()
 
-    session.commit()
+    return result
 
-    return {
-        "id": monster.id,
-        "nickname": monster.nickname,
-        "level": monster.level,
-        "xp": monster.xp,
-        "leveled_up": leveled_up,
-        "current_stats": monster.current_stats,
-    }
+def award_xp_many(session, awards: dict, commit=True) -> dict:
+    """
+    Add XP to many monsters at once, e.g. a team-wide battle reward.
+    Takes {monster_id: xp_amount} and returns {monster_id: result}, using the
+    same result dicts as add_xp_to_monster.
+    
+    """
+    results = {}
+    monster_ids = list(awards)
+    for start in range(0, len(monster_ids), AWARD_BATCH_SIZE):
+        batch = monster_ids[start:start + AWARD_BATCH_SIZE]
+        monsters = session.query(PlayerMonster).filter(PlayerMonster.id.in_(batch)).all()
+        for monster in monsters:
+            results[monster.id] = _apply_monster_xp(session, monster, awards[monster.id])
+
+    for monster_id in monster_ids:
+        results.setdefault(monster_id, {"error": "Monster not found."})
+
+    if commit:
+        session.commit()
+
+    return results
 
 def xp_to_next_player_level(level: int) -> int:
     """
     XP required for a player to reach the next level.
     """
-    return int(100 * (1.3 ** (level - 1)))
+    return PLAYER_XP.xp_to_next(level)
 
-def add_xp_to_player(session, player_id, xp_amount) -> dict:
+def add_xp_to_player(session, player_id, xp_amount, commit=True) -> dict:
     """
     Add XP to a player, handling level-ups.
+    Pass commit=False to leave the changes in the caller's transaction.
     """
     player = session.query(Player).filter_by(id=player_id).first()
     if not player:
         return {"error": "Player not found."}
 
-    player.xp += xp_amount
-    leveled_up = False
+    old_level = player.level
+    player.level, player.xp = PLAYER_XP.apply(player.level, player.xp, xp_amount)
+    leveled_up = player.level > old_level
 
-    while player.xp >= xp_to_next_player_level(player.level):
-        player.xp -= xp_to_next_player_level(player.level)
-        player.level += 1
-        leveled_up = True
-
-    session.commit()
+    if commit:
+        session.commit()
 
     return {
         "id": player.id,
@@ -0,0 +1,530 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from threading import RLock
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from game.database import begin_immediate
+from game.models import MonsterSpecies, PlayerMonster, TradeOffer
+from game.game_logic.outcome import Outcome
+from game.game_logic.settlement import SETTLED, TRANSFER
+
+# Longest swap the matcher looks for: 2 = plain pairs, 3 = three-way cycles
+MAX_CYCLE_LENGTH = 3
+# Candidate offers one match search may look at, pairs first; bounds a
+# search over a large book to well under a millisecond
+MAX_MATCH_VISITS = 512
+MATCH_BATCH_SIZE = 500
+LOAD_BATCH_SIZE = 10000
+IN_BATCH = 500
+
+# Unbounded level range
+MAX_LEVEL = 1 << 30
+
+# Per-match status besides SETTLED: an offer was withdrawn, or its monster
+# changed hands, level or species (or was released) since it was posted
+STALE = "stale"
+
+OFFER_COLUMNS = (
+    TradeOffer.id,
+    TradeOffer.player_id,
+    TradeOffer.monster_id,
+    TradeOffer.species_id,
+    TradeOffer.level,
+    TradeOffer.monster_caught_at,
+    TradeOffer.wanted_species_id,
+    TradeOffer.wanted_min_level,
+    TradeOffer.wanted_max_level,
+)
+
+_book = None
+
+
+class Offer:
+    """
+    In-memory copy of a TradeOffer row. A missing want means "anything".
+    """
+    __slots__ = ("id", "player_id", "monster_id", "species_id", "level", "caught_at",
+                 "wanted_species_id", "min_level", "max_level")
+
+    def __init__(self, id, player_id, monster_id, species_id, level, caught_at=None,
+                 wanted_species_id=None, min_level=None, max_level=None):
+        self.id = id
+        self.player_id = player_id
+        self.monster_id = monster_id
+        self.species_id = species_id
+        self.level = level
+        self.caught_at = caught_at
+        self.wanted_species_id = wanted_species_id
+        self.min_level = 0 if min_level is None else min_level
+        self.max_level = MAX_LEVEL if max_level is None else max_level
+
+    @property
+    def key(self) -> tuple:
+        return (self.level, self.id, self)
+
+    @property
+    def monster(self) -> tuple:
+        """
+        (owner, species, level, caught_at) of the offered monster as posted.
+        caught_at tells a new monster apart from a released one whose id it reused.
+        """
+        return (self.player_id, self.species_id, self.level, self.caught_at)
+
+    def accepts(self, species_id, level) -> bool:
+        return (
+            (self.wanted_species_id is None or self.wanted_species_id == species_id)
+            and self.min_level <= level <= self.max_level
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "offer_id": self.id,
+            "player_id": self.player_id,
+            "monster_id": self.monster_id,
+            "species_id": self.species_id,
+            "level": self.level,
+            "wanted_species_id": self.wanted_species_id,
+            "wanted_min_level": self.min_level or None,
+            "wanted_max_level": None if self.max_level == MAX_LEVEL else self.max_level,
+        }
+
+
+class OrderBook:
+    """
+    Open offers indexed for matching.
+
+    by_species[s][w] holds the sorted (level, offer id, offer) keys of the offers
+    giving species s and wanting species w (None: any species), so "who can
+    give me an s between levels a and b" is a bisect per bucket, and the
+    cycle search can skip whole buckets whose wants can't close the cycle.
+    """
+
+    def __init__(self):
+        self.offers = {}
+        self.by_monster = {}
+        self.by_species = {}
+        self.lock = RLock()
+
+    @classmethod
+    def load(cls, session, batch_size=LOAD_BATCH_SIZE):
+        book = cls()
+        after = 0
+        while True:
+            rows = session.execute(
+                select(*OFFER_COLUMNS).where(TradeOffer.id > after).order_by(TradeOffer.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                book.add(Offer(*row))
+            after = rows[-1].id
+        return book
+
+    def __len__(self):
+        return len(self.offers)
+
+    def __contains__(self, offer_id):
+        return offer_id in self.offers
+
+    def get(self, offer_id):
+        return self.offers.get(offer_id)
+
+    def add(self, offer: Offer):
+        with self.lock:
+            self.offers[offer.id] = offer
+            self.by_monster[offer.monster_id] = offer.id
+            wants = self.by_species.setdefault(offer.species_id, {})
+            insort(wants.setdefault(offer.wanted_species_id, []), offer.key)
+
+    def remove(self, offer_id):
+        """
+        Takes an offer out of the book; returns it, or None if it wasn't there.
+        """
+        with self.lock:
+            offer = self.offers.pop(offer_id, None)
+            if offer is None:
+                return None
+            del self.by_monster[offer.monster_id]
+            wants = self.by_species[offer.species_id]
+            keys = wants[offer.wanted_species_id]
+            del keys[bisect_left(keys, (offer.level, offer.id))]
+            if not keys:
+                del wants[offer.wanted_species_id]
+                if not wants:
+                    del self.by_species[offer.species_id]
+            return offer
+
+    def _givers(self, receiver: Offer, wanted=None):
+        """
+        Offers whose monster the receiver accepts, lowest level (then oldest)
+        first per bucket. With wanted, only offers wanting one of those
+        species (None in wanted: offers wanting anything).
+        """
+        if receiver.wanted_species_id is None:
+            species = list(self.by_species)
+        else:
+            species = (receiver.wanted_species_id,)
+        low = (receiver.min_level,)
+        high = (receiver.max_level + 1,)
+        for species_id in species:
+            wants = self.by_species.get(species_id)
+            if not wants:
+                continue
+            buckets = wants.values() if wanted is None else [wants[w] for w in wanted if w in wants]
+            for keys in buckets:
+                for i in range(bisect_left(keys, low), bisect_left(keys, high)):
+                    yield keys[i][2]
+
+    def _closers(self, first: Offer) -> set:
+        """
+        Wanted species an offer may have if some other offer could give to
+        it and close the cycle back to first.
+        """
+        closers = {
+            species_id for species_id, wants in self.by_species.items()
+            if first.species_id in wants or None in wants
+        }
+        if closers:
+            closers.add(None)
+        return closers
+
+    def _close(self, chain, players, budget):
+        """
+        chain plus one offer that gives to its last offer and takes the
+        first one's monster, or None.
+        """
+        first, last = chain[0], chain[-1]
+        for candidate in self._givers(last, (first.species_id, None)):
+            budget[0] -= 1
+            if budget[0] < 0:
+                return None
+            if candidate.player_id not in players and candidate.accepts(first.species_id, first.level):
+                return chain + [candidate]
+        return None
+
+    def _extend(self, chain, players, length, budget):
+        if len(chain) == length - 1:
+            return self._close(chain, players, budget)
+
+        wanted = self._closers(chain[0]) if len(chain) == length - 2 else None
+        if wanted is not None and not wanted:
+            return None
+        for candidate in self._givers(chain[-1], wanted):
+            budget[0] -= 1
+            if budget[0] < 0:
+                return None
+            if candidate.player_id in players:
+                continue
+            found = self._extend(chain + [candidate], players | {candidate.player_id}, length, budget)
+            if found:
+                return found
+        return None
+
+    def find_match(self, offer: Offer, max_length=MAX_CYCLE_LENGTH, max_visits=MAX_MATCH_VISITS):
+        """
+        The shortest cycle of open offers from different players that
+        includes offer, as a list starting with it in which every offer
+        gives its monster to the one before it (the first gives to the
+        last). A pair is a cycle of two. None if nothing matches within
+        max_visits candidates (lowest levels first).
+        """
+        budget = [max_visits]
+        with self.lock:
+            for length in range(2, max_length + 1):
+                cycle = self._extend([offer], {offer.player_id}, length, budget)
+                if cycle or budget[0] <= 0:
+                    return cycle
+        return None
+
+    def match(self, offer: Offer, max_length=MAX_CYCLE_LENGTH):
+        """
+        find_match, taking the matched offers out of the book so no other
+        match can claim them before settlement.
+        """
+        with self.lock:
+            cycle = self.find_match(offer, max_length)
+            if cycle:
+                for matched in cycle:
+                    self.remove(matched.id)
+            return cycle
+
+
+def _batches(values, size=IN_BATCH):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def cycle_legs(cycle) -> list:
+    """
+    (giver, receiver) offer pairs of a matched cycle.
+    """
+    return [(cycle[(i + 1) % len(cycle)], cycle[i]) for i in range(len(cycle))]
+
+
+def get_order_book(session) -> OrderBook:
+    """
+    Returns the in-process order book, rebuilding it from trade_offers on first use.
+    """
+    global _book
+    if _book is None:
+        _book = OrderBook.load(session)
+    return _book
+
+
+def reload_order_book(session) -> OrderBook:
+    """
+    Rebuilds the order book from trade_offers and swaps it in. Requests
+    already holding the old book finish on it.
+    """
+    global _book
+    _book = OrderBook.load(session)
+    return _book
+
+
+def invalidate_order_book():
+    """
+    Drops the in-process book so it reloads from trade_offers.
+    Call this after writing trade_offers outside this module.
+    """
+    global _book
+    _book = None
+
+
+def withdraw_offers(session, monster_ids):
+    """
+    Deletes the offers of monsters that are being released or handed to
+    another player, inside the caller's transaction, and takes them out of
+    the book.
+    """
+    monster_ids = list(monster_ids)
+    connection = session.connection()
+    for batch in _batches(monster_ids):
+        connection.execute(delete(TradeOffer.__table__).where(TradeOffer.monster_id.in_(batch)))
+    if _book is not None:
+        with _book.lock:
+            for monster_id in monster_ids:
+                offer_id = _book.by_monster.get(monster_id)
+                if offer_id is not None:
+                    _book.remove(offer_id)
+
+
+def _match_result(cycle, status) -> dict:
+    return {
+        "status": status,
+        "offer_ids": [offer.id for offer in cycle],
+        "legs": [
+            {"monster_id": giver.monster_id, "sender_id": giver.player_id, "receiver_id": receiver.player_id}
+            for giver, receiver in cycle_legs(cycle)
+        ],
+    }
+
+
+def _settle_in_transaction(session, cycles, returned) -> list:
+    """
+    Settles matched cycles inside the caller's BEGIN IMMEDIATE transaction.
+    A cycle moves all of its monsters or none. Each cycle first deletes its
+    offer rows; unless every row was still there (none was cancelled) and
+    every monster is the one that was offered, the deletes are rolled back,
+    only the stale offers are dropped, and the others are appended to
+    returned.
+    """
+    connection = session.connection()
+    current = {}
+    monster_ids = [offer.monster_id for cycle in cycles for offer in cycle]
+    for batch in _batches(monster_ids):
+        for monster_id, *monster in connection.execute(
+            select(PlayerMonster.id, PlayerMonster.player_id, PlayerMonster.species_id, PlayerMonster.level,
+                   PlayerMonster.caught_at)
+            .where(PlayerMonster.id.in_(batch))
+        ):
+            current[monster_id] = tuple(monster)
+
+    results = []
+    transfers = []
+    for cycle in cycles:
+        if len({offer.player_id for offer in cycle}) != len(cycle):
+            raise ValueError("a trade cycle needs a different player for every offer")
+        savepoint = connection.begin_nested()
+        open_ids = set(connection.execute(
+            delete(TradeOffer.__table__)
+            .where(TradeOffer.id.in_([offer.id for offer in cycle]))
+            .returning(TradeOffer.id)
+        ).scalars())
+        changed = [offer for offer in cycle if current.get(offer.monster_id) != offer.monster]
+        if len(open_ids) != len(cycle) or changed:
+            savepoint.rollback()
+            if changed:
+                connection.execute(
+                    delete(TradeOffer.__table__).where(TradeOffer.id.in_([offer.id for offer in changed]))
+                )
+            returned.extend(offer for offer in cycle if offer.id in open_ids and offer not in changed)
+            results.append(_match_result(cycle, STALE))
+            continue
+        savepoint.commit()
+
+        for giver, receiver in cycle_legs(cycle):
+            transfers.append({
+                "monster_id": giver.monster_id,
+                "sender_id": giver.player_id,
+                "receiver_id": receiver.player_id,
+            })
+            current[giver.monster_id] = (receiver.player_id, giver.species_id, giver.level, giver.caught_at)
+        results.append(_match_result(cycle, SETTLED))
+
+    # Ownership was checked under the write lock above, so every
+    # conditional transfer must hit its row. Everyone in a cycle gives one
+    # monster and gets one back, so collection_size doesn't change.
+    if transfers and connection.execute(TRANSFER, transfers).rowcount != len(transfers):
+        raise RuntimeError("a traded monster changed hands during settlement")
+    return results
+
+
+def settle_matches(session, cycles, book=None, batch_size=MATCH_BATCH_SIZE) -> list:
+    """
+    Settles matched cycles (from OrderBook.match), one BEGIN IMMEDIATE
+    transaction per batch, and returns one result dict per cycle: status
+    (settled / stale), offer_ids and legs (monster_id, sender_id,
+    receiver_id). Stale offers are deleted; the other offers of a stale
+    cycle that are still open go back into the book.
+    """
+    if book is None:
+        book = get_order_book(session)
+    cycles = list(cycles)
+    results = []
+    for batch in _batches(cycles, batch_size):
+        returned = []
+        begin_immediate(session)
+        try:
+            results.extend(_settle_in_transaction(session, batch, returned))
+            session.commit()
+        except Exception:
+            session.rollback()
+            for cycle in batch:
+                for offer in cycle:
+                    if offer.id not in book:
+                        book.add(offer)
+            raise
+        for offer in returned:
+            book.add(offer)
+    return results
+
+
+def match_open_offers(session, book=None, batch_size=MATCH_BATCH_SIZE, max_length=MAX_CYCLE_LENGTH) -> Counter:
+    """
+    Matches every open offer it can, oldest first, and settles the matches
+    in batches (e.g. after rebuilding the book). Returns a Counter of statuses.
+    """
+    if book is None:
+        book = get_order_book(session)
+    statuses = Counter()
+    pending = []
+    for offer_id in sorted(book.offers):
+        offer = book.get(offer_id)
+        if offer is None:
+            continue
+        cycle = book.match(offer, max_length)
+        if cycle:
+            pending.append(cycle)
+        if len(pending) == batch_size:
+            statuses.update(result["status"] for result in settle_matches(session, pending, book, batch_size))
+            pending = []
+    if pending:
+        statuses.update(result["status"] for result in settle_matches(session, pending, book, batch_size))
+    return statuses
+
+
+def _describe_want(session, offer: Offer) -> str:
+    if offer.wanted_species_id is None:
+        want = "any monster"
+    else:
+        species = session.get(MonsterSpecies, offer.wanted_species_id)
+        want = f"a {species.name}" if species else f"species #{offer.wanted_species_id}"
+    if offer.min_level and offer.max_level != MAX_LEVEL:
+        want += f" (Lv {offer.min_level}-{offer.max_level})"
+    elif offer.min_level:
+        want += f" (Lv {offer.min_level}+)"
+    elif offer.max_level != MAX_LEVEL:
+        want += f" (up to Lv {offer.max_level})"
+    return want
+
+
+def post_offer(session, player, monster_id, wanted_species_id=None, min_level=None, max_level=None,
+               settle=True) -> Outcome:
+    """
+    Puts one of the player's monsters on the market and, if settle, swaps it
+    right away when the book holds a matching pair or cycle.
+    """
+    outcome = Outcome("offer", offer_id=None, match=None)
+    if min_level is not None and max_level is not None and min_level > max_level:
+        return outcome.fail("❗ The minimum level is above the maximum level.")
+    monster = session.get(PlayerMonster, monster_id)
+    if monster is None or monster.player_id != player.id:
+        return outcome.fail("❗ You don't own that monster.")
+    name = monster.nickname or monster.species.name
+
+    book = get_order_book(session)
+    if monster_id in book.by_monster:
+        return outcome.fail(f"❗ {name} is already on the market.")
+
+    row = TradeOffer(
+        player_id=player.id,
+        monster_id=monster.id,
+        species_id=monster.species_id,
+        level=monster.level,
+        monster_caught_at=monster.caught_at,
+        wanted_species_id=wanted_species_id,
+        wanted_min_level=min_level,
+        wanted_max_level=max_level,
+    )
+    session.add(row)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return outcome.fail(f"❗ {name} is already on the market.")
+
+    offer = Offer(row.id, player.id, monster.id, monster.species_id, monster.level, monster.caught_at,
+                  wanted_species_id, min_level, max_level)
+    book.add(offer)
+    outcome.data["offer_id"] = offer.id
+    outcome.say(f"📋 Offered {name} (Lv {offer.level}) for {_describe_want(session, offer)}.")
+
+    if settle:
+        cycle = book.match(offer)
+        if cycle:
+            result = settle_matches(session, [cycle], book)[0]
+            outcome.data["match"] = result
+            if result["status"] == SETTLED:
+                received = session.get(PlayerMonster, cycle[1].monster_id)
+                parties = "two" if len(cycle) == 2 else f"{len(cycle)}"
+                outcome.say(f"🔄 Matched a {parties}-way swap: {name} for "
+                            f"{received.nickname or received.species.name} (Lv {received.level}).")
+    return outcome
+
+
+def cancel_offer(session, player, offer_id) -> Outcome:
+    """
+    Takes one of the player's offers off the market.
+    """
+    outcome = Outcome("cancel_offer", offer_id=offer_id)
+    begin_immediate(session)
+    row = session.get(TradeOffer, offer_id)
+    if row is None or row.player_id != player.id:
+        session.rollback()
+        return outcome.fail("❗ You have no such offer.")
+    session.delete(row)
+    session.commit()
+    # A match that took the offer out of the book first finds its row gone
+    # and settles as stale
+    get_order_book(session).remove(offer_id)
+    return outcome.say(f"🗑️ Offer #{offer_id} withdrawn.")
+
+
+def player_offers(session, player) -> list:
+    """
+    The player's open offers, oldest first.
+    """
+    rows = session.execute(
+        select(*OFFER_COLUMNS).where(TradeOffer.player_id == player.id).order_by(TradeOffer.id)
+    ).all()
+    return [Offer(*row).to_dict() for row in rows]
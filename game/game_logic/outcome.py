@@ -0,0 +1,63 @@
+class Outcome:
+    """
+    Structured result of a game action.
+
+    `events` are the lines a player would read, in order; the pure game
+    functions fill them in and never print. `render` shows them on the CLI.
+    """
+    __slots__ = ("action", "ok", "won", "events", "xp", "money", "achievements", "damage_log", "data")
+
+    def __init__(self, action, **data):
+        self.action = action
+        self.ok = True
+        self.won = None
+        self.events = []
+        self.xp = 0
+        self.money = 0
+        self.achievements = []
+        self.damage_log = []
+        self.data = data
+
+    def say(self, message):
+        self.events.append(message)
+        return self
+
+    def fail(self, message):
+        """
+        Marks the action as not carried out (no monsters, bad choice...).
+        """
+        self.ok = False
+        self.events.append(message)
+        return self
+
+    def merge(self, other):
+        """
+        Folds a follow-up outcome (e.g. an achievement check) into this one.
+        """
+        self.events.extend(other.events)
+        self.achievements.extend(other.achievements)
+        self.xp += other.xp
+        self.money += other.money
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "action": self.action,
+            "ok": self.ok,
+            "won": self.won,
+            "xp": self.xp,
+            "money": self.money,
+            "achievements": self.achievements,
+            "damage_log": self.damage_log,
+            "events": self.events,
+            **self.data,
+        }
+
+
+def render(outcome: Outcome) -> Outcome:
+    """
+    Prints an outcome's events to the terminal.
+    """
+    for line in outcome.events:
+        print(line)
+    return outcome
@@ -1,4 +1,5 @@
-from game.models import Player
+from game.models import Player, PlayerStats
+from game.game_logic.player_stats import COUNTERS
 
 def create_player(session, name):
     """
@@ -11,6 +12,8 @@ def create_player(session, name):
 
     new_player = Player(name=name)
     session.add(new_player)
+    session.flush()
+    session.add(PlayerStats(player_id=new_player.id, **{counter: 0 for counter in COUNTERS}))
     session.commit()
     print(f"Player '{name}' created!")
     return new_player
@@ -0,0 +1,76 @@
+from sqlalchemy import inspect
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.sql import ClauseElement
+from game.models import PlayerStats
+
+COUNTERS = ("catches", "legendary_catches", "wins", "collection_size")
+
+
+def get_player_stats(session, player_id) -> PlayerStats:
+    """
+    Returns the player's counter row, creating an empty one if needed.
+    The row is inserted with ON CONFLICT DO NOTHING, so two sessions creating
+    it at once don't fail on the primary key.
+    """
+    stats = session.get(PlayerStats, player_id)
+    if stats is None:
+        session.execute(
+            insert(PlayerStats.__table__)
+            .values(player_id=player_id, **{name: 0 for name in COUNTERS})
+            .on_conflict_do_nothing(index_elements=["player_id"])
+        )
+        stats = session.get(PlayerStats, player_id)
+    return stats
+
+
+def bump_player_stats(session, player_id, **deltas) -> PlayerStats:
+    """
+    Adds the given deltas to a player's counters without committing,
+    so the update lands in the same transaction as the event itself.
+
+    Existing rows are updated in SQL ("SET wins = wins + 1"), so concurrent
+    sessions can't overwrite each other's increments.
+    """
+    stats = get_player_stats(session, player_id)
+    pending = inspect(stats).pending
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        current = stats.__dict__.get(name)
+        if isinstance(current, ClauseElement):
+            setattr(stats, name, current + delta)
+        elif pending:
+            setattr(stats, name, getattr(stats, name) + delta)
+        else:
+            setattr(stats, name, getattr(PlayerStats, name) + delta)
+    return stats
+
+
+def record_catch(session, player_id, species) -> PlayerStats:
+    """
+    Counts a successful catch (and a legendary catch when it is one).
+    """
+    legendary = 1 if (species.rarity or "").lower() == "legendary" else 0
+    return bump_player_stats(session, player_id, catches=1, legendary_catches=legendary, collection_size=1)
+
+
+def record_win(session, player_id) -> PlayerStats:
+    """
+    Counts a recorded battle win.
+    """
+    return bump_player_stats(session, player_id, wins=1)
+
+
+def record_transfer(session, from_player_id, to_player_id):
+    """
+    Moves one monster between two players' collection counts.
+    """
+    bump_player_stats(session, from_player_id, collection_size=-1)
+    bump_player_stats(session, to_player_id, collection_size=1)
+
+
+def record_release(session, player_id) -> PlayerStats:
+    """
+    Counts a monster leaving the player's collection.
+    """
+    return bump_player_stats(session, player_id, collection_size=-1)
@@ -0,0 +1,125 @@
+from collections import Counter
+from sqlalchemy import bindparam, delete, select, update
+from game.database import begin_immediate
+from game.models import PlayerMonster, PlayerStats, Trade
+from game.game_logic.player_stats import bump_player_stats
+
+SETTLEMENT_BATCH_SIZE = 500
+
+# Per-trade statuses
+SETTLED = "settled"
+NOT_OWNER = "not_owner"
+NOT_FOUND = "not_found"
+
+# Moves the monster only if the sender still owns it, so two settlements
+# racing for the same monster can't both succeed.
+TRANSFER = (
+    update(PlayerMonster.__table__)
+    .where(PlayerMonster.id == bindparam("monster_id"), PlayerMonster.player_id == bindparam("sender_id"))
+    .values(player_id=bindparam("receiver_id"))
+)
+
+
+def _result(trade_id, status, trade=None) -> dict:
+    return {
+        "trade_id": trade_id,
+        "status": status,
+        "monster_id": trade.monster_sent if trade else None,
+        "sender_id": trade.sender_id if trade else None,
+        "receiver_id": trade.receiver_id if trade else None,
+    }
+
+
+def settle_in_transaction(session, trade_ids, discard_stale=False) -> list:
+    """
+    Settles trades inside the caller's (already BEGIN IMMEDIATE) transaction
+    without committing. Trades run in id order, so a chain A->B, B->C in one
+    batch works. Settled trades are deleted; stale ones (sender no longer owns
+    the monster) are kept unless discard_stale. Marketplace offers of the
+    monsters that moved are withdrawn.
+    """
+    # marketplace imports this module for TRANSFER
+    from game.game_logic.marketplace import withdraw_offers
+
+    connection = session.connection()
+    trades = connection.execute(
+        select(Trade.id, Trade.sender_id, Trade.receiver_id, Trade.monster_sent)
+        .where(Trade.id.in_(trade_ids))
+        .order_by(Trade.id)
+    ).all()
+
+    results = {}
+    collection_deltas = Counter()
+    finished = []
+    moved_monsters = []
+    for trade in trades:
+        moved = connection.execute(TRANSFER, {
+            "monster_id": trade.monster_sent,
+            "sender_id": trade.sender_id,
+            "receiver_id": trade.receiver_id,
+        }).rowcount == 1
+        if moved:
+            collection_deltas[trade.sender_id] -= 1
+            collection_deltas[trade.receiver_id] += 1
+            finished.append(trade.id)
+            moved_monsters.append(trade.monster_sent)
+        elif discard_stale:
+            finished.append(trade.id)
+        results[trade.id] = _result(trade.id, SETTLED if moved else NOT_OWNER, trade)
+
+    if finished:
+        connection.execute(delete(Trade.__table__).where(Trade.id.in_(finished)))
+    if moved_monsters:
+        withdraw_offers(session, moved_monsters)
+    changed = [player_id for player_id, delta in collection_deltas.items() if delta]
+    if changed:
+        # Load the counter rows in one query (held so the identity map keeps
+        # them) and bump them without a flush per player
+        loaded = session.query(PlayerStats).filter(PlayerStats.player_id.in_(changed)).all()
+        with session.no_autoflush:
+            for player_id in changed:
+                bump_player_stats(session, player_id, collection_size=collection_deltas[player_id])
+        del loaded
+
+    return [results.get(trade_id) or _result(trade_id, NOT_FOUND) for trade_id in trade_ids]
+
+
+def settle_trades(session, trade_ids, batch_size=SETTLEMENT_BATCH_SIZE, discard_stale=False) -> list:
+    """
+    Settles queued trades, one BEGIN IMMEDIATE transaction per batch, and
+    returns one result dict per trade id: trade_id, status (settled /
+    not_owner / not_found), monster_id, sender_id, receiver_id.
+    """
+    trade_ids = list(trade_ids)
+    results = []
+    for start in range(0, len(trade_ids), batch_size):
+        batch = trade_ids[start:start + batch_size]
+        begin_immediate(session)
+        try:
+            results.extend(settle_in_transaction(session, batch, discard_stale))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    return results
+
+
+def settle_pending_trades(session, batch_size=SETTLEMENT_BATCH_SIZE, limit=None, discard_stale=True) -> Counter:
+    """
+    Settles every queued trade (oldest first, up to limit) in batches.
+    Stale trades are discarded so they are not retried forever.
+    Returns a Counter of statuses.
+    """
+    statuses = Counter()
+    after = 0
+    while limit is None or sum(statuses.values()) < limit:
+        size = batch_size if limit is None else min(batch_size, limit - sum(statuses.values()))
+        trade_ids = list(session.execute(
+            select(Trade.id).where(Trade.id > after).order_by(Trade.id).limit(size)
+        ).scalars())
+        if not trade_ids:
+            break
+        for result in settle_trades(session, trade_ids, batch_size, discard_stale):
+            statuses[result["status"]] += 1
+        after = trade_ids[-1]
+    return statuses
@@ -0,0 +1,289 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+from threading import RLock
+from sqlalchemy import func, select
+from game.models import Player, friend_association, rival_association
+
+# Players per id-range query when loading an association table
+LOAD_ID_RANGE = 50000
+# Edges added since the last load before they're folded into the arrays
+COMPACT_THRESHOLD = 100000
+MAX_DEPTH = 6
+
+_graph = None
+
+
+class Adjacency:
+    """
+    One directed relation in CSR form.
+
+    The targets of player p are targets[offsets[p]:offsets[p + 1]], sorted,
+    so offsets is indexed by player id and a membership check is a bisect
+    within one row. Edges added after the load go into a small overlay of
+    sets until there are enough of them to rebuild the arrays.
+    """
+
+    def __init__(self, offsets=None, targets=None):
+        self.offsets = offsets if offsets is not None else array('q', [0])
+        self.targets = targets if targets is not None else array('i')
+        self.overlay = {}
+        self.overlay_edges = 0
+
+    @classmethod
+    def load(cls, session, table, target_column, id_range=LOAD_ID_RANGE):
+        """
+        Builds the arrays from an association table, one player-id range per query.
+        """
+        source = table.c.player_id
+        target = table.c[target_column]
+        max_id = max(
+            session.scalar(select(func.max(Player.id))) or 0,
+            session.scalar(select(func.max(source))) or 0,
+        )
+        counts = array('q', [0]) * (max_id + 1)
+        targets = array('i')
+        for low in range(0, max_id + 1, id_range):
+            rows = session.execute(
+                select(source, target)
+                .where(source >= low, source < low + id_range)
+                .order_by(source, target)
+            ).all()
+            previous = (None, None)
+            for source_id, target_id in rows:
+                # The tables have no primary key; skip duplicate rows
+                if source_id == previous[0] and target_id == previous[1]:
+                    continue
+                previous = (source_id, target_id)
+                counts[source_id] += 1
+                targets.append(target_id)
+        return cls(array('q', accumulate(counts, initial=0)), targets)
+
+    def __len__(self):
+        return len(self.targets) + self.overlay_edges
+
+    def _row(self, player_id) -> tuple:
+        if player_id + 1 < len(self.offsets):
+            return self.offsets[player_id], self.offsets[player_id + 1]
+        return 0, 0
+
+    def neighbors(self, player_id) -> list:
+        start, end = self._row(player_id)
+        extra = self.overlay.get(player_id)
+        if not extra:
+            return self.targets[start:end].tolist()
+        return sorted(set(self.targets[start:end]) | extra)
+
+    def degree(self, player_id) -> int:
+        start, end = self._row(player_id)
+        return end - start + len(self.overlay.get(player_id, ()))
+
+    def has_edge(self, player_id, other_id) -> bool:
+        start, end = self._row(player_id)
+        i = bisect_left(self.targets, other_id, start, end)
+        if i < end and self.targets[i] == other_id:
+            return True
+        return other_id in self.overlay.get(player_id, ())
+
+    def add_edge(self, player_id, other_id) -> bool:
+        """
+        Adds an edge; False if it was already there.
+        """
+        if self.has_edge(player_id, other_id):
+            return False
+        self.overlay.setdefault(player_id, set()).add(other_id)
+        self.overlay_edges += 1
+        if self.overlay_edges >= COMPACT_THRESHOLD:
+            self.compact()
+        return True
+
+    def compact(self):
+        """
+        Folds the overlay into the arrays.
+        """
+        if not self.overlay:
+            return
+        n = max(len(self.offsets) - 1, max(self.overlay) + 1)
+        counts = array('q', [0]) * n
+        targets = array('i')
+        for player_id in range(n):
+            row = self.neighbors(player_id)
+            counts[player_id] = len(row)
+            targets.extend(row)
+        self.offsets = array('q', accumulate(counts, initial=0))
+        self.targets = targets
+        self.overlay = {}
+        self.overlay_edges = 0
+
+    def reversed(self):
+        """
+        The same relation with every edge pointing the other way.
+        """
+        self.compact()
+        n = len(self.offsets) - 1
+        if self.targets:
+            n = max(n, max(self.targets) + 1)
+        counts = array('q', [0]) * n
+        for target in self.targets:
+            counts[target] += 1
+        offsets = array('q', accumulate(counts, initial=0))
+        fill = offsets[:-1]
+        targets = array('i', bytes(4 * len(self.targets)))
+        # Sources are visited in ascending order, so every row comes out sorted
+        for source in range(len(self.offsets) - 1):
+            for i in range(self.offsets[source], self.offsets[source + 1]):
+                target = self.targets[i]
+                targets[fill[target]] = source
+                fill[target] += 1
+        return Adjacency(offsets, targets)
+
+
+class SocialGraph:
+    """
+    Friends and rivals of every player, plus the reverse friend edges
+    ("who has me as a friend") for the bidirectional search.
+    Friendships are one-way, like the association tables.
+    """
+
+    def __init__(self, friends: Adjacency, rivals: Adjacency):
+        self.friends = friends
+        self.followers = friends.reversed()
+        self.rivals = rivals
+        self.lock = RLock()
+
+    @classmethod
+    def load(cls, session):
+        return cls(
+            Adjacency.load(session, friend_association, "friend_id"),
+            Adjacency.load(session, rival_association, "rival_id"),
+        )
+
+    def is_friend(self, player_id, other_id) -> bool:
+        with self.lock:
+            return self.friends.has_edge(player_id, other_id)
+
+    def is_rival(self, player_id, other_id) -> bool:
+        with self.lock:
+            return self.rivals.has_edge(player_id, other_id)
+
+    def friend_ids(self, player_id) -> list:
+        with self.lock:
+            return self.friends.neighbors(player_id)
+
+    def rival_ids(self, player_id) -> list:
+        with self.lock:
+            return self.rivals.neighbors(player_id)
+
+    def add_friend(self, player_id, other_id) -> bool:
+        with self.lock:
+            if not self.friends.add_edge(player_id, other_id):
+                return False
+            self.followers.add_edge(other_id, player_id)
+            return True
+
+    def add_rival(self, player_id, other_id) -> bool:
+        with self.lock:
+            return self.rivals.add_edge(player_id, other_id)
+
+    def mutual_friends(self, player_id, other_id) -> list:
+        """
+        Players both of them have as friends.
+        """
+        with self.lock:
+            mine = self.friends.neighbors(player_id)
+            theirs = self.friends.neighbors(other_id)
+        if len(mine) > len(theirs):
+            mine, theirs = theirs, mine
+        theirs = set(theirs)
+        return [friend_id for friend_id in mine if friend_id in theirs]
+
+    def mutual_friend_count(self, player_id, other_id) -> int:
+        return len(self.mutual_friends(player_id, other_id))
+
+    def recommend_friends(self, player_id, limit=10) -> list:
+        """
+        Friends of friends the player hasn't added yet, as (player_id,
+        mutual friends) pairs, most mutual friends first.
+        """
+        with self.lock:
+            overlap = Counter()
+            for friend_id in self.friends.neighbors(player_id):
+                overlap.update(self.friends.neighbors(friend_id))
+            overlap.pop(player_id, None)
+            candidates = [
+                (candidate_id, count) for candidate_id, count in overlap.items()
+                if not self.friends.has_edge(player_id, candidate_id)
+            ]
+        candidates.sort(key=lambda pair: (-pair[1], pair[0]))
+        return candidates[:limit]
+
+    def degrees_of_separation(self, player_id, other_id, max_depth=MAX_DEPTH):
+        """
+        Length of the shortest chain of friend links from one player to the
+        other (1 = direct friend), or None if there is none within max_depth.
+        Searches from both ends at once, always growing the smaller frontier.
+        """
+        if player_id == other_id:
+            return 0
+        with self.lock:
+            forward, backward = {player_id: 0}, {other_id: 0}
+            forward_frontier, backward_frontier = [player_id], [other_id]
+            for _ in range(max_depth):
+                if not forward_frontier or not backward_frontier:
+                    break
+                if len(forward_frontier) <= len(backward_frontier):
+                    forward_frontier, length = _expand(forward_frontier, forward, backward, self.friends)
+                else:
+                    backward_frontier, length = _expand(backward_frontier, backward, forward, self.followers)
+                if length is not None:
+                    return length
+        return None
+
+
+def _expand(frontier, seen, other_seen, edges) -> tuple:
+    """
+    One BFS layer: (next frontier, shortest path length if the two searches met).
+    """
+    next_frontier = []
+    best = None
+    for node in frontier:
+        for neighbor in edges.neighbors(node):
+            if neighbor in other_seen:
+                length = seen[node] + 1 + other_seen[neighbor]
+                if best is None or length < best:
+                    best = length
+            if neighbor not in seen:
+                seen[neighbor] = seen[node] + 1
+                next_frontier.append(neighbor)
+    return next_frontier, best
+
+
+def get_social_graph(session) -> SocialGraph:
+    """
+    Returns the in-process social graph, loading it from the association tables on first use.
+    """
+    global _graph
+    if _graph is None:
+        _graph = SocialGraph.load(session)
+    return _graph
+
+
+def reload_social_graph(session) -> SocialGraph:
+    """
+    Rebuilds the graph from the association tables and swaps it in.
+    Requests already holding the old graph finish on it.
+    """
+    global _graph
+    _graph = SocialGraph.load(session)
+    return _graph
+
+
+def invalidate_social_graph():
+    """
+    Drops the in-process graph so it reloads from the association tables.
+    Call this after writing friend/rival rows outside add_friend / add_rival.
+    """
+    global _graph
+    _graph = None
+
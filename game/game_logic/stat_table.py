@@ -0,0 +1,112 @@
+from array import array
+from game.database import invalidate_on_commit
+from game.models import STAT_NAMES, MonsterSpecies, Stats
+
+MAX_LEVEL = 100
+
+_table = None
+
+
+def stats_for_level(base_stats, level) -> Stats:
+    """
+    Stat formula for a species' base stats (Stats or dict) at the given level.
+    Everything else reads these numbers through StatTable.
+    """
+    values = []
+    for stat_name in STAT_NAMES:
+        base_value = base_stats[stat_name]
+        if stat_name == "hp":
+            values.append(((base_value * 2 * level) // 100) + level + 10)
+        else:
+            values.append(((base_value * 2 * level) // 100) + 5)
+    return Stats(*values)
+
+
+class StatTable:
+    """
+    Stats of every species at levels 1..max_level in one flat int array.
+
+    The stats of species s at level l start at ((s * (max_level + 1)) + l) * 4,
+    in STAT_NAMES order, so a lookup is an offset and a slice. Species without
+    complete base stats, levels past max_level and unknown ids are misses.
+    """
+    __slots__ = ("size", "max_level", "cells", "known")
+
+    def __init__(self, size, max_level, cells, known):
+        self.size = size
+        self.max_level = max_level
+        self.cells = cells
+        self.known = known
+
+    @classmethod
+    def from_base_stats(cls, base_stats, max_level=MAX_LEVEL):
+        """
+        Builds the table from {species id: base stats (Stats or dict)}.
+        """
+        size = max(base_stats, default=-1) + 1
+        width = (max_level + 1) * len(STAT_NAMES)
+        cells = array('i', [0]) * (size * width)
+        known = bytearray(size)
+        for species_id, base in base_stats.items():
+            if base is None or any(base[name] is None for name in STAT_NAMES):
+                continue
+            known[species_id] = 1
+            for level in range(1, max_level + 1):
+                start = species_id * width + level * len(STAT_NAMES)
+                cells[start:start + len(STAT_NAMES)] = array('i', stats_for_level(base, level).__composite_values__())
+        return cls(size, max_level, cells, known)
+
+    @classmethod
+    def load(cls, session, max_level=MAX_LEVEL):
+        rows = session.query(MonsterSpecies.id, MonsterSpecies.base_stats).all()
+        return cls.from_base_stats(dict(rows), max_level)
+
+    def row(self, species_id, level):
+        """
+        (hp, attack, defense, speed) for a species at a level, or None on a miss.
+        """
+        if species_id is None or level is None:
+            return None
+        if not (0 <= species_id < self.size and 1 <= level <= self.max_level) or not self.known[species_id]:
+            return None
+        start = (species_id * (self.max_level + 1) + level) * len(STAT_NAMES)
+        return tuple(self.cells[start:start + len(STAT_NAMES)])
+
+    def stats(self, species_id, level):
+        row = self.row(species_id, level)
+        return Stats(*row) if row else None
+
+
+def get_stat_table(session) -> StatTable:
+    """
+    Returns the process-wide stat table, building it from monster_species on first use.
+    """
+    global _table
+    if _table is None:
+        _table = StatTable.load(session)
+    return _table
+
+
+def invalidate_stat_table():
+    """
+    Drops the cached table so the next lookup rebuilds it.
+    Call this after changing monster_species outside the ORM (bulk SQL, migrations).
+    """
+    global _table
+    _table = None
+
+
+def stats_for_monster(session, monster, level=None) -> Stats:
+    """
+    Stats for a monster at a level (its own by default). A table lookup, with
+    the formula as the fallback past MAX_LEVEL or for a species the table
+    doesn't cover.
+    """
+    level = monster.level if level is None else level
+    stats = get_stat_table(session).stats(monster.species_id, level)
+    if stats is None:
+        stats = stats_for_level(monster.species.base_stats, level)
+    return stats
+
+
+invalidate_on_commit([MonsterSpecies], invalidate_stat_table)
@@ -1,8 +1,14 @@
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime
 
-from game.models import Player, PlayerMonster, Trade, MonsterSpecies, Battle
+from game.database import begin_immediate
+from game.models import Player, PlayerMonster, Trade, friend_association, rival_association
+from game.game_logic.settlement import NOT_FOUND, SETTLED, settle_in_transaction, settle_trades
+from game.game_logic.leaderboards import SCOPED_BOARDS, leaderboard_page, get_rank, scope_members, scoped_leaderboard
+from game.game_logic.collections import load_player_monsters
+from game.game_logic.outcome import Outcome, render
+from game.game_logic.social_graph import get_social_graph
 
 
 # --- TRADE SYSTEM ---
@@ -26,24 +32,19 @@ def propose_trade(session: Session, sender_id: int, receiver_id: int, monster_se
 def accept_trade(session: Session, trade_id: int):
     """
     Accepts a trade by transferring the monster to the receiver and deleting the trade.
+    Settled through the trade-settlement engine, so a monster can't be
+    transferred twice by concurrent accepts.
     """
-    trade = session.query(Trade).get(trade_id)
-    if not trade:
+    result = settle_trades(session, [trade_id])[0]
+    if result["status"] == NOT_FOUND:
         print("Trade not found.")
         return None
-
-    sender = session.query(Player).get(trade.sender_id)
-    receiver = session.query(Player).get(trade.receiver_id)
-    monster = session.query(PlayerMonster).get(trade.monster_sent)
-
-    if monster.owner.id != sender.id:
+    if result["status"] != SETTLED:
         print("Sender does not own the monster anymore.")
         return None
 
-    monster.owner = receiver
-    session.delete(trade)
-    session.commit()
-    print(f"Trade accepted! Monster {monster.id} now belongs to Player {receiver.id}.")
+    monster = session.get(PlayerMonster, result["monster_id"])
+    print(f"Trade accepted! Monster {monster.id} now belongs to Player {result['receiver_id']}.")
     return monster
 
 
@@ -57,15 +58,14 @@ def resolve_trade_monsters(session: Session, player: Player):
         print("❗ Player not found.")
         return
 
-    player_monsters = session.query(PlayerMonster).filter_by(player_id=player.id).all()
+    player_monsters = load_player_monsters(session, player.id)
     if not player_monsters:
         print("❗ You don’t have any monsters to trade!")
         return
 
     print("\nYour Monsters:")
     for idx, pm in enumerate(player_monsters, 1):
-        species = session.query(MonsterSpecies).filter_by(id=pm.species_id).first()
-        print(f"{idx}. {pm.nickname} (Species: {species.name}, Level: {pm.level})")
+        print(f"{idx}. {pm.nickname} (Species: {pm.species.name}, Level: {pm.level})")
 
     try:
         choice = int(input("Enter the number of the monster you want to trade: "))
@@ -74,16 +74,53 @@ def resolve_trade_monsters(session: Session, player: Player):
         print("❗ Invalid choice.")
         return
 
-    selected_monster.player_id = target_player.id
+    render(trade_monster(session, player, target_player, selected_monster))
+
+
+def trade_monster(session: Session, player: Player, target_player: Player, monster: PlayerMonster) -> Outcome:
+    """
+    Hands one of the player's monsters to another player: the trade is queued
+    and settled in the same BEGIN IMMEDIATE transaction.
+    """
+    outcome = Outcome('trade', monster_id=monster.id, to=target_player.name)
+    nickname = monster.nickname
+
+    begin_immediate(session)
+    trade = Trade(
+        sender_id=player.id,
+        receiver_id=target_player.id,
+        monster_sent=monster.id,
+        created_at=datetime.utcnow()
+    )
+    session.add(trade)
+    session.flush()
+    result = settle_in_transaction(session, [trade.id], discard_stale=True)[0]
     session.commit()
-    print(f"🔄 Traded {selected_monster.nickname} to {target_player.name}!")
+
+    if result["status"] != SETTLED:
+        return outcome.fail(f"❗ You no longer own {nickname}.")
+    return outcome.say(f"🔄 Traded {nickname} to {target_player.name}!")
 
 
 # --- SOCIAL SYSTEM ---
 
+def _insert_edge(session, table, other_column, player_id, other_id) -> bool:
+    """
+    Inserts a friend/rival edge and commits. The unique constraint, not the
+    in-memory graph, decides whether it is new, so two processes adding the
+    same edge store it once. Returns True if this call added it.
+    """
+    added = session.execute(
+        sqlite_insert(table).values({"player_id": player_id, other_column: other_id}).on_conflict_do_nothing()
+    ).rowcount == 1
+    session.commit()
+    return added
+
+
 def add_friend(session: Session, player: Player, friend_name: str):
     """
     Adds another player as a friend if not already added.
+    Returns True if the friendship is new, False if it already existed.
     """
     friend = session.query(Player).filter_by(name=friend_name).first()
 
@@ -93,18 +130,21 @@ def add_friend(session: Session, player: Player, friend_name: str):
     if player.id == friend.id:
         print("❗ You can’t be your own friend.")
         return
-    if friend in player.friends:
-        print(f"✅ {friend.name} is already your friend.")
-        return
 
-    player.friends.append(friend)
-    session.commit()
+    added = _insert_edge(session, friend_association, "friend_id", player.id, friend.id)
+    # Another process may have added it; either way the graph should have it
+    get_social_graph(session).add_friend(player.id, friend.id)
+    if not added:
+        print(f"✅ {friend.name} is already your friend.")
+        return False
     print(f"👯 {friend.name} added as a friend!")
+    return True
 
 
 def add_rival(session: Session, player: Player, rival_name: str):
     """
     Adds another player as a rival if not already marked as one.
+    Returns True if the rivalry is new, False if it already existed.
     """
     rival = session.query(Player).filter_by(name=rival_name).first()
 
@@ -114,61 +154,68 @@ def add_rival(session: Session, player: Player, rival_name: str):
     if player.id == rival.id:
         print("❗ You can’t be your own rival.")
         return
-    if rival in player.rivals:
-        print(f"⚔️ {rival.name} is already your rival.")
-        return
 
-    player.rivals.append(rival)
-    session.commit()
+    added = _insert_edge(session, rival_association, "rival_id", player.id, rival.id)
+    get_social_graph(session).add_rival(player.id, rival.id)
+    if not added:
+        print(f"⚔️ {rival.name} is already your rival.")
+        return False
     print(f"💢 {rival.name} added as a rival!")
+    return True
 
 
 # --- LEADERBOARDS ---
 
-def get_battle_wins_leaderboard(session: Session, limit: int = 10):
+def get_battle_wins_leaderboard(session: Session, limit: int = 10, offset: int = 0):
     """
     Returns top players by number of battle wins.
     """
-    return (
-        session.query(
-            Player.name,
-            func.count(Battle.id).label("wins")
-        )
-        .join(Battle, Battle.winner_id == Player.id)
-        .group_by(Player.id)
-        .order_by(func.count(Battle.id).desc())
-        .limit(limit)
-        .all()
-    )
+    return leaderboard_page(session, "wins", limit, offset)
 
 
-def get_collection_leaderboard(session: Session, limit: int = 10):
+def get_collection_leaderboard(session: Session, limit: int = 10, offset: int = 0):
     """
     Returns top players by the size of their monster collection.
     """
-    return (
-        session.query(
-            Player.name,
-            func.count(PlayerMonster.id).label("collection_size")
-        )
-        .join(PlayerMonster, Player.id == PlayerMonster.player_id)
-        .group_by(Player.id)
-        .order_by(func.count(PlayerMonster.id).desc())
-        .limit(limit)
-        .all()
-    )
+    return leaderboard_page(session, "collection", limit, offset)
+
+
+def _format_rank(rank):
+    return f"#{rank}" if rank else "unranked"
 
 
-def show_leaderboards(session: Session):
+def show_leaderboards(session: Session, player: Player = None, pause: bool = True):
     """
     Displays the top players for wins and collections to the CLI.
     """
     print("\n🏆 Battle Wins Leaderboard:")
     for i, (username, wins) in enumerate(get_battle_wins_leaderboard(session), 1):
         print(f"{i}. {username} - {wins} wins")
+    if player:
+        print(f"Your rank: {_format_rank(get_rank(session, player.id, 'wins'))}")
 
     print("\n🐾 Monster Collection Leaderboard:")
     for i, (username, collection_size) in enumerate(get_collection_leaderboard(session), 1):
         print(f"{i}. {username} - {collection_size} monsters")
+    if player:
+        print(f"Your rank: {_format_rank(get_rank(session, player.id, 'collection'))}")
+        show_scoped_leaderboards(session, player)
 
-    input("\nPress Enter to return to the main menu...")
+    if pause:
+        input("\nPress Enter to return to the main menu...")
+
+
+def show_scoped_leaderboards(session: Session, player: Player, limit: int = 5):
+    """
+    Displays how the player ranks among their friends and among their rivals.
+    """
+    for scope, title in (("friends", "👯 Among your friends"), ("rivals", "💢 Among your rivals")):
+        # A board of just the player says nothing; skip it before querying
+        if not scope_members(session, player.id, scope):
+            continue
+        boards = {board: scoped_leaderboard(session, player.id, scope, board, limit) for board in SCOPED_BOARDS}
+        print(f"\n{title}:")
+        for board, unit in (("wins", "wins"), ("collection", "monsters"), ("level", "level")):
+            rows, rank = boards[board]
+            entries = ", ".join(f"{username} ({score})" for username, score in rows)
+            print(f"  By {unit}: {entries} - you are #{rank}")
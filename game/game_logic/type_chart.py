@@ -0,0 +1,80 @@
+from array import array
+from sqlalchemy import func
+from game.database import invalidate_on_commit
+from game.models import Type, TypeEffectiveness
+
+NEUTRAL = 1.0
+
+_chart = None
+
+
+class TypeChart:
+    """
+    Dense attacker x defender multiplier matrix indexed by Type.id.
+
+    Missing pairs (and unknown or None type ids) are neutral.
+    """
+    __slots__ = ("size", "cells")
+
+    def __init__(self, size, cells):
+        self.size = size
+        self.cells = cells
+
+    @classmethod
+    def load(cls, session):
+        max_id = session.query(func.max(Type.id)).scalar() or 0
+        max_ref = session.query(
+            func.max(TypeEffectiveness.attacking_type_id),
+            func.max(TypeEffectiveness.defending_type_id)
+        ).one()
+        size = max(max_id, *(ref or 0 for ref in max_ref)) + 1
+
+        cells = array('d', [NEUTRAL]) * (size * size)
+        rows = session.query(
+            TypeEffectiveness.attacking_type_id,
+            TypeEffectiveness.defending_type_id,
+            TypeEffectiveness.multiplier
+        ).all()
+        for attacker, defender, multiplier in rows:
+            if attacker is not None and defender is not None and multiplier is not None:
+                cells[attacker * size + defender] = multiplier
+        return cls(size, cells)
+
+    def multiplier(self, attacker_type_id, defender_type_id) -> float:
+        """
+        Multiplier for a single attack; one array lookup.
+        """
+        if attacker_type_id is None or defender_type_id is None:
+            return NEUTRAL
+        if not (0 <= attacker_type_id < self.size and 0 <= defender_type_id < self.size):
+            return NEUTRAL
+        return self.cells[attacker_type_id * self.size + defender_type_id]
+
+    def multipliers(self, pairs) -> list:
+        """
+        Multipliers for many (attacker_type_id, defender_type_id) pairs at once.
+        """
+        lookup = self.multiplier
+        return [lookup(attacker, defender) for attacker, defender in pairs]
+
+
+def get_type_chart(session) -> TypeChart:
+    """
+    Returns the process-wide type chart, loading it from the database on first use.
+    """
+    global _chart
+    if _chart is None:
+        _chart = TypeChart.load(session)
+    return _chart
+
+
+def invalidate_type_chart():
+    """
+    Drops the cached chart so the next lookup reloads it.
+    Call this after changing type_effectiveness outside the ORM (bulk SQL, migrations).
+    """
+    global _chart
+    _chart = None
+
+
+invalidate_on_commit([Type, TypeEffectiveness], invalidate_type_chart)
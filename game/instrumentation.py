@@ -0,0 +1,190 @@
+# Per-action SQL and latency instrumentation.
+#
+# instrument_engine(engine) hooks the engine's cursor and commit events; every
+# statement run inside `with track_action("explore"):` is charged to that
+# action. Finished actions are appended as JSON lines to a rotating stats file
+# (MONSTERS_STATS_FILE, default action_stats.jsonl). Set MONSTERS_SHOW_STATS=1
+# for an on-screen summary after each action.
+#
+# An action that runs the same statement shape more than
+# MONSTERS_N_PLUS_ONE_THRESHOLD times (default 10) is flagged as a likely N+1.
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+from game.database import Base
+
+STATS_FILE = os.environ.get("MONSTERS_STATS_FILE", "action_stats.jsonl")
+STATS_FILE_MAX_BYTES = 5 * 1024 * 1024
+STATS_FILE_BACKUPS = 3
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("MONSTERS_N_PLUS_ONE_THRESHOLD", "10"))
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_show_summary = os.environ.get("MONSTERS_SHOW_STATS") == "1"
+_stats_logger = None
+
+# Collapse expanded IN lists so "IN (?, ?)" and "IN (?, ?, ?)" count as one shape
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class ActionStats:
+    """
+    Counters for one tracked action.
+
+    rows counts ORM objects loaded plus rows changed by INSERT/UPDATE/DELETE
+    (SQLite reports no row count for SELECTs).
+    """
+
+    def __init__(self, action):
+        self.action = action
+        self.started_at = datetime.utcnow()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.commits = 0
+        self.rows = 0
+        self.wall_time = 0.0
+        self.statements = Counter()
+
+    def n_plus_one(self, threshold=None) -> list:
+        """
+        (statement shape, count) pairs run more than threshold times.
+        """
+        threshold = N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        return [(shape, count) for shape, count in self.statements.most_common() if count > threshold]
+
+    def to_dict(self) -> dict:
+        return {
+            "action": self.action,
+            "started_at": self.started_at.isoformat(),
+            "wall_ms": round(self.wall_time * 1000, 3),
+            "sql_ms": round(self.sql_time * 1000, 3),
+            "queries": self.queries,
+            "commits": self.commits,
+            "rows": self.rows,
+            "n_plus_one": [{"statement": shape, "count": count} for shape, count in self.n_plus_one()],
+        }
+
+    def summary(self) -> str:
+        return (
+            f"📊 {self.action}: {self.wall_time * 1000:.1f} ms, "
+            f"{self.queries} queries ({self.sql_time * 1000:.1f} ms SQL), "
+            f"{self.commits} commits, {self.rows} rows"
+        )
+
+
+def current_action():
+    """
+    The ActionStats being collected on this thread, or None.
+    """
+    return getattr(_local, "stats", None)
+
+
+def show_summary(enabled=True):
+    global _show_summary
+    _show_summary = enabled
+
+
+def _get_stats_logger():
+    global _stats_logger
+    if _stats_logger is None:
+        _stats_logger = logging.getLogger("game.instrumentation.stats")
+        _stats_logger.propagate = False
+        _stats_logger.setLevel(logging.INFO)
+        handler = RotatingFileHandler(STATS_FILE, maxBytes=STATS_FILE_MAX_BYTES, backupCount=STATS_FILE_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _stats_logger.addHandler(handler)
+    return _stats_logger
+
+
+def record(stats: ActionStats):
+    """
+    Writes a finished action to the stats file, warning about likely N+1 patterns.
+    """
+    _get_stats_logger().info(json.dumps(stats.to_dict()))
+
+    for shape, count in stats.n_plus_one():
+        logger.warning("Possible N+1 in %s: %d x %s", stats.action, count, shape)
+    if _show_summary:
+        print(stats.summary())
+        for shape, count in stats.n_plus_one():
+            print(f"   ❗ possible N+1: {count} x {shape[:100]}")
+
+
+@contextmanager
+def track_action(action: str, emit: bool = True):
+    """
+    Charges all SQL run on this thread inside the block to `action`.
+    """
+    outer = current_action()
+    stats = ActionStats(action)
+    _local.stats = stats
+    started = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.wall_time = time.perf_counter() - started
+        _local.stats = outer
+        if emit:
+            record(stats)
+
+
+# --- Engine hooks ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_action() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_action()
+    if stats is None:
+        return
+    started = conn.info.get("query_started")
+    if started:
+        stats.sql_time += time.perf_counter() - started.pop()
+    stats.queries += 1
+    stats.statements[statement_shape(statement)] += 1
+    if cursor.rowcount and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def _on_commit(conn):
+    stats = current_action()
+    if stats is not None:
+        stats.commits += 1
+
+
+def _on_load(target, context):
+    stats = current_action()
+    if stats is not None:
+        stats.rows += 1
+
+
+def instrument_engine(engine):
+    """
+    Hooks an engine's events (idempotent).
+    """
+    if event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "commit", _on_commit)
+    if not event.contains(Base, "load", _on_load):
+        event.listen(Base, "load", _on_load, propagate=True)
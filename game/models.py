@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime,Table
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime,Table, Index, UniqueConstraint
 from sqlalchemy.dialects.sqlite import JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import composite, relationship
 from game.database import Base 
 from datetime import datetime
 
@@ -8,14 +8,17 @@ from datetime import datetime
 
 friend_association = Table(
     'friend_association', Base.metadata,
-    Column('player_id', Integer, ForeignKey('players.id')),
-    Column('friend_id', Integer, ForeignKey('players.id'))
+    Column('player_id', Integer, ForeignKey('players.id'), index=True),
+    Column('friend_id', Integer, ForeignKey('players.id')),
+    # Every process inserts with ON CONFLICT DO NOTHING against this
+    UniqueConstraint('player_id', 'friend_id', name='uq_friend_association_player_id_friend_id')
 )
 
 rival_association = Table(
     'rival_association', Base.metadata,
-    Column('player_id', Integer, ForeignKey('players.id')),
-    Column('rival_id', Integer, ForeignKey('players.id'))
+    Column('player_id', Integer, ForeignKey('players.id'), index=True),
+    Column('rival_id', Integer, ForeignKey('players.id')),
+    UniqueConstraint('player_id', 'rival_id', name='uq_rival_association_player_id_rival_id')
 )
 
 
@@ -51,16 +54,91 @@ class Player(Base):
     trades_sent = relationship("Trade", foreign_keys="Trade.sender_id", back_populates="sender")
     trades_received = relationship("Trade", foreign_keys="Trade.receiver_id", back_populates="receiver")
     achievements = relationship("PlayerAchievement", back_populates="player")
+    stats = relationship("PlayerStats", back_populates="player", uselist=False)
 
 
 
+# Running per-player counters, bumped in the same transaction as the event they count
+class PlayerStats(Base):
+    __tablename__ = 'player_stats'
+
+    player_id = Column(Integer, ForeignKey('players.id'), primary_key=True)
+    catches = Column(Integer, nullable=False, default=0)
+    legendary_catches = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0, index=True)
+    collection_size = Column(Integer, nullable=False, default=0, index=True)
+
+    player = relationship("Player", back_populates="stats")
+
+    # Counters are bumped with "SET n = n + ?"; fetch the new values back on flush
+    __mapper_args__ = {"eager_defaults": True}
+
+
+
+STAT_NAMES = ("hp", "attack", "defense", "speed")
+
+
+class Stats:
+    """
+    A monster's four stats, mapped onto typed integer columns.
+
+    Treat it as immutable: assign a new Stats rather than changing one in
+    place, or the change won't be saved. Also readable like the old JSON
+    dicts (stats["attack"], stats.get("hp")).
+    """
+    __slots__ = STAT_NAMES
+
+    def __init__(self, hp=0, attack=0, defense=0, speed=0):
+        self.hp = hp
+        self.attack = attack
+        self.defense = defense
+        self.speed = speed
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(*(values.get(name, 0) for name in STAT_NAMES))
+
+    def __composite_values__(self):
+        return (self.hp, self.attack, self.defense, self.speed)
+
+    def to_dict(self) -> dict:
+        return dict(zip(STAT_NAMES, self.__composite_values__()))
+
+    def keys(self):
+        return STAT_NAMES
+
+    def items(self):
+        return zip(STAT_NAMES, self.__composite_values__())
+
+    def __getitem__(self, name):
+        if name not in STAT_NAMES:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name, default=None):
+        return getattr(self, name) if name in STAT_NAMES else default
+
+    def __eq__(self, other):
+        return isinstance(other, Stats) and self.__composite_values__() == other.__composite_values__()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return f"Stats(hp={self.hp}, attack={self.attack}, defense={self.defense}, speed={self.speed})"
+
+
 class MonsterSpecies(Base):
     __tablename__ = 'monster_species'
 
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True)
     type_id = Column(Integer, ForeignKey('types.id'))
-    base_stats = Column(JSON)
+    base_hp = Column(Integer)
+    base_attack = Column(Integer)
+    base_defense = Column(Integer)
+    base_speed = Column(Integer)
+    base_stats = composite(Stats, base_hp, base_attack, base_defense, base_speed)
     base_level = Column(Integer, nullable=False, default=1)
     rarity = Column(String)
     abilities = Column(JSON)
@@ -74,11 +152,17 @@ class PlayerMonster(Base):
     __tablename__ = 'player_monsters'
 
     id = Column(Integer, primary_key=True)
-    player_id = Column(Integer, ForeignKey('players.id'))
+    player_id = Column(Integer, ForeignKey('players.id'), index=True)
     species_id = Column(Integer, ForeignKey('monster_species.id'))
     nickname = Column(String)
     level = Column(Integer)
-    current_stats = Column(JSON)
+    hp = Column(Integer)
+    attack = Column(Integer)
+    defense = Column(Integer)
+    speed = Column(Integer)
+    current_stats = composite(Stats, hp, attack, defense, speed)
+    # HP left after the last battle; None means full health
+    current_hp = Column(Integer)
     caught_at = Column(DateTime, default=datetime.utcnow)
     xp = Column(Integer, default=0)
 
@@ -87,6 +171,14 @@ class PlayerMonster(Base):
     species = relationship("MonsterSpecies", back_populates="player_monsters")
     trade = relationship("Trade", back_populates="monster", uselist=False)
 
+    # Back the collection browser's sorts and filters; SQLite appends the rowid (id) to each
+    __table_args__ = (
+        Index('ix_player_monsters_player_level', 'player_id', 'level'),
+        Index('ix_player_monsters_player_caught_at', 'player_id', 'caught_at'),
+        Index('ix_player_monsters_player_species', 'player_id', 'species_id'),
+        Index('ix_player_monsters_player_nickname', 'player_id', 'nickname'),
+    )
+
 
 
 class Battle(Base):
@@ -95,7 +187,7 @@ class Battle(Base):
     id = Column(Integer, primary_key=True)
     player1_id = Column(Integer, ForeignKey('players.id'))
     player2_id = Column(Integer, ForeignKey('players.id'))
-    winner_id = Column(Integer, ForeignKey('players.id'))
+    winner_id = Column(Integer, ForeignKey('players.id'), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     player1 = relationship("Player", foreign_keys=[player1_id], back_populates="battles_as_player1")
@@ -108,8 +200,8 @@ class Trade(Base):
     __tablename__ = 'trades'
 
     id = Column(Integer, primary_key=True)
-    sender_id = Column(Integer, ForeignKey('players.id'))
-    receiver_id = Column(Integer, ForeignKey('players.id'))
+    sender_id = Column(Integer, ForeignKey('players.id'), index=True)
+    receiver_id = Column(Integer, ForeignKey('players.id'), index=True)
     monster_sent = Column(Integer, ForeignKey('player_monsters.id'))
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -118,6 +210,33 @@ class Trade(Base):
     monster = relationship("PlayerMonster", back_populates="trade")
 
 
+class TradeOffer(Base):
+    """
+    Open marketplace offer: a monster the player will give, and what they want
+    for it (species and/or level range; None means any). The offered
+    monster's species and level are copied in so the book can be rebuilt
+    from this table alone; with monster_caught_at they also tell whether
+    monster_id still names the monster that was offered.
+    """
+    __tablename__ = 'trade_offers'
+    # Offers are deleted when they settle; don't hand their ids out again
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = Column(Integer, primary_key=True)
+    player_id = Column(Integer, ForeignKey('players.id'), nullable=False, index=True)
+    monster_id = Column(Integer, ForeignKey('player_monsters.id'), nullable=False, unique=True)
+    species_id = Column(Integer, ForeignKey('monster_species.id'), nullable=False)
+    level = Column(Integer, nullable=False)
+    monster_caught_at = Column(DateTime)
+    wanted_species_id = Column(Integer, ForeignKey('monster_species.id'))
+    wanted_min_level = Column(Integer)
+    wanted_max_level = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    player = relationship("Player")
+    monster = relationship("PlayerMonster")
+
+
 
 class Achievement(Base):
     __tablename__ = 'achievements'
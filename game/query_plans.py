@@ -0,0 +1,125 @@
+# Query plan check for the hot lookups in battle.py, achievements.py, trade_social.py
+# and leaderboards.py.
+#
+#   python -m game.query_plans            # plans with the current schema
+#   python -m game.query_plans --compare  # before/after the hot foreign-key indexes
+#
+# --compare drops the hot indexes inside a transaction that is rolled back, so the
+# database is left untouched.
+
+import argparse
+from sqlalchemy import func
+
+from game.database import Session
+from game.models import (
+    Player, PlayerAchievement, PlayerMonster, PlayerStats, Trade, friend_association, rival_association
+)
+
+HOT_INDEXES = [
+    "ix_player_monsters_player_id",
+    "ix_trades_sender_id",
+    "ix_trades_receiver_id",
+    "ix_friend_association_player_id",
+    "ix_rival_association_player_id",
+    "ix_player_stats_wins",
+    "ix_player_stats_collection_size",
+]
+
+
+def hot_queries(session, player_id=1) -> list:
+    """
+    (label, query) pairs mirroring the queries the game runs most.
+    """
+    return [
+        ("battle: player monsters",
+         session.query(PlayerMonster).filter_by(player_id=player_id)),
+        ("achievements: player counters",
+         session.query(PlayerStats).filter_by(player_id=player_id)),
+        ("achievements: already unlocked",
+         session.query(PlayerAchievement.achievement_id).filter(
+             PlayerAchievement.player_id == player_id, PlayerAchievement.achievement_id.in_([1, 2, 3]))),
+        ("trade: trades sent",
+         session.query(Trade).filter_by(sender_id=player_id)),
+        ("trade: trades received",
+         session.query(Trade).filter_by(receiver_id=player_id)),
+        ("social: friends",
+         session.query(Player).join(friend_association, Player.id == friend_association.c.friend_id)
+         .filter(friend_association.c.player_id == player_id)),
+        ("social: rivals",
+         session.query(Player).join(rival_association, Player.id == rival_association.c.rival_id)
+         .filter(rival_association.c.player_id == player_id)),
+        ("leaderboard: wins page",
+         session.query(Player.name, PlayerStats.wins).join(Player, Player.id == PlayerStats.player_id)
+         .filter(PlayerStats.wins > 0).order_by(PlayerStats.wins.desc(), PlayerStats.player_id).limit(10)),
+        ("leaderboard: collection page",
+         session.query(Player.name, PlayerStats.collection_size).join(Player, Player.id == PlayerStats.player_id)
+         .filter(PlayerStats.collection_size > 0)
+         .order_by(PlayerStats.collection_size.desc(), PlayerStats.player_id).limit(10)),
+        ("leaderboard: wins rank",
+         session.query(func.count()).select_from(PlayerStats).filter(PlayerStats.wins > 10)),
+    ]
+
+
+def _sql(session, query) -> str:
+    return str(query.statement.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain_plans(cursor, statements, tag="") -> dict:
+    """
+    Runs EXPLAIN QUERY PLAN for each labelled statement on a DBAPI cursor.
+    The tag comment keeps sqlite3's statement cache from reusing an old plan.
+    """
+    plans = {}
+    for label, sql in statements:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql} /* {tag} */")
+        plans[label] = [row[3] for row in cursor.fetchall()]
+    return plans
+
+
+def compare_plans(session, player_id=1) -> tuple:
+    """
+    Returns (before, after) plans: without and with the hot foreign-key indexes.
+    """
+    statements = [(label, _sql(session, query)) for label, query in hot_queries(session, player_id)]
+
+    with session.get_bind().connect() as conn:
+        dbapi_conn = conn.connection.driver_connection
+        cursor = dbapi_conn.cursor()
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+        after = explain_plans(cursor, statements)
+        cursor.execute("BEGIN")
+        try:
+            for index_name in HOT_INDEXES:
+                if index_name in existing:
+                    cursor.execute(f"DROP INDEX {index_name}")
+            before = explain_plans(cursor, statements, tag="without hot indexes")
+        finally:
+            dbapi_conn.rollback()
+
+    return before, after
+
+
+def is_full_scan(plan) -> bool:
+    return any(step.startswith("SCAN") and "INDEX" not in step for step in plan)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show query plans for the hot game queries")
+    parser.add_argument("--player-id", type=int, default=1)
+    parser.add_argument("--compare", action="store_true", help="also show plans without the hot indexes")
+    args = parser.parse_args(argv)
+
+    session = Session()
+    before, after = compare_plans(session, args.player_id)
+    for label, plan in after.items():
+        print(f"\n{label}")
+        if args.compare:
+            print(f"  before: {' | '.join(before[label])}")
+        print(f"  now:    {' | '.join(plan)}")
+        if is_full_scan(plan):
+            print("  ❗ full table scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,40 +2,13 @@
 
 from faker import Faker
 from sqlalchemy.orm import sessionmaker
-from game.models import Player, MonsterSpecies, Achievement, Type,PlayerMonster
+from game.models import Player, MonsterSpecies, Achievement, Type,PlayerMonster, PlayerStats, Stats
 from game.database import engine
+from game.game_logic.stat_table import get_stat_table
 from datetime import datetime
 import random
 
 
-def create_random_player_monsters(player, session, min_monsters=2, max_monsters=4):
-    species_list = session.query(MonsterSpecies).all()
-    num_monsters = random.randint(min_monsters, max_monsters)
-
-    for _ in range(num_monsters):
-        species = random.choice(species_list)
-        mon_level = max(1, player.level + random.randint(-2, 2))  # keep it >= 1
-
-        # Example stat scaling: base_stat + level * some_factor
-        scaled_stats = {
-            "hp": species.base_stats["hp"] + (mon_level * 2),
-            "attack": species.base_stats["attack"] + (mon_level * 2),
-            "defense": species.base_stats["defense"] + (mon_level * 2),
-            "speed": species.base_stats["speed"] + (mon_level)
-        }
-
-        monster = PlayerMonster(
-            player=player,
-            species=species,
-            nickname=species.name,  # or random nickname if you want
-            level=mon_level,
-            xp=0,
-            current_hp=scaled_stats["hp"],
-            current_stats=scaled_stats
-        )
-        session.add(monster)
-
-
 Session = sessionmaker(bind=engine)
 session = Session()
 fake = Faker()
@@ -62,6 +35,14 @@ PREDEFINED_MONSTERS = [
     {"name": "Terradillo", "type": "Rock", "base_stats": {"hp": 75, "attack": 60, "defense": 80, "speed": 35}, "rarity": "Uncommon", "abilities": ["Rollout", "Harden"]},
 ]
 
+ACHIEVEMENTS = [
+    {"achievement_name": "First Catch", "description": "Catch your first monster", "unlock_condition": "catch_1"},
+    {"achievement_name": "Battle Novice", "description": "Win your first battle", "unlock_condition": "win_1"},
+    {"achievement_name": "Collector", "description": "Catch 10 monsters", "unlock_condition": "catch_10"},
+    {"achievement_name": "Champion", "description": "Win 50 battles", "unlock_condition": "win_50"},
+    {"achievement_name": "Legendary Hunter", "description": "Catch a legendary monster", "unlock_condition": "catch_legendary"},
+]
+
 def reset_database():
     from game.models import Base 
     Base.metadata.drop_all(bind=engine)
@@ -82,7 +63,7 @@ def seed_monster_species():
         species = MonsterSpecies(
             name=monster["name"],
             type_obj=type_obj,
-            base_stats=monster["base_stats"],
+            base_stats=Stats.from_dict(monster["base_stats"]),
             rarity=monster["rarity"],
             abilities=monster["abilities"]
         )
@@ -107,47 +88,41 @@ def seed_players(n):
     session.commit()
 
     # After players are committed, add monsters
+    species_list = session.query(MonsterSpecies).all()
     for player in players:
-        create_random_player_monsters(player, session)
+        create_random_player_monsters(player, session, species_list)
+        session.add(PlayerStats(
+            player_id=player.id,
+            catches=len(player.monsters),
+            legendary_catches=sum(1 for monster in player.monsters if monster.species.rarity == "Legendary"),
+            wins=0,
+            collection_size=len(player.monsters)
+        ))
 
     session.commit()
     return players
 
 def seed_achievements():
-    achievements = [
-        Achievement(achievement_name="First Catch", description="Catch your first monster", unlock_condition="catch_1"),
-        Achievement(achievement_name="Battle Novice", description="Win your first battle", unlock_condition="win_1"),
-        Achievement(achievement_name="Collector", description="Catch 10 monsters", unlock_condition="catch_10"),
-        Achievement(achievement_name="Champion", description="Win 50 battles", unlock_condition="win_50"),
-        Achievement(achievement_name="Legendary Hunter", description="Catch a legendary monster", unlock_condition="catch_legendary"),
-    ]
+    achievements = [Achievement(**achievement) for achievement in ACHIEVEMENTS]
     session.add_all(achievements)
     session.commit()
 
 
-def create_random_player_monsters(player, session, min_monsters=2, max_monsters=4):
-    species_list = session.query(MonsterSpecies).all()
+def create_random_player_monsters(player, session, species_list, min_monsters=2, max_monsters=4):
     num_monsters = random.randint(min_monsters, max_monsters)
+    stat_table = get_stat_table(session)
 
     for _ in range(num_monsters):
         species = random.choice(species_list)
         mon_level = max(1, player.level + random.randint(-2, 2))  # keep it >= 1
 
-        # Example stat scaling: base_stat + level * some_factor
-        scaled_stats = {
-            "hp": species.base_stats["hp"] + (mon_level * 2),
-            "attack": species.base_stats["attack"] + (mon_level * 2),
-            "defense": species.base_stats["defense"] + (mon_level * 2),
-            "speed": species.base_stats["speed"] + (mon_level)
-        }
-
         monster = PlayerMonster(
             owner=player,
             species=species,
             nickname=species.name,  # or random nickname if you want
             level=mon_level,
             xp=0,
-            current_stats=scaled_stats
+            current_stats=stat_table.stats(species.id, mon_level)
         )
         session.add(monster)
 
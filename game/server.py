@@ -0,0 +1,193 @@
+# Multi-user game server speaking line-delimited JSON.
+#
+#   python -m game.server --port 8765            # TCP on 127.0.0.1
+#   python -m game.server --unix /tmp/monsters.sock
+#
+# Each request is one JSON line, {"id": 1, "command": "login", "args": ["Alice"]},
+# and gets one JSON response line with the same id (see game.batch for the
+# command set and result format). Connections are handled by asyncio; game
+# actions run on a bounded thread pool, each request with its own Session.
+# A connection remembers who logged in on it.
+#
+# The order book and social graph live in memory. Other processes (batch runs,
+# the tournament, the settlement CLI) write their tables too, so every
+# --refresh seconds the server checks each table's row count and highest rowid
+# and reloads the caches whose tables changed.
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from game.batch import BatchState, run_command
+from game.database import make_engine
+from game.instrumentation import instrument_engine
+from game.models import Player
+from game.game_logic.marketplace import reload_order_book
+from game.game_logic.social_graph import reload_social_graph
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+DEFAULT_REFRESH_SECONDS = 5.0
+MAX_LINE_BYTES = 1024 * 1024
+
+# In-memory caches, the tables they are built from, and how to rebuild them
+CACHED_TABLES = {
+    "order book": (("trade_offers",), reload_order_book),
+    "social graph": (("friend_association", "rival_association"), reload_social_graph),
+}
+
+
+class ClientState:
+    """
+    Per-connection state. Only ids are kept; objects belong to request sessions.
+    """
+
+    def __init__(self):
+        self.player_id = None
+
+
+class GameServer:
+    def __init__(self, engine, workers=DEFAULT_WORKERS):
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="game-db")
+        instrument_engine(engine)
+        self.signatures = {}
+        # Build the in-memory order book and social graph before the first client arrives
+        self.refresh_caches()
+
+    def refresh_caches(self) -> list:
+        """
+        Reloads the caches whose tables changed since they were last loaded
+        and returns their names. The check and the reload read one snapshot,
+        so a write that lands during the reload is picked up next time.
+        """
+        reloaded = []
+        with self.Session() as session:
+            for name, (tables, reload) in CACHED_TABLES.items():
+                signature = tuple(
+                    tuple(session.execute(text(f"SELECT COUNT(*), MAX(rowid) FROM {table}")).one())
+                    for table in tables
+                )
+                if signature != self.signatures.get(name):
+                    reload(session)
+                    self.signatures[name] = signature
+                    reloaded.append(name)
+        return reloaded
+
+    async def refresh_periodically(self, interval):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Off the game pool, so requests don't queue behind a reload
+                await loop.run_in_executor(None, self.refresh_caches)
+            except Exception as e:
+                print(f"❗ Cache refresh failed: {type(e).__name__}: {e}", file=sys.stderr)
+
+    def handle_request(self, client: ClientState, request: dict) -> str:
+        """
+        Runs one request on a worker thread and returns the encoded response.
+        """
+        session = self.Session()
+        try:
+            state = BatchState()
+            if client.player_id is not None:
+                state.player = session.get(Player, client.player_id)
+            args = [str(arg) for arg in request.get("args", [])]
+            response = run_command(session, state, request.get("command"), args)
+            client.player_id = state.player.id if state.player else None
+            response["id"] = request.get("id")
+            return json.dumps(response, default=str)
+        finally:
+            session.close()
+
+    async def serve_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        client = ClientState()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(_error_line(None, f"request longer than {MAX_LINE_BYTES} bytes"))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict) or not isinstance(request.get("command"), str):
+                        raise ValueError("expected an object with a 'command' string")
+                except ValueError as e:
+                    writer.write(_error_line(None, f"bad request: {e}"))
+                    await writer.drain()
+                    continue
+
+                if request["command"] in ("exit", "quit"):
+                    break
+                response = await loop.run_in_executor(self.pool, self.handle_request, client, request)
+                writer.write(response.encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, refresh=DEFAULT_REFRESH_SECONDS):
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            server = await asyncio.start_unix_server(self.serve_client, unix_path, limit=MAX_LINE_BYTES)
+            where = unix_path
+        else:
+            server = await asyncio.start_server(self.serve_client, host, port, limit=MAX_LINE_BYTES)
+            where = f"{host}:{port}"
+        print(f"🎮 Monster server listening on {where}", file=sys.stderr)
+        refresher = asyncio.create_task(self.refresh_periodically(refresh)) if refresh > 0 else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if refresher:
+                refresher.cancel()
+            self.pool.shutdown(wait=True)
+            if unix_path and os.path.exists(unix_path):
+                os.remove(unix_path)
+
+
+def _error_line(request_id, message) -> bytes:
+    return json.dumps({"id": request_id, "ok": False, "result": None, "error": message}).encode() + b"\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the game over line-delimited JSON")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="DB worker threads")
+    parser.add_argument("--refresh", type=float, default=DEFAULT_REFRESH_SECONDS,
+                        help="seconds between checks for offers and friends written elsewhere (0 = never)")
+    parser.add_argument("--db-url", help="database URL (default: config file / environment)")
+    parser.add_argument("--profile", help="database profile")
+    args = parser.parse_args(argv)
+
+    engine = make_engine(args.db_url, args.profile)
+    server = GameServer(engine, args.workers)
+    try:
+        asyncio.run(server.run(args.host, args.port, args.unix, args.refresh))
+    except KeyboardInterrupt:
+        print("\nServer stopped.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# Monte Carlo balance simulator.
+#
+# Runs battle_vs_ai-style duels and resolve_battle_player-style level rolls as
+# batched NumPy operations. Damage, stat and catch numbers come from the live
+# formulas (calculate_damage, the stat table, calculate_catch_rate); only the
+# random turn loop is vectorized.
+#
+#   python -m game.simulator --min-level 1 --max-level 100 --trials 2000
+
+import argparse
+import time
+
+import numpy as np
+
+from game.game_logic.battle import (
+    BATTLE_MOVES, BATTLE_POWER_SPREAD, calculate_damage, create_ai_opponent,
+)
+from game.game_logic.catching import calculate_catch_rate
+from game.game_logic.stat_table import MAX_LEVEL, StatTable
+from game.models import STAT_NAMES
+from game.seed import PREDEFINED_MONSTERS, RARITIES
+
+
+def species_stat_table(species, levels) -> np.ndarray:
+    """
+    Stats for every species at every level, shape (species, levels, stat),
+    sliced out of a StatTable over the species list.
+    """
+    table = StatTable.from_base_stats(
+        {s: monster["base_stats"] for s, monster in enumerate(species)},
+        max(MAX_LEVEL, *levels),
+    )
+    cells = np.frombuffer(table.cells, dtype=np.int32).reshape(len(species), table.max_level + 1, len(STAT_NAMES))
+    return cells[:, list(levels)].astype(np.int64)
+
+
+def _stats_dict(row) -> dict:
+    return dict(zip(STAT_NAMES, (int(value) for value in row)))
+
+
+def _duel(hp_a, hp_b, pair, damage_ab, damage_ba, rng):
+    """
+    Vectorized run_duel: side A attacks first every turn, each side picks a
+    uniformly random move. `pair` maps each fight to a row of the damage tables.
+    Returns (a_won, turns) arrays.
+    """
+    n_moves = damage_ab.shape[1]
+    a_won = np.zeros(len(pair), dtype=bool)
+    turns = np.zeros(len(pair), dtype=np.int32)
+    active = np.arange(len(pair))
+    turn = 0
+
+    while active.size:
+        turn += 1
+        moves = rng.integers(0, n_moves, active.size)
+        hp_b[active] -= damage_ab[pair[active], moves]
+        fainted = hp_b[active] <= 0
+        a_won[active[fainted]] = True
+        turns[active[fainted]] = turn
+        active = active[~fainted]
+
+        moves = rng.integers(0, n_moves, active.size)
+        hp_a[active] -= damage_ba[pair[active], moves]
+        fainted = hp_a[active] <= 0
+        turns[active[fainted]] = turn
+        active = active[~fainted]
+
+    return a_won, turns
+
+
+def _turn_histogram(turns, max_turns) -> np.ndarray:
+    return np.bincount(np.minimum(turns, max_turns), minlength=max_turns + 1)
+
+
+def simulate_ai_duels(levels, trials, rng, species=PREDEFINED_MONSTERS, max_turns=50) -> dict:
+    """
+    Every species at every level against each battle_vs_ai bot.
+
+    win_rate has shape (species, levels, bots); turn_histogram[t] counts fights
+    that ended on turn t (the last bucket collects anything longer).
+    """
+    bots = create_ai_opponent(1)
+    powers = [move["power"] for move in BATTLE_MOVES]
+    stats = species_stat_table(species, levels)
+    n_species, n_levels, n_bots = len(species), len(levels), len(bots)
+
+    # One damage row per (species, level, bot) combination, one column per move
+    damage_out = np.zeros((n_species, n_levels, n_bots, len(powers)), dtype=np.int64)
+    damage_in = np.zeros_like(damage_out)
+    for s in range(n_species):
+        for l in range(n_levels):
+            player_stats = _stats_dict(stats[s, l])
+            for b, bot in enumerate(bots):
+                for m, power in enumerate(powers):
+                    damage_out[s, l, b, m] = calculate_damage(player_stats, bot["stats"], power, 1.0)
+                    damage_in[s, l, b, m] = calculate_damage(bot["stats"], player_stats, power, 1.0)
+
+    n_pairs = n_species * n_levels * n_bots
+    pair = np.repeat(np.arange(n_pairs), trials)
+    player_hp = np.repeat(np.broadcast_to(stats[:, :, None, 0], (n_species, n_levels, n_bots)).ravel(), trials)
+    bot_hp = np.repeat(np.tile([bot["hp"] for bot in bots], n_species * n_levels), trials)
+
+    won, turns = _duel(
+        player_hp, bot_hp, pair,
+        damage_out.reshape(n_pairs, -1), damage_in.reshape(n_pairs, -1), rng
+    )
+    return {
+        "win_rate": won.reshape(n_pairs, trials).mean(axis=1).reshape(n_species, n_levels, n_bots),
+        "mean_turns": turns.reshape(n_pairs, trials).mean(axis=1).reshape(n_species, n_levels, n_bots),
+        "turn_histogram": _turn_histogram(turns, max_turns),
+    }
+
+
+def simulate_species_duels(level, trials, rng, species=PREDEFINED_MONSTERS,
+                           type_multipliers=None, max_turns=50) -> dict:
+    """
+    Species vs species at one level using the battle_vs_ai turn rules.
+
+    type_multipliers maps (attacking type name, defending type name) to a
+    multiplier; missing pairs are neutral, as in get_type_multiplier.
+    win_rate[a, b] is the chance species a (attacking first) beats species b.
+    """
+    type_multipliers = type_multipliers or {}
+    powers = [move["power"] for move in BATTLE_MOVES]
+    stats = species_stat_table(species, [level])[:, 0]
+    n_species = len(species)
+
+    damage = np.zeros((n_species, n_species, len(powers)), dtype=np.int64)
+    for a in range(n_species):
+        for b in range(n_species):
+            multiplier = type_multipliers.get((species[a]["type"], species[b]["type"]), 1.0)
+            for m, power in enumerate(powers):
+                damage[a, b, m] = calculate_damage(_stats_dict(stats[a]), _stats_dict(stats[b]), power, multiplier)
+
+    n_pairs = n_species * n_species
+    pair = np.repeat(np.arange(n_pairs), trials)
+    attacker, defender = np.divmod(pair, n_species)
+    won, turns = _duel(
+        stats[attacker, 0].copy(), stats[defender, 0].copy(), pair,
+        damage.reshape(n_pairs, -1),
+        damage.transpose(1, 0, 2).reshape(n_pairs, -1),
+        rng
+    )
+    return {
+        "win_rate": won.reshape(n_pairs, trials).mean(axis=1).reshape(n_species, n_species),
+        "turn_histogram": _turn_histogram(turns, max_turns),
+    }
+
+
+def simulate_player_battles(levels, trials, rng) -> dict:
+    """
+    resolve_battle_player-style level rolls for every pair of levels.
+
+    win_rate[i, j] is the chance a level levels[i] monster beats a level
+    levels[j] one (ties go to the challenger, as in the live code).
+    """
+    levels = np.asarray(levels)
+    wins = np.zeros((len(levels), len(levels)), dtype=np.int64)
+    for i, level in enumerate(levels):
+        player = level + rng.integers(0, BATTLE_POWER_SPREAD + 1, (len(levels), trials))
+        opponent = levels[:, None] + rng.integers(0, BATTLE_POWER_SPREAD + 1, (len(levels), trials))
+        wins[i] = (player >= opponent).sum(axis=1)
+    return {"win_rate": wins / trials}
+
+
+def simulate_catches(levels, trials, rng) -> dict:
+    """
+    Catch attempts per rarity and player level using calculate_catch_rate.
+
+    success_rate has shape (rarities, levels).
+    """
+    rates = np.array([[calculate_catch_rate(rarity, level) for level in levels] for rarity in RARITIES])
+    caught = rng.random((len(RARITIES), len(levels), trials)) <= rates[:, :, None]
+    return {"catch_rate": rates, "success_rate": caught.mean(axis=2)}
+
+
+def run_balance_report(levels, trials, seed=None) -> dict:
+    """
+    Full species x level sweep of every simulation.
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        "species": [monster["name"] for monster in PREDEFINED_MONSTERS],
+        "levels": list(levels),
+        "ai_duels": simulate_ai_duels(levels, trials, rng),
+        "species_duels": simulate_species_duels(levels[len(levels) // 2], trials, rng),
+        "player_battles": simulate_player_battles(levels, trials, rng),
+        "catches": simulate_catches(levels, trials, rng),
+    }
+
+
+def print_report(report):
+    ai = report["ai_duels"]
+    levels = report["levels"]
+
+    print("\n⚔️  Win rate vs AI team (mean over bots)")
+    sample = sorted({0, len(levels) // 2, len(levels) - 1})
+    print(f"{'Species':<12}" + "".join(f"{'Lv ' + str(levels[i]):>9}" for i in sample))
+    for name, row in zip(report["species"], ai["win_rate"].mean(axis=2)):
+        print(f"{name:<12}" + "".join(f"{row[i]:>9.1%}" for i in sample))
+
+    histogram = ai["turn_histogram"]
+    total = histogram.sum()
+    print("\n⏱️  Turns per AI duel")
+    for turns in np.nonzero(histogram)[0]:
+        print(f"{turns:>3}: {histogram[turns] / total:.2%}")
+
+    duels = report["species_duels"]["win_rate"]
+    print("\n🐾 Species duel win rate (attacking first, row vs all)")
+    for name, rate in sorted(zip(report["species"], duels.mean(axis=1)), key=lambda item: -item[1]):
+        print(f"{name:<12}{rate:>8.1%}")
+
+    catches = report["catches"]["success_rate"]
+    print("\n🎯 Catch success rate")
+    for rarity, row in zip(RARITIES, catches):
+        print(f"{rarity:<12}" + "".join(f"{row[i]:>9.1%}" for i in sample))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo battle balance simulator")
+    parser.add_argument("--min-level", type=int, default=1)
+    parser.add_argument("--max-level", type=int, default=100)
+    parser.add_argument("--trials", type=int, default=1000, help="fights per matchup")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--save", help="write the raw arrays to this .npz file")
+    args = parser.parse_args(argv)
+
+    levels = list(range(args.min_level, args.max_level + 1))
+    started = time.perf_counter()
+    report = run_balance_report(levels, args.trials, args.seed)
+    elapsed = time.perf_counter() - started
+
+    print_report(report)
+    fights = len(report["species"]) * len(levels) * 3 * args.trials
+    print(f"\nSimulated {fights:,} AI duels in {elapsed:.2f}s")
+
+    if args.save:
+        np.savez(
+            args.save,
+            ai_win_rate=report["ai_duels"]["win_rate"],
+            ai_mean_turns=report["ai_duels"]["mean_turns"],
+            ai_turn_histogram=report["ai_duels"]["turn_histogram"],
+            species_win_rate=report["species_duels"]["win_rate"],
+            player_win_rate=report["player_battles"]["win_rate"],
+            catch_success_rate=report["catches"]["success_rate"],
+        )
+
+
+if __name__ == "__main__":
+    main()
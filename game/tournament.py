@@ -0,0 +1,302 @@
+# Round-robin tournament runner.
+#
+#   python -m game.tournament --all --workers 4 --seed 7
+#   python -m game.tournament --players 1-500,812,900
+#
+# Every pair of entrants meets once under the resolve_battle_player rules:
+# each side sends a random monster, rolls level + randint(0, spread), and
+# the challenger wins ties. Player battles never change monster levels, so
+# the fights only need a snapshot of each entrant's monster levels. Workers
+# play blocks of pairings from that snapshot, each block with its own seeded
+# RNG (results don't depend on --workers). The parent writes each block in
+# one transaction: its Battle rows, the wins counters, the closed-form XP
+# (applied to the players' current level and XP) and any newly reached
+# achievements, so a run that stops partway leaves no battle uncounted.
+
+import argparse
+import time
+from array import array
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from game.bulk_seed import chunk_rng, ordered_map
+from game.database import make_engine
+from game.models import Player, PlayerAchievement, PlayerMonster, PlayerStats
+from game.game_logic.achievements import AchievementIndex
+from game.game_logic.battle import PLAYER_BATTLE_XP, roll_battle_power
+from game.game_logic.leveling import PLAYER_XP
+
+IN_BATCH = 500
+
+# Battle rows go through the driver's executemany as plain tuples; building
+# a dict per row through Core costs more than the battles themselves.
+BATTLE_INSERT = "INSERT INTO battles (player1_id, player2_id, winner_id, created_at) VALUES (?, ?, ?, ?)"
+
+# (player ids, per-player tuples of monster levels), set once per worker process
+_snapshot = None
+
+
+def _init_worker(snapshot):
+    global _snapshot
+    _snapshot = snapshot
+
+
+def schedule_blocks(n_players, pairs_per_block):
+    """
+    Splits the pairings (i, j > i) into row ranges [start, end) of about
+    pairs_per_block pairings each.
+    """
+    start = 0
+    pairs = 0
+    for i in range(n_players):
+        pairs += n_players - 1 - i
+        if pairs >= pairs_per_block:
+            yield start, i + 1
+            start = i + 1
+            pairs = 0
+    if start < n_players:
+        yield start, n_players
+
+
+def play_block(job) -> tuple:
+    """
+    Plays every pairing whose first entrant is in [start, end). Entrants
+    alternate as challenger. Returns (player1 ids, player2 ids, challenger-won
+    flags, pairings skipped because a side has no monsters).
+    """
+    seed, index, start, end = job
+    ids, levels = _snapshot
+    rng = chunk_rng(seed, "tournament", index)
+    n = len(ids)
+
+    player1 = array('l')
+    player2 = array('l')
+    challenger_won = bytearray()
+    skipped = 0
+    for i in range(start, end):
+        for j in range(i + 1, n):
+            challenger, opponent = (i, j) if (i + j) % 2 else (j, i)
+            if not levels[challenger] or not levels[opponent]:
+                skipped += 1
+                continue
+            challenger_power = roll_battle_power(rng.choice(levels[challenger]), rng)
+            opponent_power = roll_battle_power(rng.choice(levels[opponent]), rng)
+            player1.append(ids[challenger])
+            player2.append(ids[opponent])
+            challenger_won.append(challenger_power >= opponent_power)
+    return player1, player2, bytes(challenger_won), skipped
+
+
+def _batches(values, size=IN_BATCH):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class Tournament:
+    def __init__(self, engine, player_ids, seed=0, workers=1, chunk_size=10000):
+        self.engine = engine
+        self.player_ids = sorted(set(player_ids))
+        self.seed = seed
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def load_snapshot(self) -> tuple:
+        """
+        (ids, monster levels per entrant) for the entrants that exist.
+        """
+        players = set()
+        levels = {}
+        with self.engine.connect() as conn:
+            for batch in _batches(self.player_ids):
+                players.update(conn.execute(select(Player.id).where(Player.id.in_(batch))).scalars())
+                for player_id, level in conn.execute(
+                    select(PlayerMonster.player_id, PlayerMonster.level)
+                    .where(PlayerMonster.player_id.in_(batch))
+                    .order_by(PlayerMonster.id)
+                ):
+                    levels.setdefault(player_id, []).append(level or 1)
+
+        ids = sorted(players)
+        return ids, [tuple(levels.get(player_id, ())) for player_id in ids]
+
+    def play(self, ids, levels, index) -> tuple:
+        """
+        Plays all pairings. Each block's Battle rows, wins, XP and
+        achievements are written together in one transaction.
+        Returns (wins, challenger wins) arrays indexed like ids, and counts.
+        """
+        slot = {player_id: i for i, player_id in enumerate(ids)}
+        wins = array('l', [0]) * len(ids)
+        challenger_wins = array('l', [0]) * len(ids)
+        battles = 0
+        skipped = 0
+        achievements = 0
+
+        jobs = (
+            (self.seed, block, start, end)
+            for block, (start, end) in enumerate(schedule_blocks(len(ids), self.chunk_size))
+        )
+        for player1, player2, challenger_won, block_skipped in ordered_map(
+            play_block, jobs, self.workers, _init_worker, ((ids, levels),)
+        ):
+            skipped += block_skipped
+            if not challenger_won:
+                continue
+            # Same text format SQLAlchemy stores SQLite DateTime values in
+            created_at = datetime.utcnow().isoformat(sep=" ", timespec="microseconds")
+            rows = []
+            block_wins = Counter()
+            block_challenger_wins = Counter()
+            for challenger_id, opponent_id, won in zip(player1, player2, challenger_won):
+                winner_id = challenger_id if won else opponent_id
+                block_wins[winner_id] += 1
+                if won:
+                    block_challenger_wins[challenger_id] += 1
+                rows.append((challenger_id, opponent_id, winner_id, created_at))
+
+            with self.engine.begin() as conn:
+                if conn.dialect.name == "sqlite":
+                    # Hold the write lock before reading the XP and win totals we update
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+                conn.exec_driver_sql(BATTLE_INSERT, rows)
+                self.apply_wins(conn, block_wins)
+                self.apply_xp(conn, block_challenger_wins)
+                achievements += self.unlock_achievements(conn, index, block_challenger_wins)
+
+            for player_id, won in block_wins.items():
+                wins[slot[player_id]] += won
+            for player_id, won in block_challenger_wins.items():
+                challenger_wins[slot[player_id]] += won
+            battles += len(rows)
+
+        return wins, challenger_wins, battles, skipped, achievements
+
+    def apply_xp(self, conn, challenger_wins):
+        """
+        Adds PLAYER_BATTLE_XP per challenger win in one closed-form step per
+        player, starting from the level and XP stored now (not the snapshot),
+        so XP earned elsewhere during the run is kept.
+        """
+        rows = []
+        for batch in _batches(list(challenger_wins)):
+            for player_id, level, xp in conn.execute(
+                select(Player.id, Player.level, Player.xp).where(Player.id.in_(batch))
+            ):
+                level, xp = PLAYER_XP.apply(level or 1, xp or 0, challenger_wins[player_id] * PLAYER_BATTLE_XP)
+                rows.append({"pid": player_id, "new_level": level, "new_xp": xp})
+        if rows:
+            conn.execute(
+                update(Player.__table__)
+                .where(Player.id == bindparam("pid"))
+                .values(level=bindparam("new_level"), xp=bindparam("new_xp")),
+                rows
+            )
+
+    def apply_wins(self, conn, wins):
+        """
+        Adds each winner's wins to player_stats, creating missing rows.
+        """
+        conn.execute(
+            sqlite_insert(PlayerStats.__table__).on_conflict_do_nothing(index_elements=["player_id"]),
+            [
+                {"player_id": player_id, "catches": 0, "legendary_catches": 0, "wins": 0, "collection_size": 0}
+                for player_id in wins
+            ]
+        )
+        conn.execute(
+            update(PlayerStats.__table__)
+            .where(PlayerStats.player_id == bindparam("pid"))
+            .values(wins=PlayerStats.wins + bindparam("won")),
+            [{"pid": player_id, "won": won} for player_id, won in wins.items()]
+        )
+
+    def unlock_achievements(self, conn, index, challenger_wins) -> int:
+        """
+        Unlocks win achievements for entrants who won as challenger (the
+        battle_player event), judged on their win count after this block.
+        """
+        rows = []
+        now = datetime.utcnow()
+        for batch in _batches(list(challenger_wins)):
+            totals = conn.execute(
+                select(PlayerStats.player_id, PlayerStats.wins).where(PlayerStats.player_id.in_(batch))
+            ).all()
+            have = set(conn.execute(
+                select(PlayerAchievement.player_id, PlayerAchievement.achievement_id)
+                .where(PlayerAchievement.player_id.in_(batch))
+            ).all())
+            for player_id, total in totals:
+                for achievement_id, _ in index.reached("wins", total):
+                    if (player_id, achievement_id) not in have:
+                        rows.append({"player_id": player_id, "achievement_id": achievement_id, "unlocked_at": now})
+        if rows:
+            conn.execute(insert(PlayerAchievement.__table__), rows)
+        return len(rows)
+
+    def run(self) -> dict:
+        ids, levels = self.load_snapshot()
+        with Session(self.engine) as session:
+            index = AchievementIndex.load(session)
+        wins, challenger_wins, battles, skipped, achievements = self.play(ids, levels, index)
+        return {
+            "players": len(ids),
+            "battles": battles,
+            "skipped": skipped,
+            "xp_awarded": sum(challenger_wins) * PLAYER_BATTLE_XP,
+            "achievements_unlocked": achievements,
+        }
+
+
+def run_tournament(engine, player_ids, seed=0, workers=1, chunk_size=10000) -> dict:
+    """
+    Runs a full round-robin between the given players and writes the results.
+    """
+    return Tournament(engine, player_ids, seed, workers, chunk_size).run()
+
+
+def parse_player_ids(spec: str) -> list:
+    """
+    "1-100,250,300-310" -> list of ids.
+    """
+    ids = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        ids.extend(range(int(low), int(high or low) + 1))
+    return ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a round-robin player tournament")
+    entrants = parser.add_mutually_exclusive_group(required=True)
+    entrants.add_argument("--players", help="comma-separated ids and ranges, e.g. 1-500,812")
+    entrants.add_argument("--all", action="store_true", help="every player in the database")
+    parser.add_argument("--db-url", help="database URL (defaults to the game database)")
+    parser.add_argument("--profile", help="database profile (see game.database.PROFILES)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="battle-simulating processes")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="pairings / rows per transaction")
+    args = parser.parse_args(argv)
+
+    engine = make_engine(args.db_url, args.profile)
+    if args.all:
+        with engine.connect() as conn:
+            player_ids = list(conn.execute(select(Player.id)).scalars())
+    else:
+        player_ids = parse_player_ids(args.players)
+
+    started = time.perf_counter()
+    summary = run_tournament(engine, player_ids, args.seed, args.workers, args.chunk_size)
+    print(f"🏟️ {summary['players']:,} players, {summary['battles']:,} battles "
+          f"({summary['skipped']:,} skipped: no monsters), {summary['xp_awarded']:,} XP, "
+          f"{summary['achievements_unlocked']:,} achievements in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
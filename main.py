@@ -1,7 +1,21 @@
+import argparse
+import sys
+
+from game.batch import run_scripts
 from game.cli import run_game_cli
 from game.database import Session
 
 # This is the entry point for the CLI
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monster Collector CLI")
+    parser.add_argument("--script", action="append",
+                        help="run commands from this file ('-' for stdin) instead of the menu; repeatable")
+    parser.add_argument("--out", help="write JSON results to this file (default stdout)")
+    parser.add_argument("--fail-fast", action="store_true", help="stop at the first failed command")
+    parser.add_argument("--seed", type=int, help="seed the RNG for reproducible runs")
+    args = parser.parse_args()
+
     session = Session()
+    if args.script:
+        sys.exit(run_scripts(session, args.script, args.out, args.fail_fast, args.seed))
     run_game_cli(session)
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import Achievement, MonsterSpecies, Player, PlayerAchievement
+from game.seed import ACHIEVEMENTS
+from game.game_logic.achievements import (
+    get_achievement_index, invalidate_achievement_index, parse_unlock_condition, unlock_achievements
+)
+from game.game_logic.player_stats import get_player_stats, record_catch, record_win
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'achievements.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all(Achievement(**achievement) for achievement in ACHIEVEMENTS)
+        session.add(MonsterSpecies(id=1, name="Emberling", rarity="Common"))
+        session.add(MonsterSpecies(id=2, name="Dracoflare", rarity="Legendary"))
+        session.add(Player(id=1, name="Ash"))
+        session.commit()
+    invalidate_achievement_index()
+    yield engine
+    invalidate_achievement_index()
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def unlocked(session) -> set:
+    return {pa.achievement.achievement_name for pa in session.query(PlayerAchievement).filter_by(player_id=1)}
+
+
+def test_unlock_conditions():
+    assert parse_unlock_condition("catch_10") == ("catches", 10)
+    assert parse_unlock_condition("win_50") == ("wins", 50)
+    assert parse_unlock_condition("catch_legendary") == ("legendary_catches", 1)
+    assert parse_unlock_condition("trade_3") is None
+    assert parse_unlock_condition("win_many") is None
+
+
+def test_counters_unlock_each_achievement_once(session):
+    player = session.get(Player, 1)
+    common, legendary = session.get(MonsterSpecies, 1), session.get(MonsterSpecies, 2)
+
+    names = []
+    for catch in range(1, 11):
+        record_catch(session, 1, legendary if catch == 4 else common)
+        names.extend(unlock_achievements(session, player, "catch").achievements)
+    record_win(session, 1)
+    names.extend(unlock_achievements(session, player, "battle_win").achievements)
+    names.extend(unlock_achievements(session, player, "battle_win").achievements)
+
+    assert names == ["First Catch", "Legendary Hunter", "Collector", "Battle Novice"]
+    assert unlocked(session) == set(names)
+    stats = get_player_stats(session, 1)
+    assert (stats.catches, stats.legendary_catches, stats.wins, stats.collection_size) == (10, 1, 1, 10)
+
+
+def test_increments_from_two_sessions_are_not_lost(engine):
+    first, second = sessionmaker(bind=engine)(), sessionmaker(bind=engine)()
+    try:
+        get_player_stats(first, 1)
+        first.commit()
+        # Both load the row before either writes
+        get_player_stats(first, 1)
+        get_player_stats(second, 1)
+        record_win(first, 1)
+        first.commit()
+        record_win(second, 1)
+        second.commit()
+        second.expire_all()
+        assert get_player_stats(second, 1).wins == 2
+    finally:
+        first.close()
+        second.close()
+
+
+def test_index_is_dropped_on_commit_not_on_flush(session):
+    assert get_achievement_index(session).reached("wins", 5) == [(2, "Battle Novice")]
+
+    session.add(Achievement(achievement_name="Brawler", unlock_condition="win_5"))
+    session.flush()
+    invalidated_early = len(get_achievement_index(session).reached("wins", 5)) != 1
+    session.rollback()
+    assert not invalidated_early
+
+    session.add(Achievement(achievement_name="Brawler", unlock_condition="win_5"))
+    session.commit()
+    assert [name for _, name in get_achievement_index(session).reached("wins", 5)] == ["Battle Novice", "Brawler"]
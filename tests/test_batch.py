@@ -0,0 +1,139 @@
+import io
+import json
+import threading
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.batch import capture_output, run_batch, run_scripts
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, Stats
+from game.game_logic.encounters import invalidate_encounter_tables
+from game.game_logic.social_graph import invalidate_social_graph
+
+SCRIPT = """\
+# comments and blank lines are skipped
+
+explore
+create_player Alice
+create_player Alice
+logout
+login Alice
+{"command": "explore", "args": ["catch"]}
+explore sideways
+battle_player Nobody
+teleport home
+login
+{"command": "explore",
+logout
+exit
+login Alice
+"""
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    engines = []
+
+    def make_session(name="batch.db"):
+        engine = make_engine(f"sqlite:///{tmp_path / name}", profile='benchmark')
+        engines.append(engine)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add_all(MonsterSpecies(id=species_id, name=name, rarity="Common", base_stats=Stats(40, 10, 10, 10))
+                        for species_id, name in ((1, "Emberling"), (2, "Tidepup")))
+        session.commit()
+        return session
+
+    invalidate_encounter_tables()
+    invalidate_social_graph()
+    yield make_session
+    invalidate_encounter_tables()
+    invalidate_social_graph()
+    for engine in engines:
+        engine.dispose()
+
+
+def run(session, script, fail_fast=False):
+    out = io.StringIO()
+    summary = run_batch(session, io.StringIO(script), out, fail_fast)
+    return summary, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_script_results(make_session):
+    session = make_session()
+    summary, results = run(session, SCRIPT)
+
+    assert [(result["line"], result["command"], result["ok"]) for result in results] == [
+        (3, "explore", False),
+        (4, "create_player", True),
+        (5, "create_player", False),
+        (6, "logout", True),
+        (7, "login", True),
+        (8, "explore", True),
+        (9, "explore", False),
+        (10, "battle_player", False),
+        (11, "teleport", False),
+        (12, "login", False),
+        (13, None, False),
+        (14, "logout", True),
+    ]
+    assert summary["commands"] == 12 and summary["failed"] == 7
+    errors = {result["line"]: result["error"] for result in results}
+    assert errors[3] == "not logged in"
+    assert errors[5] == "username 'Alice' already taken"
+    assert errors[9] == "usage: explore [catch|leave]"
+    assert errors[10] == "no player named 'Nobody'"
+    assert errors[11] == "unknown command 'teleport'"
+    assert errors[12] == "wrong number of arguments for 'login'"
+    assert errors[13].startswith("unparseable line")
+
+    explore = results[5]
+    assert explore["player"] == "Alice"
+    assert explore["output"][0].startswith("A wild ")
+    assert explore["result"]["species"] in ("Emberling", "Tidepup")
+    assert explore["queries"] > 0
+    assert results[-1]["player"] is None
+    assert session.query(Player).filter_by(name="Alice").count() == 1
+
+
+def test_fail_fast_stops_at_the_first_failure(make_session):
+    summary, results = run(make_session(), "create_player Bob\nbattle_player Nobody\nexplore\n", fail_fast=True)
+    assert [result["ok"] for result in results] == [True, False]
+    assert summary == {"commands": 2, "failed": 1, "wall_ms": summary["wall_ms"]}
+
+
+def test_seeded_scripts_repeat_exactly(make_session, tmp_path, capsys):
+    script = tmp_path / "script.txt"
+    script.write_text("create_player Carol\nlogin Carol\n" + "explore catch\nbattle_wild\n" * 5)
+
+    runs = []
+    for name in ("first.db", "second.db"):
+        out = tmp_path / f"{name}.jsonl"
+        assert run_scripts(make_session(name), [str(script)], str(out), seed=9) == 0
+        # Timings and query counts (warm caches on the second run) may differ
+        runs.append([
+            {key: value for key, value in json.loads(line).items() if key not in ("wall_ms", "queries")}
+            for line in out.read_text().splitlines()
+        ])
+    assert runs[0] == runs[1]
+    assert "0 failed" in capsys.readouterr().err
+
+
+def test_capture_output_is_per_thread():
+    captured = {}
+    ready = threading.Barrier(2)
+
+    def worker(name):
+        with capture_output() as output:
+            ready.wait()
+            for _ in range(50):
+                print(name)
+        captured[name] = output.getvalue().split()
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in ("ash", "misty")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert captured == {"ash": ["ash"] * 50, "misty": ["misty"] * 50}
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, PlayerMonster, Stats
+from game.game_logic.battle import (
+    BATTLE_MOVES, Combatant, ai_battle, create_ai_opponent, execute_turn, run_duel
+)
+
+
+def baseline_damage(attacker_stats, defender_stats, power):
+    attack = attacker_stats.get("attack", 10)
+    defense = defender_stats.get("defense", 5)
+    return max(1, int((attack / defense) * power))
+
+
+def baseline_duel(rng, name, hp, stats, ai_mon):
+    """
+    The turn loop of the original battle_vs_ai, minus its per-hit commits:
+    (attacker, move, damage) per hit and the winner ("player" / "ai").
+    """
+    hits = []
+    ai_hp = ai_mon["hp"]
+    while hp > 0 and ai_hp > 0:
+        move = rng.choice(BATTLE_MOVES)
+        damage = baseline_damage(stats, ai_mon["stats"], move["power"])
+        ai_hp = max(ai_hp - damage, 0)
+        hits.append((name, move["name"], damage))
+        if ai_hp <= 0:
+            return hits, "player"
+
+        counter_move = rng.choice(BATTLE_MOVES)
+        counter_damage = baseline_damage(ai_mon["stats"], stats, counter_move["power"])
+        hp = max(hp - counter_damage, 0)
+        hits.append((ai_mon["name"], counter_move["name"], counter_damage))
+        if hp <= 0:
+            return hits, "ai"
+    return hits, None
+
+
+TEAM = [
+    ("Emberling", {"hp": 45, "attack": 14, "defense": 7, "speed": 9}),
+    ("Tidepup", {"hp": 60, "attack": 9, "defense": 12, "speed": 5}),
+    ("Sproutle", {"hp": 30, "attack": 20, "defense": 4, "speed": 11}),
+]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_run_duel_matches_the_baseline_loop(seed):
+    for (name, stats), ai_mon in zip(TEAM, create_ai_opponent(1)):
+        expected_hits, expected_winner = baseline_duel(random.Random(seed), name, stats["hp"], stats, ai_mon)
+
+        player_side = Combatant(name, stats["hp"], Stats(**stats))
+        ai_side = Combatant.from_ai(ai_mon)
+        duel = run_duel(player_side, ai_side, BATTLE_MOVES, random.Random(seed))
+
+        assert [(entry["attacker"], entry["move"], entry["damage"]) for entry in duel["log"]] == expected_hits
+        assert duel["winner"] is (player_side if expected_winner == "player" else ai_side)
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'battle.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Player(id=1, name="Ash", level=1, xp=0, money=0))
+    for monster_id, (name, stats) in enumerate(TEAM, 1):
+        session.add(MonsterSpecies(id=monster_id, name=name, base_stats=Stats(**stats), rarity="Common"))
+        session.add(PlayerMonster(id=monster_id, player_id=1, species_id=monster_id, nickname=name, level=1,
+                                  xp=0, current_stats=Stats(**stats)))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ai_battle_matches_the_baseline_loop(session, seed):
+    rng = random.Random(seed)
+    expected_hits = []
+    expected_wins = 0
+    for (name, stats), ai_mon in zip(TEAM, create_ai_opponent(1)):
+        hits, winner = baseline_duel(rng, name, stats["hp"], stats, ai_mon)
+        expected_hits.extend(hits)
+        expected_wins += winner == "player"
+
+    player = session.get(Player, 1)
+    monsters = session.query(PlayerMonster).order_by(PlayerMonster.id).all()
+    outcome = ai_battle(session, player, monsters, random.Random(seed))
+
+    assert [(entry["attacker"], entry["move"], entry["damage"]) for entry in outcome.damage_log] == expected_hits
+    assert outcome.won == (expected_wins > len(TEAM) - expected_wins)
+
+
+def test_execute_turn_keeps_the_monster_call_shape(session):
+    attacker, defender = session.get(PlayerMonster, 1), session.get(PlayerMonster, 2)
+
+    entry = execute_turn(session, attacker, defender, BATTLE_MOVES[0])
+
+    assert entry["attacker"] == "Emberling" and entry["defender"] == "Tidepup"
+    assert entry["damage"] == baseline_damage(TEAM[0][1], TEAM[1][1], BATTLE_MOVES[0]["power"])
+    session.expire_all()
+    assert session.get(PlayerMonster, 2).current_hp == TEAM[1][1]["hp"] - entry["damage"]
@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+
+from game.benchmark import BENCHMARKS, compare, main, percentile
+
+RESULT_KEYS = {"iterations", "p50_ms", "p95_ms", "p99_ms", "mean_ms", "queries_per_call", "commits_per_call"}
+
+
+def test_every_benchmark_runs_and_reuses_the_template(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    argv = ["--sizes", "120", "--iterations", "3", "--workdir", str(tmp_path), "--out", str(out)]
+
+    main(argv)
+    results = json.loads(out.read_text())["results"]["120"]
+    assert set(results) == set(BENCHMARKS)
+    for name, result in results.items():
+        assert set(result) == RESULT_KEYS
+        assert result["iterations"] == 3
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["queries_per_call"] > 0, name
+
+    template = tmp_path / "bench_120.db"
+    seeded_at = os.path.getmtime(template)
+    main(argv + ["--baseline", str(out), "--tolerance", "1000"])
+    assert os.path.getmtime(template) == seeded_at
+    assert "No regressions" in capsys.readouterr().out
+
+
+def test_compare_flags_latency_and_query_regressions():
+    baseline = {"1000": {"catch_monster": {"p95_ms": 1.0, "queries_per_call": 4}}}
+    results = {"1000": {
+        "catch_monster": {"p95_ms": 1.2, "queries_per_call": 4},
+        "battle_vs_ai": {"p95_ms": 50.0, "queries_per_call": 40},
+    }}
+    assert compare(results, baseline, 0.25) == []
+
+    results["1000"]["catch_monster"] = {"p95_ms": 1.3, "queries_per_call": 6}
+    assert compare(results, baseline, 0.25) == [
+        "catch_monster @ 1000: p95 1.0 -> 1.3 ms",
+        "catch_monster @ 1000: queries/call 4 -> 6",
+    ]
+
+
+def test_baseline_regression_exits_nonzero(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": {"120": {"get_player_collection": {
+        "p95_ms": 0.0, "queries_per_call": 0.01}}}}))
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--sizes", "120", "--iterations", "2", "--workdir", str(tmp_path),
+              "--benchmarks", "get_player_collection", "--baseline", str(baseline)])
+    assert exit_info.value.code == 1
+    assert "get_player_collection @ 120" in capsys.readouterr().out
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 100)) == (51, 95, 100)
+    assert percentile([7], 99) == 7
@@ -0,0 +1,50 @@
+from sqlalchemy import func, select
+
+from game.bulk_seed import bulk_seed
+from game.database import Base, make_engine
+from game.models import Battle, PlayerMonster, PlayerStats
+
+SIZES = dict(players=60, min_monsters=1, max_monsters=4, battles=150, trades=40, friendships=200, rivals=50)
+
+
+def seeded(tmp_path, name, workers):
+    engine = make_engine(f"sqlite:///{tmp_path / name}", profile='benchmark')
+    # Small chunks so every table is written in several of them
+    bulk_seed(engine, seed=5, chunk_size=16, workers=workers, **SIZES)
+    return engine
+
+
+def dump(engine) -> dict:
+    with engine.connect() as conn:
+        return {
+            table.name: conn.execute(select(table).order_by(*table.columns)).all()
+            for table in Base.metadata.sorted_tables
+        }
+
+
+def test_same_database_whatever_the_worker_count(tmp_path, capsys):
+    single, pooled = seeded(tmp_path, "one.db", workers=1), seeded(tmp_path, "three.db", workers=3)
+    try:
+        expected = dump(single)
+        assert dump(pooled) == expected
+        assert len(expected["player_monsters"]) >= SIZES["players"]
+        assert len(expected["friend_association"]) == SIZES["friendships"]
+    finally:
+        single.dispose()
+        pooled.dispose()
+
+
+def test_player_stats_match_the_seeded_rows(tmp_path, capsys):
+    engine = seeded(tmp_path, "stats.db", workers=1)
+    try:
+        with engine.connect() as conn:
+            collection = dict(conn.execute(
+                select(PlayerMonster.player_id, func.count()).group_by(PlayerMonster.player_id)).all())
+            wins = dict(conn.execute(select(Battle.winner_id, func.count()).group_by(Battle.winner_id)).all())
+            stats = conn.execute(select(PlayerStats.player_id, PlayerStats.collection_size, PlayerStats.wins)).all()
+        assert len(stats) == SIZES["players"]
+        for player_id, collection_size, player_wins in stats:
+            assert collection_size == collection.get(player_id, 0)
+            assert player_wins == wins.get(player_id, 0)
+    finally:
+        engine.dispose()
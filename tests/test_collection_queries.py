@@ -0,0 +1,68 @@
+import builtins
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.instrumentation import instrument_engine, track_action
+from game.models import MonsterSpecies, Player, PlayerMonster
+from game.game_logic.collections import collection_rows, load_player_monsters
+from game.game_logic.trade_social import resolve_trade_monsters
+
+
+@pytest.fixture
+def session_with(tmp_path):
+    engines = []
+
+    def session_with(n_monsters):
+        engine = make_engine(f"sqlite:///{tmp_path / f'collection{n_monsters}.db'}", profile='benchmark')
+        engines.append(engine)
+        instrument_engine(engine)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add_all(Player(id=player_id, name=name) for player_id, name in ((1, "Ash"), (2, "Misty")))
+        session.add_all(MonsterSpecies(id=species_id, name=f"Species {species_id}", rarity="Common")
+                        for species_id in range(1, 6))
+        session.add_all(PlayerMonster(id=monster_id, player_id=1, species_id=monster_id % 5 + 1,
+                                      nickname=f"Mon {monster_id}", level=monster_id)
+                        for monster_id in range(1, n_monsters + 1))
+        session.commit()
+        # Start from an empty identity map, as a fresh CLI action does
+        session.close()
+        return session
+
+    yield session_with
+    for engine in engines:
+        engine.dispose()
+
+
+def queries(action, session) -> int:
+    with track_action("test", emit=False) as stats:
+        action(session)
+    assert not stats.n_plus_one()
+    return stats.queries
+
+
+def list_monsters(session):
+    for monster in load_player_monsters(session, 1):
+        assert monster.species.name.startswith("Species")
+
+
+def trade_first_monster(session, monkeypatch):
+    answers = iter(["Misty", "1"])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+    resolve_trade_monsters(session, session.get(Player, 1))
+
+
+@pytest.mark.parametrize("action", [list_monsters, lambda session: collection_rows(session, 1)])
+def test_collection_views_do_not_grow_with_the_collection(session_with, action):
+    assert queries(action, session_with(3)) == queries(action, session_with(40))
+
+
+def test_trade_menu_does_not_grow_with_the_collection(session_with, monkeypatch, capsys):
+    small, large = session_with(3), session_with(40)
+    action = lambda session: trade_first_monster(session, monkeypatch)
+
+    assert queries(action, small) == queries(action, large)
+    assert "Mon 40 (Species: Species 1, Level: 40)" in capsys.readouterr().out
+    assert large.get(PlayerMonster, 1).player_id == 2
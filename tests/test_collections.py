@@ -0,0 +1,109 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, PlayerMonster, Stats
+from game.game_logic.collections import RARITY_ORDER, SORT_KEYS, browse_collection, stream_player_collection
+
+RARITIES = ["Common", "Uncommon", "Rare", "Legendary"]
+N_MONSTERS = 40
+
+
+def build_monsters(seed=11) -> list:
+    """
+    Monsters with many tied sort keys, some never-recorded catch times and
+    some without a species, as the dicts the test orders by hand.
+    """
+    rng = random.Random(seed)
+    monsters = []
+    for monster_id in range(1, N_MONSTERS + 1):
+        species_id = rng.choice([None, 1, 2, 3, 4])
+        monsters.append({
+            "id": monster_id,
+            "level": rng.randint(1, 5),
+            "caught_at": None if rng.random() < 0.3 else datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 5)),
+            "species": species_id,
+            "rarity": RARITY_ORDER[RARITIES[species_id - 1]] if species_id else len(RARITY_ORDER),
+            "hp": rng.randint(10, 14),
+            "attack": rng.randint(10, 14),
+            "defense": rng.randint(10, 14),
+            "speed": rng.randint(10, 14),
+        })
+    return monsters
+
+
+MONSTERS = build_monsters()
+
+
+def expected_order(sort, descending, keep=lambda monster: True) -> list:
+    """
+    SQLite's order: NULL keys first ascending and last descending, ties by id.
+    """
+    monsters = [monster for monster in MONSTERS if keep(monster)]
+    ordered = sorted(monsters, key=lambda m: (m[sort] is not None, m[sort] or 0, m["id"]))
+    return [monster["id"] for monster in (reversed(ordered) if descending else ordered)]
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'collections.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(Player(id=player_id, name=name) for player_id, name in ((1, "Ash"), (2, "Misty")))
+    for species_id, rarity in enumerate(RARITIES, 1):
+        session.add(MonsterSpecies(id=species_id, name=f"Species {species_id}", rarity=rarity))
+    for monster in MONSTERS:
+        session.add(PlayerMonster(
+            id=monster["id"], player_id=1, species_id=monster["species"], nickname=f"Mon {monster['id']:02d}",
+            level=monster["level"], xp=0, caught_at=monster["caught_at"],
+            current_stats=Stats(monster["hp"], monster["attack"], monster["defense"], monster["speed"]),
+        ))
+    # Another player's monster must never show up
+    session.add(PlayerMonster(id=N_MONSTERS + 1, player_id=2, species_id=1, level=1, xp=0,
+                              current_stats=Stats(10, 10, 10, 10)))
+    session.commit()
+    # The column default replaces None on insert; rows older than caught_at have no catch time
+    session.execute(update(PlayerMonster).where(
+        PlayerMonster.id.in_([monster["id"] for monster in MONSTERS if monster["caught_at"] is None])
+    ).values(caught_at=None))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def walk(session, limit, **kwargs) -> list:
+    ids, after = [], None
+    while True:
+        page = browse_collection(session, 1, after=after, limit=limit, **kwargs)
+        assert len(page["monsters"]) <= limit
+        ids.extend(monster["id"] for monster in page["monsters"])
+        after = page["next"]
+        if after is None:
+            return ids
+
+
+def test_fixture_has_null_sort_keys(session):
+    assert any(monster["caught_at"] is None for monster in MONSTERS)
+    assert any(monster["species"] is None for monster in MONSTERS)
+    assert session.query(PlayerMonster).filter(PlayerMonster.caught_at.is_(None)).count() > 0
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("sort", list(SORT_KEYS))
+def test_keyset_pages_follow_the_full_order(session, sort, descending):
+    expected = expected_order(sort, descending)
+    for limit in (1, 3, 7, N_MONSTERS):
+        assert walk(session, limit, sort=sort, descending=descending) == expected
+    assert [monster["id"] for monster in stream_player_collection(
+        session, 1, sort=sort, descending=descending, batch_size=4)] == expected
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_with_filters(session, descending):
+    expected = expected_order("caught_at", descending, keep=lambda monster: 2 <= monster["level"] <= 4)
+    assert walk(session, 4, sort="caught_at", descending=descending, min_level=2, max_level=4) == expected
@@ -0,0 +1,69 @@
+import pytest
+
+from game.database import PROFILES, make_engine, sqlite_pragmas
+
+# What PRAGMA reads back for the names the profiles use
+SYNCHRONOUS = {"OFF": 0, "NORMAL": 1, "FULL": 2}
+TEMP_STORE = {"DEFAULT": 0, "MEMORY": 2}
+
+
+@pytest.fixture(autouse=True)
+def config_dir(tmp_path, monkeypatch):
+    # make_engine reads monsters.ini from the working directory and MONSTERS_DB_* from the environment
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("MONSTERS_DB_URL", raising=False)
+    monkeypatch.delenv("MONSTERS_DB_PROFILE", raising=False)
+    return tmp_path
+
+
+def applied(engine) -> dict:
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
+        }
+
+
+@pytest.mark.parametrize("profile", list(PROFILES))
+def test_profiles_are_applied_on_connect(tmp_path, profile):
+    engine = make_engine(f"sqlite:///{tmp_path / 'game.db'}", profile)
+    try:
+        pragmas = PROFILES[profile]
+        assert applied(engine) == {
+            "journal_mode": pragmas["journal_mode"].lower(),
+            "synchronous": SYNCHRONOUS[pragmas["synchronous"]],
+            "cache_size": pragmas["cache_size"],
+            "mmap_size": pragmas["mmap_size"],
+            "temp_store": TEMP_STORE[pragmas["temp_store"]],
+            "busy_timeout": pragmas["busy_timeout"],
+        }
+    finally:
+        engine.dispose()
+
+
+def test_config_file_environment_and_overrides(config_dir, monkeypatch):
+    (config_dir / "monsters.ini").write_text(
+        f"[database]\nurl = sqlite:///{config_dir / 'from_file.db'}\nprofile = durable\ncache_size = -2000\n"
+    )
+    engine = make_engine()
+    try:
+        assert engine.url.database == str(config_dir / "from_file.db")
+        assert applied(engine)["synchronous"] == SYNCHRONOUS["FULL"]
+        assert applied(engine)["cache_size"] == -2000
+    finally:
+        engine.dispose()
+
+    monkeypatch.setenv("MONSTERS_DB_PROFILE", "fast")
+    engine = make_engine(busy_timeout=1234)
+    try:
+        assert applied(engine)["synchronous"] == SYNCHRONOUS["NORMAL"]
+        assert applied(engine)["busy_timeout"] == 1234
+    finally:
+        engine.dispose()
+
+
+def test_unknown_profile_and_pragma():
+    with pytest.raises(ValueError, match="Unknown database profile"):
+        sqlite_pragmas("turbo")
+    # Only PRAGMAs the profile sets can be overridden
+    assert "foreign_keys" not in sqlite_pragmas("fast", foreign_keys="ON")
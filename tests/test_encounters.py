@@ -0,0 +1,87 @@
+import random
+from collections import Counter
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import MonsterSpecies
+from game.game_logic.encounters import (
+    RARITY_WEIGHTS, EncounterTable, get_encounter_table, invalidate_encounter_tables
+)
+
+RARITIES = ["Common", "Uncommon", "Rare", "Legendary", "Common", "Rare"]
+
+
+class CountingRandom(random.Random):
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.calls = 0
+
+    def random(self):
+        self.calls += 1
+        return super().random()
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'encounters.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    # Inserted out of id order; the old query returned them by id
+    for species_id in (4, 1, 6, 2, 5, 3):
+        session.add(MonsterSpecies(id=species_id, name=f"Species {species_id}", rarity=RARITIES[species_id - 1]))
+    session.commit()
+    invalidate_encounter_tables()
+    yield session
+    session.close()
+    invalidate_encounter_tables()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_uniform_draws_match_the_old_random_choice(session, seed):
+    # The old get_random_species: random.choice over every species row
+    species_list = session.query(MonsterSpecies).all()
+    old_rng = random.Random(seed)
+    expected = [old_rng.choice(species_list).id for _ in range(200)]
+
+    table = get_encounter_table(session)
+    assert table.sample(200, random.Random(seed)) == expected
+
+
+def test_weighted_draws_use_one_random_call_and_follow_the_weights(session):
+    table = get_encounter_table(session, weighted=True)
+    rng = CountingRandom(3)
+    counts = Counter(table.sample(60000, rng))
+
+    assert rng.calls == 60000
+    weights = {i + 1: RARITY_WEIGHTS[rarity] for i, rarity in enumerate(RARITIES)}
+    total = sum(weights.values())
+    for species_id, weight in weights.items():
+        assert counts[species_id] / 60000 == pytest.approx(weight / total, abs=0.01)
+
+
+def test_alias_table_is_exact():
+    table = EncounterTable([10, 20, 30], [1, 2, 5])
+    # Probability mass per id summed over the alias columns
+    mass = Counter()
+    for i, species_id in enumerate(table.species_ids):
+        mass[species_id] += table.prob[i] / 3
+        mass[table.species_ids[table.alias[i]]] += (1 - table.prob[i]) / 3
+    assert [mass[species_id] for species_id in (10, 20, 30)] == pytest.approx([1 / 8, 2 / 8, 5 / 8])
+
+
+def test_cache_is_dropped_on_commit_not_on_flush(session):
+    assert len(get_encounter_table(session)) == 6
+
+    session.add(MonsterSpecies(id=7, name="Species 7", rarity="Common"))
+    session.flush()
+    invalidated_early = len(get_encounter_table(session)) != 6
+    session.rollback()
+    assert not invalidated_early
+    assert len(get_encounter_table(session)) == 6
+
+    session.add(MonsterSpecies(id=7, name="Species 7", rarity="Common"))
+    session.commit()
+    assert len(get_encounter_table(session)) == 7
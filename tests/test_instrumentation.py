@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.instrumentation import current_action, instrument_engine, statement_shape, track_action
+from game.models import Player
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'instrumented.db'}", profile='benchmark')
+    instrument_engine(engine)
+    instrument_engine(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_statement_shape_collapses_in_lists():
+    assert statement_shape("SELECT *\n  FROM players WHERE id IN (?, ?, ?)") == \
+        statement_shape("SELECT * FROM players WHERE id IN (?)") == "SELECT * FROM players WHERE id IN (?...)"
+
+
+def test_action_counts_queries_commits_and_rows(session):
+    with track_action("seed", emit=False) as stats:
+        session.execute(insert(Player), [{"name": f"Player {i}"} for i in range(3)])
+        session.execute(update(Player).where(Player.id > 1).values(level=2))
+        session.commit()
+    # Hooked twice, counted once
+    assert (stats.queries, stats.commits) == (2, 1)
+    assert stats.rows == 5
+
+    with track_action("lookup", emit=False) as stats:
+        for player_id in range(1, 13):
+            session.execute(select(Player.name).where(Player.id == player_id)).scalar()
+        session.query(Player).all()
+    assert stats.queries == 13
+    assert stats.rows == 3
+    assert stats.n_plus_one() == [(statement_shape(
+        "SELECT players.name FROM players WHERE players.id = ?"), 12)]
+    assert stats.to_dict()["n_plus_one"] == [{"statement": stats.n_plus_one()[0][0], "count": 12}]
+
+    # Outside an action nothing is charged
+    session.query(Player).all()
+    assert stats.queries == 13
+
+
+def test_nested_and_per_thread_actions(session):
+    seen = {}
+
+    def other_thread():
+        seen["action"] = current_action()
+
+    with track_action("outer", emit=False) as outer:
+        session.query(Player).all()
+        with track_action("inner", emit=False) as inner:
+            session.query(Player).all()
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+        assert current_action() is outer
+        session.query(Player).all()
+
+    assert current_action() is None
+    assert seen["action"] is None
+    assert (outer.queries, inner.queries) == (2, 1)
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import Player, PlayerStats, friend_association, rival_association
+from game.game_logic.leaderboards import get_rank, leaderboard_page, scope_members, scoped_leaderboard
+from game.game_logic.social_graph import invalidate_social_graph
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'boards.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for player_id, name, wins in ((1, "Ash", 3), (2, "Misty", 5), (3, "Brock", 3), (4, "Gary", 0)):
+        session.add(Player(id=player_id, name=name))
+        session.add(PlayerStats(player_id=player_id, catches=0, legendary_catches=0, wins=wins,
+                                collection_size=player_id))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_page_orders_by_score_then_player_and_skips_zero(session):
+    assert leaderboard_page(session, "wins") == [("Misty", 5), ("Ash", 3), ("Brock", 3)]
+    assert leaderboard_page(session, "wins", limit=1, offset=1) == [("Ash", 3)]
+    assert leaderboard_page(session, "collection", limit=2) == [("Gary", 4), ("Brock", 3)]
+
+
+def test_ties_share_the_better_rank(session):
+    assert [get_rank(session, player_id) for player_id in (1, 2, 3, 4)] == [2, 1, 2, None]
+    assert get_rank(session, 99) is None
+
+
+def test_core_writes_show_up_without_invalidation(session):
+    assert get_rank(session, 1) == 2
+    # The tournament and bulk seeder bump counters through Core, not the ORM
+    with session.bind.begin() as connection:
+        connection.execute(update(PlayerStats.__table__).where(PlayerStats.player_id == 1).values(wins=9))
+
+    assert get_rank(session, 1) == 1
+    assert leaderboard_page(session, "wins", limit=1) == [("Ash", 9)]
+
+
+@pytest.fixture
+def social(session):
+    # Tracy has no player_stats row yet; a self-edge must not put Ash on the board twice
+    session.add(Player(id=5, name="Tracy"))
+    for player_id, level in ((1, 10), (2, 7), (3, 4), (4, 12), (5, 1)):
+        session.get(Player, player_id).level = level
+    session.commit()
+    with session.bind.begin() as connection:
+        connection.execute(insert(friend_association), [
+            {"player_id": 1, "friend_id": friend_id} for friend_id in (1, 2, 4, 5)
+        ])
+        connection.execute(insert(rival_association), [{"player_id": 1, "rival_id": 3}])
+    invalidate_social_graph()
+    yield session
+    invalidate_social_graph()
+
+
+def test_scope_members(social):
+    assert scope_members(social, 1) == {2, 4, 5}
+    assert scope_members(social, 1, "rivals") == {3}
+    assert scope_members(social, 2) == set()
+
+
+def test_scoped_boards_rank_the_player_among_their_group(social):
+    assert scoped_leaderboard(social, 1) == (
+        [("Misty", 5), ("Ash", 3), ("Gary", 0), ("Tracy", 0)], 2)
+    assert scoped_leaderboard(social, 1, limit=1) == ([("Misty", 5)], 2)
+    assert scoped_leaderboard(social, 1, board="collection") == (
+        [("Gary", 4), ("Misty", 2), ("Ash", 1), ("Tracy", 0)], 3)
+    assert scoped_leaderboard(social, 1, board="level", limit=2) == ([("Gary", 12), ("Ash", 10)], 2)
+    assert scoped_leaderboard(social, 1, scope="rivals") == ([("Ash", 3), ("Brock", 3)], 1)
+    assert scoped_leaderboard(social, 2) == ([("Misty", 5)], 1)
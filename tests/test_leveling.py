@@ -0,0 +1,83 @@
+import random
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, PlayerMonster, Stats
+from game.game_logic.leveling import MONSTER_XP, PLAYER_XP, add_xp_to_monster, award_xp_many
+from game.game_logic.stat_table import invalidate_stat_table
+
+
+def baseline_apply(base, growth, level, xp, xp_amount) -> tuple:
+    """
+    The original one-level-per-iteration loop of add_xp_to_monster / add_xp_to_player.
+    """
+    xp += xp_amount
+    while xp >= int(base * (growth ** (level - 1))):
+        xp -= int(base * (growth ** (level - 1)))
+        level += 1
+    return level, xp
+
+
+@pytest.mark.parametrize("table, base, growth", [(MONSTER_XP, 50, 1.2), (PLAYER_XP, 100, 1.3)])
+def test_closed_form_matches_the_level_loop(table, base, growth):
+    rng = random.Random(7)
+    for _ in range(2000):
+        level = rng.randint(1, 120)
+        xp = rng.randrange(table.xp_to_next(level))
+        xp_amount = rng.choice([0, rng.randint(1, 500), rng.randint(1, 10 ** 6), rng.randint(1, 10 ** 9)])
+        assert table.apply(level, xp, xp_amount) == baseline_apply(base, growth, level, xp, xp_amount)
+
+
+# (level, xp) of each monster and the XP it is awarded
+MONSTERS = [(1, 0, 10), (1, 49, 1), (3, 20, 5000), (40, 0, 10 ** 7), (99, 5, 250), (12, 100, 0)]
+MISSING_ID = 99
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    engines = []
+
+    def make_session(name):
+        engine = make_engine(f"sqlite:///{tmp_path / name}", profile='benchmark')
+        engines.append(engine)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add(Player(id=1, name="Ash", level=1, xp=0, money=0))
+        session.add(MonsterSpecies(id=1, name="Emberling", rarity="Common",
+                                   base_stats=Stats(hp=45, attack=14, defense=7, speed=9)))
+        for monster_id, (level, xp, _) in enumerate(MONSTERS, 1):
+            session.add(PlayerMonster(id=monster_id, player_id=1, species_id=1, nickname=f"Mon {monster_id}",
+                                      level=level, xp=xp, current_stats=Stats(hp=45, attack=14, defense=7, speed=9)))
+        session.commit()
+        return session
+
+    invalidate_stat_table()
+    yield make_session
+    invalidate_stat_table()
+    for engine in engines:
+        engine.dispose()
+
+
+def rows(session):
+    return [(m.id, m.level, m.xp, m.current_stats.to_dict())
+            for m in session.query(PlayerMonster).order_by(PlayerMonster.id)]
+
+
+def test_award_xp_many_matches_the_per_call_loop(make_session):
+    awards = {monster_id: amount for monster_id, (_, _, amount) in enumerate(MONSTERS, 1)}
+    awards[MISSING_ID] = 10
+
+    looped = make_session("loop.db")
+    expected = {monster_id: add_xp_to_monster(looped, monster_id, amount) for monster_id, amount in awards.items()}
+
+    batched = make_session("many.db")
+    assert award_xp_many(batched, awards) == expected
+
+    batched.expire_all()
+    looped.expire_all()
+    assert rows(batched) == rows(looped)
+    assert expected[MISSING_ID] == {"error": "Monster not found."}
+    assert [expected[monster_id]["leveled_up"] for monster_id in range(1, len(MONSTERS) + 1)] == \
+        [False, True, True, True, False, False]
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, PlayerMonster, TradeOffer
+from game.game_logic.collections import release_monster
+from game.game_logic.marketplace import (
+    SETTLED, STALE, cancel_offer, get_order_book, invalidate_order_book, match_open_offers, post_offer,
+    settle_matches
+)
+from game.game_logic.trade_social import trade_monster
+
+CAUGHT = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'market.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(
+        MonsterSpecies(id=species_id, name=name, base_stats=None, rarity="Common")
+        for species_id, name in ((1, "Emberling"), (2, "Tidepup"), (3, "Sproutle"))
+    )
+    session.add_all(Player(id=player_id, name=name) for player_id, name in ((1, "Ash"), (2, "Misty"), (3, "Brock")))
+    session.commit()
+    invalidate_order_book()
+    yield session
+    session.close()
+    invalidate_order_book()
+    engine.dispose()
+
+
+def add_monster(session, monster_id, player_id, species_id, level=5, caught_at=CAUGHT):
+    session.add(PlayerMonster(id=monster_id, player_id=player_id, species_id=species_id, level=level,
+                              caught_at=caught_at))
+    session.commit()
+
+
+def owner(session, monster_id):
+    session.expire_all()
+    return session.get(PlayerMonster, monster_id).player_id
+
+
+def open_offer_ids(session):
+    return sorted(session.scalars(TradeOffer.__table__.select().with_only_columns(TradeOffer.id)))
+
+
+def test_pair_match_swaps_monsters(session):
+    add_monster(session, 1, 1, 1)
+    add_monster(session, 2, 2, 2)
+    ash, misty = session.get(Player, 1), session.get(Player, 2)
+
+    assert post_offer(session, ash, 1, wanted_species_id=2).data["match"] is None
+    outcome = post_offer(session, misty, 2, wanted_species_id=1)
+
+    assert outcome.data["match"]["status"] == SETTLED
+    assert (owner(session, 1), owner(session, 2)) == (2, 1)
+    assert open_offer_ids(session) == []
+    assert len(get_order_book(session)) == 0
+
+
+def test_three_way_cycle(session):
+    add_monster(session, 1, 1, 1)
+    add_monster(session, 2, 2, 2)
+    add_monster(session, 3, 3, 3)
+    ash, misty, brock = (session.get(Player, player_id) for player_id in (1, 2, 3))
+
+    post_offer(session, ash, 1, wanted_species_id=2)
+    post_offer(session, misty, 2, wanted_species_id=3)
+    outcome = post_offer(session, brock, 3, wanted_species_id=1)
+
+    assert outcome.data["match"]["status"] == SETTLED
+    assert len(outcome.data["match"]["offer_ids"]) == 3
+    assert (owner(session, 1), owner(session, 2), owner(session, 3)) == (3, 1, 2)
+    assert open_offer_ids(session) == []
+
+
+def test_level_range_is_respected(session):
+    add_monster(session, 1, 1, 1, level=5)
+    add_monster(session, 2, 2, 2, level=5)
+    post_offer(session, session.get(Player, 1), 1, wanted_species_id=2, min_level=10)
+    outcome = post_offer(session, session.get(Player, 2), 2, wanted_species_id=1)
+
+    assert outcome.data["match"] is None
+    assert len(open_offer_ids(session)) == 2
+
+
+def test_changed_monster_makes_the_match_stale(session):
+    add_monster(session, 1, 1, 1)
+    add_monster(session, 2, 2, 2)
+    first = post_offer(session, session.get(Player, 1), 1, wanted_species_id=2, settle=False).data["offer_id"]
+    second = post_offer(session, session.get(Player, 2), 2, wanted_species_id=1, settle=False).data["offer_id"]
+    session.execute(update(PlayerMonster).where(PlayerMonster.id == 1).values(level=6))
+    session.commit()
+
+    assert match_open_offers(session) == {STALE: 1}
+    assert (owner(session, 1), owner(session, 2)) == (1, 2)
+    # The changed monster's offer is dropped, the other one stays open
+    assert open_offer_ids(session) == [second]
+    assert first not in get_order_book(session) and second in get_order_book(session)
+
+
+def test_reused_monster_id_makes_the_match_stale(session):
+    add_monster(session, 1, 1, 1)
+    add_monster(session, 2, 2, 2)
+    book = get_order_book(session)
+    post_offer(session, session.get(Player, 1), 1, wanted_species_id=2, settle=False)
+    cycle = book.match(book.get(post_offer(session, session.get(Player, 2), 2, wanted_species_id=1,
+                                           settle=False).data["offer_id"]))
+    # Same id, owner, species and level, but a different monster
+    session.execute(delete(PlayerMonster).where(PlayerMonster.id == 1))
+    session.commit()
+    add_monster(session, 1, 1, 1, caught_at=CAUGHT + timedelta(days=1))
+
+    assert settle_matches(session, [cycle])[0]["status"] == STALE
+    assert (owner(session, 1), owner(session, 2)) == (1, 2)
+
+
+def test_offer_cancelled_after_matching_makes_the_match_stale(session):
+    add_monster(session, 1, 1, 1)
+    add_monster(session, 2, 2, 2)
+    book = get_order_book(session)
+    first = post_offer(session, session.get(Player, 1), 1, wanted_species_id=2, settle=False).data["offer_id"]
+    second = post_offer(session, session.get(Player, 2), 2, wanted_species_id=1, settle=False).data["offer_id"]
+    cycle = book.match(book.get(second))
+    # The cancel commits while the matched cycle waits for settlement
+    assert cancel_offer(session, session.get(Player, 1), first).ok
+
+    assert settle_matches(session, [cycle])[0]["status"] == STALE
+    assert (owner(session, 1), owner(session, 2)) == (1, 2)
+    assert open_offer_ids(session) == [second]
+    assert second in book and first not in book
+
+
+def test_cancel_offer(session):
+    add_monster(session, 1, 1, 1)
+    offer_id = post_offer(session, session.get(Player, 1), 1, settle=False).data["offer_id"]
+
+    assert not cancel_offer(session, session.get(Player, 2), offer_id).ok
+    assert cancel_offer(session, session.get(Player, 1), offer_id).ok
+    assert open_offer_ids(session) == []
+    assert offer_id not in get_order_book(session)
+    assert not cancel_offer(session, session.get(Player, 1), offer_id).ok
+
+
+def test_release_withdraws_the_offer(session):
+    add_monster(session, 1, 1, 1)
+    offer_id = post_offer(session, session.get(Player, 1), 1, settle=False).data["offer_id"]
+
+    assert release_monster(session, 1)["success"]
+    assert open_offer_ids(session) == []
+    assert offer_id not in get_order_book(session)
+    assert 1 not in get_order_book(session).by_monster
+
+
+def test_direct_trade_withdraws_the_offer(session):
+    add_monster(session, 1, 1, 1)
+    add_monster(session, 2, 2, 2)
+    ash, misty = session.get(Player, 1), session.get(Player, 2)
+    post_offer(session, ash, 1, wanted_species_id=2, settle=False)
+
+    assert trade_monster(session, ash, misty, session.get(PlayerMonster, 1)).ok
+    assert open_offer_ids(session) == []
+    # Misty's own offer would have matched the withdrawn one
+    assert post_offer(session, misty, 2, wanted_species_id=1).data["match"] is None
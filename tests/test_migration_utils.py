@@ -0,0 +1,98 @@
+import os
+import sys
+
+import pytest
+import sqlalchemy as sa
+from alembic.config import Config
+from alembic.runtime.environment import EnvironmentContext
+from alembic.operations import Operations
+from alembic.script import ScriptDirectory
+
+# env.py puts the alembic directory on sys.path the same way
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "alembic"))
+import migration_utils
+from migration_utils import PROGRESS_TABLE, backfill
+
+N_ROWS = 100
+CHUNK_SIZE = 7
+KEY = "items: doubled"
+
+
+class Interrupt(Exception):
+    pass
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    fail_at = {}
+
+    @sa.event.listens_for(engine, "connect")
+    def add_checkpoint(dbapi_connection, connection_record):
+        # checkpoint(id) raises for the row the test wants the run to die on
+        def checkpoint(row_id):
+            if row_id == fail_at.get("id"):
+                raise Interrupt(row_id)
+            return 1
+        dbapi_connection.create_function("checkpoint", 1, checkpoint)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE items (id INTEGER PRIMARY KEY, value INTEGER, doubled INTEGER)")
+        conn.execute(sa.text("INSERT INTO items (id, value) VALUES (:id, :value)"),
+                     [{"id": row_id, "value": row_id * 3} for row_id in range(1, N_ROWS + 1)])
+    engine.fail_at = fail_at
+    migration_utils._backfilled.clear()
+    yield engine
+    migration_utils._backfilled.clear()
+    engine.dispose()
+
+
+def run_backfill(engine):
+    """
+    Runs backfill the way a revision does: inside env.py's migration context.
+    """
+    config = Config()
+    config.set_main_option("script_location", os.path.join(os.path.dirname(__file__), os.pardir, "alembic"))
+    with engine.connect() as connection, EnvironmentContext(config, ScriptDirectory.from_config(config)) as env:
+        env.configure(connection=connection)
+        with env.begin_transaction(), Operations.context(env.get_context()):
+            return backfill("items", "doubled = value * 2 * checkpoint(id)", key=KEY,
+                            chunk_size=CHUNK_SIZE, pause=0)
+
+
+def doubled(engine) -> dict:
+    with engine.connect() as conn:
+        return dict(conn.execute(sa.text("SELECT id, doubled FROM items")).all())
+
+
+def saved_progress(engine):
+    with engine.connect() as conn:
+        if not sa.inspect(conn).has_table(PROGRESS_TABLE):
+            return None
+        return conn.execute(sa.text(f"SELECT last_id FROM {PROGRESS_TABLE} WHERE key = :key"),
+                            {"key": KEY}).scalar()
+
+
+def test_backfill_commits_every_chunk_and_cleans_up(engine):
+    assert run_backfill(engine) == N_ROWS
+    assert doubled(engine) == {row_id: row_id * 6 for row_id in range(1, N_ROWS + 1)}
+    assert saved_progress(engine) is None
+
+
+def test_interrupted_backfill_resumes_after_the_last_committed_chunk(engine):
+    engine.fail_at["id"] = 31
+    with pytest.raises(sa.exc.OperationalError):
+        run_backfill(engine)
+
+    # Chunks (0, 7] .. (21, 28] committed; the one holding id 31 rolled back
+    done = 28
+    assert saved_progress(engine) == done
+    assert doubled(engine) == {row_id: row_id * 6 if row_id <= done else None for row_id in range(1, N_ROWS + 1)}
+
+    # Rows already done are not touched again
+    with engine.begin() as conn:
+        conn.execute(sa.text("UPDATE items SET doubled = -1 WHERE id <= :done"), {"done": done})
+    engine.fail_at.clear()
+    assert run_backfill(engine) == N_ROWS - done
+    assert doubled(engine) == {row_id: -1 if row_id <= done else row_id * 6 for row_id in range(1, N_ROWS + 1)}
+    assert saved_progress(engine) is None
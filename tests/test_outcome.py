@@ -0,0 +1,85 @@
+import random
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, PlayerMonster, Stats
+from game.game_logic.achievements import invalidate_achievement_index
+from game.game_logic.battle import gym_battle, player_battle, wild_battle
+from game.game_logic.catching import attempt_catch
+from game.game_logic.outcome import Outcome, render
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    engines = []
+
+    def make_session(name="outcome.db"):
+        engine = make_engine(f"sqlite:///{tmp_path / name}", profile='benchmark')
+        engines.append(engine)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add_all(Player(id=player_id, name=name) for player_id, name in ((1, "Ash"), (2, "Misty"), (3, "Brock")))
+        session.add(MonsterSpecies(id=1, name="Emberling", rarity="Common", base_level=3,
+                                   base_stats=Stats(40, 10, 10, 10)))
+        session.add_all(PlayerMonster(id=monster_id, player_id=player_id, species_id=1,
+                                      nickname=f"Mon {monster_id}", level=level)
+                        for monster_id, player_id, level in ((1, 1, 5), (2, 1, 8), (3, 2, 6)))
+        session.commit()
+        return session
+
+    invalidate_achievement_index()
+    yield make_session
+    invalidate_achievement_index()
+    for engine in engines:
+        engine.dispose()
+
+
+def play(session, seed):
+    rng = random.Random(seed)
+    ash, misty, brock = (session.get(Player, player_id) for player_id in (1, 2, 3))
+    species = session.get(MonsterSpecies, 1)
+    return [
+        attempt_catch(session, ash, species, rng),
+        wild_battle(session, ash, species, rng),
+        player_battle(session, ash, misty, rng),
+        gym_battle(session, ash, rng),
+        player_battle(session, ash, brock, rng),
+        wild_battle(session, brock, species, rng),
+    ]
+
+
+def test_game_functions_return_outcomes_without_printing(make_session, capsys):
+    catch, wild, duel, gym, no_opponent, no_monsters = play(make_session(), seed=4)
+    assert capsys.readouterr().out == ""
+
+    assert [outcome.action for outcome in (catch, wild, duel, gym)] == ["catch", "battle_wild", "battle_player", "gym"]
+    for outcome in (catch, wild, duel, gym):
+        assert outcome.ok and outcome.won in (True, False) and outcome.events
+    assert duel.to_dict()["opponent"] == "Misty"
+    assert gym.to_dict()["gym_level"] == 6
+
+    assert (no_opponent.ok, no_opponent.won, no_opponent.events) == (False, None, ["❗ Opponent doesn’t have any monsters!"])
+    assert not no_monsters.ok and no_monsters.xp == 0
+
+
+def test_same_seed_same_outcomes(make_session):
+    first, second = (play(make_session(name), seed=11) for name in ("first.db", "second.db"))
+    assert [outcome.to_dict() for outcome in first] == [outcome.to_dict() for outcome in second]
+
+
+def test_merge_and_render(capsys):
+    outcome = Outcome('battle_wild', species="Emberling").say("⚔️ fight")
+    outcome.xp = 10
+    follow_up = Outcome('achievements').say("🏅 Unlocked")
+    follow_up.achievements.append("Battle Novice")
+    follow_up.money = 100
+
+    assert render(outcome.merge(follow_up)) is outcome
+    assert capsys.readouterr().out == "⚔️ fight\n🏅 Unlocked\n"
+    assert outcome.to_dict() == {
+        "action": "battle_wild", "ok": True, "won": None, "xp": 10, "money": 100,
+        "achievements": ["Battle Novice"], "damage_log": [], "events": ["⚔️ fight", "🏅 Unlocked"],
+        "species": "Emberling",
+    }
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.query_plans import HOT_INDEXES, compare_plans, is_full_scan
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'plans.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def index_names(session) -> set:
+    return set(session.connection().exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+
+
+def test_hot_queries_use_indexes(session):
+    assert set(HOT_INDEXES) <= index_names(session)
+    before, after = compare_plans(session)
+
+    assert [label for label, plan in after.items() if is_full_scan(plan)] == []
+    assert {label for label, plan in before.items() if is_full_scan(plan)} >= {
+        "trade: trades sent", "trade: trades received", "leaderboard: wins page", "leaderboard: wins rank"}
+    # Either player_id index will do; the planner picks between them
+    assert after["battle: player monsters"][0].startswith("SEARCH player_monsters USING INDEX ix_player_monsters_player_")
+    # The indexes were only dropped inside the rolled-back transaction
+    assert set(HOT_INDEXES) <= index_names(session)
+
+
+def test_is_full_scan():
+    assert is_full_scan(["SCAN trades"])
+    assert not is_full_scan(["SCAN player_stats USING COVERING INDEX ix_player_stats_wins"])
+    assert not is_full_scan(["SEARCH trades USING INDEX ix_trades_sender_id (sender_id=?)"])
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.client import GameClient
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, Stats, friend_association
+from game.server import GameServer
+from game.game_logic.encounters import invalidate_encounter_tables
+from game.game_logic.marketplace import invalidate_order_book
+from game.game_logic.social_graph import invalidate_social_graph
+
+SPECIES = [
+    ("Emberling", {"hp": 45, "attack": 14, "defense": 7, "speed": 9}),
+    ("Tidepup", {"hp": 60, "attack": 9, "defense": 12, "speed": 5}),
+]
+
+
+def invalidate_caches():
+    invalidate_encounter_tables()
+    invalidate_order_book()
+    invalidate_social_graph()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'server.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        for species_id, (name, stats) in enumerate(SPECIES, 1):
+            session.add(MonsterSpecies(id=species_id, name=name, base_stats=Stats(**stats), rarity="Common"))
+        session.add_all(Player(id=player_id, name=name, level=1, xp=0, money=0)
+                        for player_id, name in ((1, "Ash"), (2, "Misty")))
+        session.commit()
+    invalidate_caches()
+    yield engine
+    invalidate_caches()
+    engine.dispose()
+
+
+@pytest.fixture
+def server(engine, tmp_path):
+    game_server = GameServer(engine, workers=2)
+    socket_path = str(tmp_path / "game.sock")
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(game_server.run(unix_path=socket_path, refresh=0))
+
+    def serve():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(socket_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield game_server, socket_path
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(timeout=5)
+
+
+def test_login_explore_and_leaderboard(server):
+    _, socket_path = server
+    client = GameClient(unix_path=socket_path)
+    try:
+        login = client.request("login", "Ash")
+        assert login["ok"] and login["id"] == 1
+
+        explore = client.request("explore")
+        assert explore["ok"]
+        assert explore["result"]["species"] in {name for name, _ in SPECIES}
+
+        assert client.request("battle", "Nobody")["ok"] is False
+
+        leaderboard = client.request("leaderboard")
+        assert leaderboard["ok"]
+        assert leaderboard["result"]["wins"] == []
+        assert leaderboard["result"]["rank"] == {"wins": None, "collection": None}
+    finally:
+        client.close()
+
+
+def test_each_connection_has_its_own_login(server):
+    _, socket_path = server
+    ash, misty = GameClient(unix_path=socket_path), GameClient(unix_path=socket_path)
+    try:
+        assert ash.request("login", "Ash")["ok"]
+        assert misty.request("explore")["ok"] is False
+        assert misty.request("login", "Misty")["ok"]
+        assert ash.request("add_friend", "Misty")["result"] == {"friend": "Misty", "added": True}
+        assert misty.request("separation", "Ash")["result"] == {"degrees": None}
+    finally:
+        ash.close()
+        misty.close()
+
+
+def test_refresh_picks_up_writes_from_other_processes(server, engine):
+    game_server, socket_path = server
+    client = GameClient(unix_path=socket_path)
+    try:
+        assert client.request("login", "Ash")["ok"]
+        assert game_server.refresh_caches() == []
+
+        # A batch run or another server adds the edge behind this server's back
+        with engine.begin() as connection:
+            connection.execute(friend_association.insert().values(player_id=1, friend_id=2))
+        assert client.request("separation", "Misty")["result"] == {"degrees": None}
+
+        assert game_server.refresh_caches() == ["social graph"]
+        assert client.request("separation", "Misty")["result"] == {"degrees": 1}
+    finally:
+        client.close()
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, PlayerMonster, PlayerStats, Trade
+from game.game_logic.marketplace import invalidate_order_book
+from game.game_logic.settlement import NOT_FOUND, NOT_OWNER, SETTLED, settle_trades
+
+N_MONSTERS = 20
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'settlement.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add(MonsterSpecies(id=1, name="Emberling", base_stats=None, rarity="Common"))
+        for player_id, name in ((1, "Ash"), (2, "Misty"), (3, "Brock")):
+            session.add(Player(id=player_id, name=name))
+            session.add(PlayerStats(player_id=player_id, catches=0, legendary_catches=0, wins=0,
+                                    collection_size=N_MONSTERS if player_id == 1 else 0))
+        session.add_all(PlayerMonster(id=monster_id, player_id=1, species_id=1, level=5)
+                        for monster_id in range(1, N_MONSTERS + 1))
+        session.commit()
+    invalidate_order_book()
+    yield engine
+    invalidate_order_book()
+    engine.dispose()
+
+
+def queue_trades(engine, trades) -> list:
+    with sessionmaker(bind=engine)() as session:
+        rows = [Trade(sender_id=sender_id, receiver_id=receiver_id, monster_sent=monster_id)
+                for sender_id, receiver_id, monster_id in trades]
+        session.add_all(rows)
+        session.commit()
+        return [row.id for row in rows]
+
+
+def collection_sizes(engine) -> dict:
+    with engine.connect() as conn:
+        stored = dict(conn.execute(select(PlayerStats.player_id, PlayerStats.collection_size)).all())
+        owned = dict(conn.execute(
+            select(PlayerMonster.player_id, func.count()).group_by(PlayerMonster.player_id)).all())
+    assert stored == {player_id: owned.get(player_id, 0) for player_id in stored}
+    return stored
+
+
+def test_two_settlers_racing_for_one_monster(engine):
+    # Ash promised every monster to both Misty and Brock
+    to_misty = queue_trades(engine, [(1, 2, monster_id) for monster_id in range(1, N_MONSTERS + 1)])
+    to_brock = queue_trades(engine, [(1, 3, monster_id) for monster_id in range(1, N_MONSTERS + 1)])
+
+    start = threading.Barrier(2)
+    results = {}
+
+    def settler(name, trade_ids):
+        with sessionmaker(bind=engine)() as session:
+            start.wait()
+            # One transaction per trade, so the two settlers interleave
+            results[name] = settle_trades(session, trade_ids, batch_size=1)
+
+    threads = [threading.Thread(target=settler, args=("misty", to_misty)),
+               threading.Thread(target=settler, args=("brock", to_brock))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with engine.connect() as conn:
+        owners = dict(conn.execute(select(PlayerMonster.id, PlayerMonster.player_id)).all())
+        remaining = set(conn.execute(select(Trade.id)).scalars())
+    for misty, brock in zip(results["misty"], results["brock"]):
+        assert misty["monster_id"] == brock["monster_id"]
+        # Exactly one trade per monster went through, and the monster went with it
+        assert {misty["status"], brock["status"]} == {SETTLED, NOT_OWNER}
+        winner = misty if misty["status"] == SETTLED else brock
+        loser = brock if winner is misty else misty
+        assert owners[winner["monster_id"]] == winner["receiver_id"]
+        assert winner["trade_id"] not in remaining and loser["trade_id"] in remaining
+
+    sizes = collection_sizes(engine)
+    assert sizes[1] == 0 and sizes[2] + sizes[3] == N_MONSTERS
+
+
+def test_one_batch_settles_chains_in_id_order(engine):
+    trade_ids = queue_trades(engine, [(1, 2, 1), (2, 3, 1), (1, 2, 1), (1, 3, 2)])
+
+    with sessionmaker(bind=engine)() as session:
+        results = settle_trades(session, trade_ids + [999])
+
+    assert [result["status"] for result in results] == [SETTLED, SETTLED, NOT_OWNER, SETTLED, NOT_FOUND]
+    with engine.connect() as conn:
+        assert conn.execute(select(PlayerMonster.player_id).where(PlayerMonster.id.in_([1, 2]))).scalars().all() \
+            == [3, 3]
+    assert collection_sizes(engine) == {1: N_MONSTERS - 2, 2: 0, 3: 2}
@@ -0,0 +1,87 @@
+import random
+
+import numpy as np
+import pytest
+
+from game.models import STAT_NAMES, Stats
+from game.seed import PREDEFINED_MONSTERS
+from game.simulator import (
+    _duel, simulate_ai_duels, simulate_catches, simulate_player_battles, species_stat_table
+)
+from game.game_logic.battle import (
+    BATTLE_MOVES, BATTLE_POWER_SPREAD, Combatant, calculate_damage, create_ai_opponent, run_duel
+)
+
+SPECIES = PREDEFINED_MONSTERS[:3]
+LEVELS = [5, 50]
+
+
+class NumpyChoice:
+    """
+    rng.choice for run_duel that draws from a NumPy generator the way _duel does for one fight.
+    """
+
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def choice(self, moves):
+        return moves[int(self.rng.integers(0, len(moves), 1)[0])]
+
+
+STATS = species_stat_table(SPECIES, LEVELS)
+
+
+def sides(species_index, level_index, bot):
+    stats = Stats(*(int(value) for value in STATS[species_index, level_index]))
+    return Combatant(SPECIES[species_index]["name"], stats.hp, stats), Combatant.from_ai(bot)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_vectorized_duel_matches_run_duel(seed):
+    for bot in create_ai_opponent(1):
+        for s in range(len(SPECIES)):
+            for l in range(len(LEVELS)):
+                player_side, ai_side = sides(s, l, bot)
+                player_stats = dict(zip(STAT_NAMES, (int(value) for value in STATS[s, l])))
+                damage_out = [[calculate_damage(player_stats, bot["stats"], move["power"], 1.0)
+                               for move in BATTLE_MOVES]]
+                damage_in = [[calculate_damage(bot["stats"], player_stats, move["power"], 1.0)
+                              for move in BATTLE_MOVES]]
+
+                won, turns = _duel(np.array([player_side.hp]), np.array([ai_side.hp]), np.array([0]),
+                                   np.array(damage_out), np.array(damage_in), np.random.default_rng(seed))
+                duel = run_duel(player_side, ai_side, BATTLE_MOVES, NumpyChoice(seed))
+
+                assert bool(won[0]) == (duel["winner"] is player_side)
+                assert int(turns[0]) == duel["turns"]
+
+
+def test_ai_duel_win_rates_match_the_scalar_loop():
+    trials = 3000
+    report = simulate_ai_duels(LEVELS, trials, np.random.default_rng(1), species=SPECIES)
+    assert report["win_rate"].shape == (len(SPECIES), len(LEVELS), 3)
+    assert report["turn_histogram"].sum() == len(SPECIES) * len(LEVELS) * 3 * trials
+
+    rng = random.Random(1)
+    for b, bot in enumerate(create_ai_opponent(1)):
+        for s in range(len(SPECIES)):
+            for l in range(len(LEVELS)):
+                wins = 0
+                for _ in range(trials):
+                    player_side, ai_side = sides(s, l, bot)
+                    wins += run_duel(player_side, ai_side, BATTLE_MOVES, rng)["winner"] is player_side
+                assert report["win_rate"][s, l, b] == pytest.approx(wins / trials, abs=0.05)
+
+
+def test_player_battle_and_catch_rates():
+    levels = [1, 3, 10, 30]
+    report = simulate_player_battles(levels, 20000, np.random.default_rng(2))
+    rolls = range(BATTLE_POWER_SPREAD + 1)
+    for i, mine in enumerate(levels):
+        for j, theirs in enumerate(levels):
+            # Ties go to the challenger
+            exact = sum(mine + x >= theirs + y for x in rolls for y in rolls) / len(rolls) ** 2
+            assert report["win_rate"][i, j] == pytest.approx(exact, abs=0.02)
+
+    catches = simulate_catches(levels, 20000, np.random.default_rng(3))
+    assert catches["success_rate"] == pytest.approx(np.clip(catches["catch_rate"], 0, 1), abs=0.02)
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import Player, friend_association, rival_association
+from game.game_logic.social_graph import get_social_graph, invalidate_social_graph
+from game.game_logic.trade_social import add_friend, add_rival
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'social.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all(Player(id=player_id, name=name) for player_id, name in ((1, "Ash"), (2, "Misty")))
+        session.commit()
+    invalidate_social_graph()
+    yield engine
+    invalidate_social_graph()
+    engine.dispose()
+
+
+def edge_count(session, table):
+    return session.execute(select(func.count()).select_from(table)).scalar()
+
+
+def test_add_friend_and_rival(engine):
+    session = sessionmaker(bind=engine)()
+    ash = session.get(Player, 1)
+
+    assert add_friend(session, ash, "Misty") is True
+    assert add_friend(session, ash, "Misty") is False
+    assert add_rival(session, ash, "Misty") is True
+    assert add_friend(session, ash, "Ash") is None
+    assert add_rival(session, ash, "Nobody") is None
+
+    assert edge_count(session, friend_association) == 1
+    assert edge_count(session, rival_association) == 1
+    assert get_social_graph(session).is_friend(1, 2)
+
+
+def test_edge_added_by_another_process_is_not_duplicated(engine):
+    session = sessionmaker(bind=engine)()
+    graph = get_social_graph(session)
+    # Another process (the server, a batch run) adds the edge after this graph was loaded
+    with engine.begin() as connection:
+        connection.execute(friend_association.insert().values(player_id=1, friend_id=2))
+    assert not graph.is_friend(1, 2)
+
+    assert add_friend(session, session.get(Player, 1), "Misty") is False
+    assert edge_count(session, friend_association) == 1
+    assert graph.is_friend(1, 2)
+
+
+def test_duplicate_edges_are_rejected_by_the_schema(engine):
+    with engine.begin() as connection:
+        connection.execute(rival_association.insert().values(player_id=1, rival_id=2))
+    with pytest.raises(IntegrityError):
+        with engine.begin() as connection:
+            connection.execute(rival_association.insert().values(player_id=1, rival_id=2))
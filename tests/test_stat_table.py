@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, PlayerMonster, Stats
+from game.game_logic import stat_table
+from game.game_logic.catching import catch_monster
+from game.game_logic.stat_table import (
+    MAX_LEVEL, StatTable, get_stat_table, invalidate_stat_table, stats_for_level, stats_for_monster,
+)
+
+BASE_STATS = {
+    1: Stats(39, 52, 43, 65),
+    2: {"hp": 44, "attack": 48, "defense": 65, "speed": 43},
+    4: Stats(1, 0, 255, 5),
+}
+
+
+class AlwaysCatch:
+    def random(self):
+        return 0.0
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'stat_table.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Player(id=1, name="Ash"))
+    session.add_all(MonsterSpecies(id=species_id, name=f"Species {species_id}", rarity="Common", base_stats=stats)
+                    for species_id, stats in ((1, Stats(39, 52, 43, 65)), (2, Stats(44, 48, 65, 43))))
+    session.add(MonsterSpecies(id=3, name="Unfinished", rarity="Common"))
+    session.commit()
+    invalidate_stat_table()
+    yield session
+    invalidate_stat_table()
+    session.close()
+    engine.dispose()
+
+
+def test_table_matches_the_formula_at_every_level():
+    table = StatTable.from_base_stats({**BASE_STATS, 3: None, 5: {"hp": 1, "attack": None, "defense": 1, "speed": 1}})
+    for species_id, base in BASE_STATS.items():
+        for level in range(1, MAX_LEVEL + 1):
+            assert table.stats(species_id, level) == stats_for_level(base, level), (species_id, level)
+    assert table.stats(1, 50) == Stats(99, 57, 48, 70)
+
+    misses = [(3, 10), (5, 10), (0, 10), (6, 10), (-1, 10), (1, 0), (1, MAX_LEVEL + 1), (None, 10), (1, None)]
+    assert [table.row(species_id, level) for species_id, level in misses] == [None] * len(misses)
+    assert StatTable.from_base_stats({}).stats(1, 1) is None
+
+
+def test_stats_for_monster_falls_back_to_the_formula(session):
+    monster = PlayerMonster(species_id=1, level=150)
+    session.add(monster)
+    assert stats_for_monster(session, monster) == stats_for_level(BASE_STATS[1], 150)
+    assert stats_for_monster(session, monster, level=7) == get_stat_table(session).stats(1, 7)
+
+
+def test_species_changes_rebuild_the_table_on_commit(session):
+    table = get_stat_table(session)
+    assert get_stat_table(session) is table
+
+    session.get(MonsterSpecies, 1).base_stats = Stats(100, 100, 100, 100)
+    session.flush()
+    assert stat_table._table is table
+    session.rollback()
+    assert stat_table._table is table
+
+    session.get(MonsterSpecies, 1).base_stats = Stats(100, 100, 100, 100)
+    session.commit()
+    assert stat_table._table is None
+    assert get_stat_table(session).stats(1, 1) == stats_for_level(Stats(100, 100, 100, 100), 1)
+
+
+def test_caught_monsters_start_with_the_species_base_stats(session):
+    assert catch_monster(session, 1, 2, AlwaysCatch())
+    monster = session.query(PlayerMonster).filter_by(player_id=1).one()
+    assert (monster.level, monster.current_stats) == (1, Stats(44, 48, 65, 43))
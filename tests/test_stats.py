@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+
+import pytest
+import sqlalchemy as sa
+from alembic.config import Config
+from alembic.runtime.environment import EnvironmentContext
+from alembic.operations import Operations
+from alembic.script import ScriptDirectory
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import MonsterSpecies, Player, PlayerMonster, Stats
+from game.game_logic.collections import strongest_monsters
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "alembic")
+# env.py puts the alembic directory on sys.path the same way
+sys.path.insert(0, ALEMBIC_DIR)
+import migration_utils
+
+REVISION = "b7d41e9c3a52"
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'stats.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(Player(id=player_id, name=name) for player_id, name in ((1, "Ash"), (2, "Misty")))
+    session.add(MonsterSpecies(id=1, name="Emberling", rarity="Common", base_stats=Stats(39, 52, 43, 65)))
+    session.add_all(PlayerMonster(id=monster_id, player_id=player_id, species_id=1, nickname=f"Mon {monster_id}",
+                                  level=5, current_stats=stats)
+                    for monster_id, player_id, stats in (
+                        (1, 1, Stats(30, 12, 9, 14)),
+                        (2, 2, Stats(31, 15, 8, 11)),
+                        (3, 1, Stats(29, 15, 10, 12)),
+                    ))
+    session.add(PlayerMonster(id=4, player_id=2, species_id=1, nickname="Unstatted", level=1))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_stats_read_like_the_old_dicts():
+    stats = Stats.from_dict({"hp": 40, "attack": 12, "speed": 7})
+    assert stats == Stats(40, 12, 0, 7) and stats != Stats(40, 12, 1, 7)
+    assert (stats["attack"], stats.get("defense"), stats.get("luck", -1)) == (12, 0, -1)
+    assert dict(stats.items()) == stats.to_dict() == {"hp": 40, "attack": 12, "defense": 0, "speed": 7}
+    assert list(stats.keys()) == ["hp", "attack", "defense", "speed"]
+    with pytest.raises(KeyError):
+        stats["luck"]
+
+
+def test_stats_are_saved_in_typed_columns(session):
+    row = session.execute(sa.text("SELECT hp, attack, defense, speed FROM player_monsters WHERE id = 1")).one()
+    assert tuple(row) == (30, 12, 9, 14)
+    assert session.execute(sa.text("SELECT base_speed FROM monster_species WHERE id = 1")).scalar() == 65
+
+    # Reassigning saves; changing a Stats in place does not
+    monster = session.get(PlayerMonster, 1)
+    monster.current_stats = Stats(35, 14, 10, 15)
+    session.get(PlayerMonster, 2).current_stats.attack = 99
+    session.commit()
+    session.expire_all()
+    assert session.get(PlayerMonster, 1).current_stats == Stats(35, 14, 10, 15)
+    assert session.get(PlayerMonster, 2).current_stats.attack == 15
+
+
+def test_strongest_monsters(session):
+    assert [(row["id"], row["owner"], row["value"]) for row in strongest_monsters(session)] == [
+        (2, "Misty", 15), (3, "Ash", 15), (1, "Ash", 12)]
+    assert [row["id"] for row in strongest_monsters(session, "defense", limit=2)] == [3, 1]
+    assert strongest_monsters(session, "speed", limit=1)[0]["species_name"] == "Emberling"
+    with pytest.raises(ValueError, match="Unknown stat 'luck'"):
+        strongest_monsters(session, "luck")
+
+
+def run_revision(engine, direction):
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+    script = ScriptDirectory.from_config(config)
+    with engine.connect() as connection, EnvironmentContext(config, script) as env:
+        env.configure(connection=connection)
+        context = env.get_context()
+        # The per-migration transaction run_migrations opens, which autocommit_block needs
+        with env.begin_transaction(), context.begin_transaction(_per_migration=True), Operations.context(context):
+            getattr(script.get_revision(REVISION).module, direction)()
+
+
+def test_typed_stat_migration_round_trip(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    species_stats = {1: {"hp": 39, "attack": 52, "defense": 43, "speed": 65}, 2: None}
+    monster_stats = {1: {"hp": 30, "attack": 12, "defense": 9, "speed": 14}, 2: None}
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE monster_species (id INTEGER PRIMARY KEY, name VARCHAR, base_stats JSON)")
+        conn.exec_driver_sql("CREATE TABLE player_monsters (id INTEGER PRIMARY KEY, nickname VARCHAR, "
+                             "current_stats JSON)")
+        conn.execute(sa.text("INSERT INTO monster_species VALUES (:id, :name, :stats)"), [
+            {"id": species_id, "name": f"Species {species_id}", "stats": stats and json.dumps(stats)}
+            for species_id, stats in species_stats.items()])
+        conn.execute(sa.text("INSERT INTO player_monsters VALUES (:id, :name, :stats)"), [
+            {"id": monster_id, "name": f"Mon {monster_id}", "stats": stats and json.dumps(stats)}
+            for monster_id, stats in monster_stats.items()])
+
+    migration_utils._backfilled.clear()
+    try:
+        run_revision(engine, "upgrade")
+        with engine.connect() as conn:
+            inspector = sa.inspect(conn)
+            assert "base_stats" not in {column["name"] for column in inspector.get_columns("monster_species")}
+            assert "current_stats" not in {column["name"] for column in inspector.get_columns("player_monsters")}
+            assert conn.execute(sa.text(
+                "SELECT id, base_hp, base_attack, base_defense, base_speed FROM monster_species ORDER BY id"
+            )).all() == [(1, 39, 52, 43, 65), (2, None, None, None, None)]
+            assert conn.execute(sa.text(
+                "SELECT id, hp, attack, defense, speed, current_hp FROM player_monsters ORDER BY id"
+            )).all() == [(1, 30, 12, 9, 14, None), (2, None, None, None, None, None)]
+
+        run_revision(engine, "downgrade")
+        with engine.connect() as conn:
+            assert {column["name"] for column in sa.inspect(conn).get_columns("player_monsters")} == \
+                {"id", "nickname", "current_stats"}
+            species = conn.execute(sa.text("SELECT id, base_stats FROM monster_species")).all()
+            monsters = conn.execute(sa.text("SELECT id, current_stats FROM player_monsters")).all()
+        assert {species_id: stats and json.loads(stats) for species_id, stats in species} == species_stats
+        assert {monster_id: stats and json.loads(stats) for monster_id, stats in monsters} == monster_stats
+    finally:
+        migration_utils._backfilled.clear()
+        engine.dispose()
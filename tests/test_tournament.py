@@ -0,0 +1,129 @@
+from collections import Counter
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import Achievement, Battle, MonsterSpecies, Player, PlayerAchievement, PlayerMonster, PlayerStats, Stats
+from game.tournament import Tournament, run_tournament, schedule_blocks
+from game.game_logic.achievements import AchievementIndex
+from game.game_logic.battle import PLAYER_BATTLE_XP
+from game.game_logic.leveling import PLAYER_XP
+
+N_PLAYERS = 12
+# Player 12 has no monsters, so every pairing with them is skipped
+NO_MONSTERS = 12
+# Players 1-3 start with some wins, XP and levels of their own
+START = {1: (3, 40, 2), 2: (0, 0, 5), 3: (7, 10, 1)}
+CHUNK_SIZE = 10
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'tournament.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(MonsterSpecies(id=1, name="Emberling", rarity="Common", base_stats=Stats(45, 14, 7, 9)))
+    session.add_all([
+        Achievement(id=1, achievement_name="Battle Novice", unlock_condition="win_1"),
+        Achievement(id=2, achievement_name="Battle Veteran", unlock_condition="win_5"),
+        Achievement(id=3, achievement_name="Collector", unlock_condition="catch_10"),
+    ])
+    monster_id = 1
+    for player_id in range(1, N_PLAYERS + 1):
+        wins, xp, level = START.get(player_id, (0, 0, 1))
+        session.add(Player(id=player_id, name=f"Player {player_id}", level=level, xp=xp, money=0))
+        if player_id in START:
+            session.add(PlayerStats(player_id=player_id, catches=0, legendary_catches=0, wins=wins,
+                                    collection_size=0))
+        if player_id == NO_MONSTERS:
+            continue
+        for level in range(1, player_id % 4 + 2):
+            session.add(PlayerMonster(id=monster_id, player_id=player_id, species_id=1, level=level * 3, xp=0,
+                                      current_stats=Stats(45, 14, 7, 9)))
+            monster_id += 1
+    session.commit()
+    session.close()
+    yield engine
+    engine.dispose()
+
+
+def battle_rows(engine) -> list:
+    with engine.connect() as conn:
+        return conn.execute(
+            select(Battle.player1_id, Battle.player2_id, Battle.winner_id).order_by(Battle.id)
+        ).all()
+
+
+def check_totals(engine, battles):
+    """
+    player_stats wins, player XP and achievements account for exactly these battles.
+    """
+    wins = Counter(winner_id for _, _, winner_id in battles)
+    challenger_wins = Counter(winner_id for player1_id, _, winner_id in battles if winner_id == player1_id)
+    with engine.connect() as conn:
+        stored_wins = dict(conn.execute(select(PlayerStats.player_id, PlayerStats.wins)).all())
+        players = {player_id: (level, xp) for player_id, level, xp in conn.execute(
+            select(Player.id, Player.level, Player.xp))}
+        unlocked = Counter(conn.execute(select(PlayerAchievement.player_id)).scalars())
+        index = AchievementIndex(conn.execute(select(Achievement)).all())
+
+    for player_id in range(1, N_PLAYERS + 1):
+        start_wins, start_xp, start_level = START.get(player_id, (0, 0, 1))
+        assert stored_wins.get(player_id, 0) == start_wins + wins[player_id]
+        assert players[player_id] == PLAYER_XP.apply(start_level, start_xp,
+                                                     challenger_wins[player_id] * PLAYER_BATTLE_XP)
+        # Unlocked after a challenger win, on the wins counted so far
+        if challenger_wins[player_id]:
+            assert 1 <= unlocked[player_id] <= len(index.reached("wins", stored_wins[player_id]))
+        else:
+            assert unlocked[player_id] == 0
+
+
+def test_round_robin_writes_battles_wins_and_xp(engine):
+    assert len(list(schedule_blocks(N_PLAYERS, CHUNK_SIZE))) > 2
+
+    summary = run_tournament(engine, range(1, N_PLAYERS + 1), seed=3, chunk_size=CHUNK_SIZE)
+
+    battles = battle_rows(engine)
+    playing = N_PLAYERS - 1
+    assert summary["battles"] == len(battles) == playing * (playing - 1) // 2
+    assert summary["skipped"] == playing
+    assert {frozenset(pair[:2]) for pair in battles} == {
+        frozenset((i, j)) for i in range(1, N_PLAYERS) for j in range(i + 1, N_PLAYERS)
+    }
+    assert summary["xp_awarded"] == PLAYER_BATTLE_XP * sum(winner == player1 for player1, _, winner in battles)
+    check_totals(engine, battles)
+
+
+def test_results_do_not_depend_on_workers(engine, tmp_path):
+    other = make_engine(f"sqlite:///{tmp_path / 'copy.db'}", profile='benchmark')
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"VACUUM INTO '{tmp_path / 'copy.db'}'")
+    try:
+        run_tournament(engine, range(1, N_PLAYERS + 1), seed=3, workers=1, chunk_size=CHUNK_SIZE)
+        run_tournament(other, range(1, N_PLAYERS + 1), seed=3, workers=2, chunk_size=CHUNK_SIZE)
+        assert battle_rows(other) == battle_rows(engine)
+        check_totals(other, battle_rows(other))
+    finally:
+        other.dispose()
+
+
+def test_a_run_that_stops_partway_leaves_every_battle_counted(engine, monkeypatch):
+    unlock = Tournament.unlock_achievements
+    calls = []
+
+    def fail_on_third_block(self, conn, index, challenger_wins):
+        calls.append(1)
+        if len(calls) == 3:
+            raise RuntimeError("worker lost")
+        return unlock(self, conn, index, challenger_wins)
+
+    monkeypatch.setattr(Tournament, "unlock_achievements", fail_on_third_block)
+    with pytest.raises(RuntimeError):
+        run_tournament(engine, range(1, N_PLAYERS + 1), seed=3, chunk_size=CHUNK_SIZE)
+
+    battles = battle_rows(engine)
+    assert 0 < len(battles) < (N_PLAYERS - 1) * (N_PLAYERS - 2) // 2
+    check_totals(engine, battles)
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from game.database import Base, make_engine
+from game.models import Type, TypeEffectiveness
+from game.game_logic.type_chart import get_type_chart, invalidate_type_chart
+
+# (attacker, defender, multiplier); 0 is a real immunity, not a missing row
+EFFECTIVENESS = [(1, 2, 2), (2, 1, 0), (2, 3, 2), (3, 3, 0), (4, 1, 2)]
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'types.db'}", profile='benchmark')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(Type(id=type_id, name=name) for type_id, name in enumerate(("Fire", "Water", "Grass", "Rock"), 1))
+    session.add_all(TypeEffectiveness(attacking_type_id=attacker, defending_type_id=defender, multiplier=multiplier)
+                    for attacker, defender, multiplier in EFFECTIVENESS)
+    session.commit()
+    invalidate_type_chart()
+    yield session
+    session.close()
+    invalidate_type_chart()
+    engine.dispose()
+
+
+def baseline_multiplier(session, attacker_type_id, defender_type_id):
+    # The per-turn query the chart replaced
+    effectiveness = session.query(TypeEffectiveness).filter_by(
+        attacking_type_id=attacker_type_id,
+        defending_type_id=defender_type_id
+    ).first()
+    return effectiveness.multiplier if effectiveness else 1.0
+
+
+def test_chart_matches_the_per_turn_query(session):
+    chart = get_type_chart(session)
+    type_ids = [None, 0, 1, 2, 3, 4, 99]
+    pairs = [(attacker, defender) for attacker in type_ids for defender in type_ids]
+    expected = [baseline_multiplier(session, attacker, defender) for attacker, defender in pairs]
+    assert [chart.multiplier(attacker, defender) for attacker, defender in pairs] == expected
+    assert chart.multipliers(pairs) == expected
+
+
+def test_cache_is_dropped_on_commit_not_on_flush(session):
+    assert get_type_chart(session).multiplier(1, 3) == 1.0
+
+    session.add(TypeEffectiveness(attacking_type_id=1, defending_type_id=3, multiplier=2))
+    session.flush()
+    invalidated_early = get_type_chart(session).multiplier(1, 3) != 1.0
+    session.rollback()
+    assert not invalidated_early
+    assert get_type_chart(session).multiplier(1, 3) == 1.0
+
+    session.add(TypeEffectiveness(attacking_type_id=1, defending_type_id=3, multiplier=2))
+    session.commit()
+    assert get_type_chart(session).multiplier(1, 3) == 2